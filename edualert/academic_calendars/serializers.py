@@ -5,7 +5,7 @@ from rest_framework import serializers
 
 from edualert.academic_calendars.models import AcademicYearCalendar, SemesterCalendar, SchoolEvent
 from edualert.academic_calendars.tasks import calculate_semesters_working_weeks_task
-from edualert.academic_calendars.utils import check_event_is_semester_end
+from edualert.academic_calendars.utils import check_event_is_semester_end, invalidate_academic_calendar_cache
 from edualert.common.utils import check_date_range_overlap
 
 
@@ -221,5 +221,6 @@ class CurrentAcademicYearCalendarSerializer(serializers.ModelSerializer):
         SemesterCalendar.objects.filter(id=first_semester['id']).update(**first_semester)
         SemesterCalendar.objects.filter(id=second_semester['id']).update(**second_semester)
 
+        invalidate_academic_calendar_cache()
         calculate_semesters_working_weeks_task.delay(instance.id)
         return instance
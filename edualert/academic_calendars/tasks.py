@@ -2,6 +2,7 @@ from datetime import timedelta
 from celery import shared_task
 
 from edualert.academic_calendars.models import SchoolEvent, AcademicYearCalendar
+from edualert.academic_calendars.utils import invalidate_academic_calendar_cache
 
 
 @shared_task()
@@ -12,6 +13,7 @@ def calculate_semesters_working_weeks_task(calendar_id):
         .get(id=calendar_id)
     calculate_first_semester_working_weeks(calendar.first_semester)
     calculate_second_semester_working_weeks(calendar.second_semester)
+    invalidate_academic_calendar_cache()
 
 
 def calculate_first_semester_working_weeks(semester):
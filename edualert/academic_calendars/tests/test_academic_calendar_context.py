@@ -0,0 +1,77 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from edualert.academic_calendars import utils
+from edualert.academic_calendars.factories import AcademicYearCalendarFactory, SchoolEventFactory
+from edualert.academic_calendars.models import SchoolEvent, SemesterCalendar
+from edualert.academic_calendars.utils import get_current_academic_calendar, get_current_academic_calendar_context, \
+    get_second_semester_end_events, invalidate_academic_calendar_cache, ACADEMIC_CALENDAR_VERSION_KEY
+from edualert.common.api_tests import CommonAPITestCase
+
+
+@override_settings(ACADEMIC_CALENDAR_CACHE_TIMEOUT=60)
+class AcademicCalendarContextTestCase(CommonAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.calendar = AcademicYearCalendarFactory()
+        cls.event = SchoolEventFactory(semester=cls.calendar.second_semester, event_type=SchoolEvent.EventTypes.SECOND_SEMESTER_END_VIII_GRADE,
+                                       starts_at=date(2020, 6, 1), ends_at=date(2020, 6, 5))
+
+    def setUp(self):
+        cache.clear()
+        invalidate_academic_calendar_cache()
+
+    @staticmethod
+    def expire_context():
+        utils._current_calendar_cache.entry = utils._current_calendar_cache.entry._replace(expires_at=0)
+
+    def test_current_academic_calendar_is_cached(self):
+        calendar = get_current_academic_calendar()
+        self.assertEqual(calendar.id, self.calendar.id)
+
+        with self.assertNumQueries(0):
+            cached_calendar = get_current_academic_calendar()
+            events = get_second_semester_end_events(cached_calendar)
+            cached_calendar.second_semester.ends_at
+        self.assertEqual(cached_calendar.id, self.calendar.id)
+        self.assertEqual(events[SchoolEvent.EventTypes.SECOND_SEMESTER_END_VIII_GRADE].id, self.event.id)
+
+        # Every caller gets its own copy
+        cached_calendar.academic_year = 2000
+        self.assertEqual(get_current_academic_calendar().academic_year, self.calendar.academic_year)
+
+    def test_current_academic_calendar_invalidation(self):
+        get_current_academic_calendar()
+        SemesterCalendar.objects.filter(id=self.calendar.second_semester.id).update(ends_at=date(2020, 6, 20))
+        self.assertEqual(get_current_academic_calendar().second_semester.ends_at, date(2020, 6, 12))
+
+        invalidate_academic_calendar_cache()
+        self.assertEqual(get_current_academic_calendar().second_semester.ends_at, date(2020, 6, 20))
+
+    def test_current_academic_calendar_expired(self):
+        get_current_academic_calendar()
+
+        # Expired, but the version didn't change, so the calendar isn't fetched again
+        self.expire_context()
+        with self.assertNumQueries(0):
+            get_current_academic_calendar()
+
+        # Changed by another process
+        SemesterCalendar.objects.filter(id=self.calendar.second_semester.id).update(ends_at=date(2020, 6, 20))
+        cache.incr(ACADEMIC_CALENDAR_VERSION_KEY)
+        self.expire_context()
+        self.assertEqual(get_current_academic_calendar().second_semester.ends_at, date(2020, 6, 20))
+
+    def test_current_academic_calendar_context_semesters(self):
+        context = get_current_academic_calendar_context()
+
+        self.assertEqual(context.get_second_semester_end(8, False), date(2020, 6, 5))
+        self.assertEqual(context.get_second_semester_end(5, False), date(2020, 6, 12))
+        self.assertEqual(context.get_second_semester_end(10, True), date(2020, 6, 12))
+
+        self.assertEqual(context.get_current_semester(date(2019, 12, 1), 8, False), 1)
+        self.assertEqual(context.get_current_semester(date(2020, 6, 3), 8, False), 2)
+        self.assertIsNone(context.get_current_semester(date(2020, 6, 8), 8, False))
+        self.assertEqual(context.get_current_semester(date(2020, 6, 8), 5, False), 2)
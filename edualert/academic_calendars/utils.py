@@ -1,12 +1,143 @@
+from bisect import bisect_right
+from copy import deepcopy
+from datetime import timedelta
+
 from dateutil.relativedelta import relativedelta
+from django.conf import settings
 from django.db.models import Q
 
 from edualert.academic_calendars.constants import SEMESTER_END_EVENTS
 from edualert.academic_calendars.models import AcademicYearCalendar, SchoolEvent
-from edualert.common.utils import clone_object_and_override_fields
+from edualert.common.utils import clone_object_and_override_fields, VersionedLocalCache
+
+ACADEMIC_CALENDAR_VERSION_KEY = 'academic_calendar_version'
+
+_current_calendar_cache = VersionedLocalCache(ACADEMIC_CALENDAR_VERSION_KEY, 'ACADEMIC_CALENDAR_CACHE_TIMEOUT')
+
+
+class CalendarIndex:
+    """
+    Maps a date and a class grade to the current semester and to whether the catalogs can be edited at that date.
+    Both only change at a few dates (the semester bounds and the events' bounds), so these dates are computed once,
+    together with the state following each of them, and every lookup is a binary search.
+    """
+
+    def __init__(self, calendar, events, second_semester_end_events):
+        """
+        :param events: the calendar's events and the second semester's events (as used by can_update_grades_or_absences)
+        :param second_semester_end_events: the events returned by get_second_semester_end_events (as used by get_current_semester)
+        """
+        self.calendar = calendar
+        self.blocking_events = [(event.starts_at, event.ends_at) for event in events
+                                if not check_event_is_semester_end(event.event_type)]
+        end_events = _get_first_event_by_type(events)
+
+        self.second_semester_ends = {}
+        self.indexes = {}
+        for end_event_type in [None] + SEMESTER_END_EVENTS:
+            semester_end_event = second_semester_end_events.get(end_event_type)
+            semester_end = semester_end_event.ends_at if semester_end_event else calendar.second_semester.ends_at
+            editable_end_event = end_events.get(end_event_type)
+            editable_end = editable_end_event.ends_at if editable_end_event else calendar.second_semester.ends_at
+
+            self.second_semester_ends[end_event_type] = semester_end
+            self.indexes[end_event_type] = self._build_index(semester_end, editable_end)
+
+    def _build_index(self, semester_end, editable_end):
+        one_day = timedelta(days=1)
+        dates = {
+            self.calendar.first_semester.starts_at, self.calendar.first_semester.ends_at + one_day,
+            self.calendar.second_semester.starts_at, semester_end, editable_end + one_day
+        }
+        for starts_at, ends_at in self.blocking_events:
+            # The dates strictly inside an event are blocked
+            dates.update([starts_at + one_day, ends_at])
+        dates = sorted(dates)
+
+        # states[i] holds from dates[i - 1] (inclusive) until dates[i] (exclusive)
+        states = [self._get_state(dates[0] - one_day, semester_end, editable_end)] + \
+                 [self._get_state(date, semester_end, editable_end) for date in dates]
+        return dates, states
+
+    def _get_state(self, date, semester_end, editable_end):
+        if date < self.calendar.second_semester.starts_at:
+            semester = 1
+        elif date < semester_end:
+            semester = 2
+        else:
+            semester = None
+
+        is_editable = (self.calendar.first_semester.starts_at <= date <= self.calendar.first_semester.ends_at or
+                       self.calendar.second_semester.starts_at <= date <= editable_end) and \
+            not any(starts_at < date < ends_at for starts_at, ends_at in self.blocking_events)
+        return semester, is_editable
+
+    def _get_states(self, dates, class_grade_arabic, is_technological_school):
+        index_dates, states = self.indexes[get_second_semester_end_event_type(class_grade_arabic, is_technological_school)]
+        return [states[bisect_right(index_dates, date)] for date in dates]
+
+    def get_second_semester_end(self, class_grade_arabic, is_technological_school):
+        return self.second_semester_ends[get_second_semester_end_event_type(class_grade_arabic, is_technological_school)]
+
+    def get_semester(self, date, class_grade_arabic, is_technological_school):
+        return self._get_states([date], class_grade_arabic, is_technological_school)[0][0]
+
+    def get_semesters(self, dates, class_grade_arabic, is_technological_school):
+        return [state[0] for state in self._get_states(dates, class_grade_arabic, is_technological_school)]
+
+    def is_editable(self, date, class_grade_arabic, is_technological_school):
+        return self._get_states([date], class_grade_arabic, is_technological_school)[0][1]
+
+    def are_editable(self, dates, class_grade_arabic, is_technological_school):
+        return [state[1] for state in self._get_states(dates, class_grade_arabic, is_technological_school)]
+
+
+class AcademicCalendarContext:
+    """
+    The current academic calendar, together with the data derived from it that most of the requests need:
+    the second semester end events and the calendar index.
+    """
+
+    def __init__(self, calendar):
+        self.calendar = calendar
+        self.second_semester_end_events = {}
+        self.index = None
+        if calendar:
+            events = _get_calendar_events(calendar)
+            self.second_semester_end_events = _get_second_semester_end_events(calendar, events)
+            self.index = CalendarIndex(calendar, events, self.second_semester_end_events)
+
+    def get_second_semester_end(self, class_grade_arabic, is_technological_school):
+        return self.index.get_second_semester_end(class_grade_arabic, is_technological_school)
+
+    def get_current_semester(self, today, class_grade_arabic, is_technological_school):
+        return self.index.get_semester(today, class_grade_arabic, is_technological_school)
+
+
+def get_current_academic_calendar_context():
+    """
+    The context is kept in the process memory for ACADEMIC_CALENDAR_CACHE_TIMEOUT seconds. After that, it is rebuilt
+    only if the calendar was invalidated in the meantime, possibly by another process.
+    """
+    return _current_calendar_cache.get(lambda: AcademicCalendarContext(_get_current_academic_calendar()))
+
+
+def invalidate_academic_calendar_cache():
+    """
+    To be called after the academic calendar or its events were changed.
+    """
+    _current_calendar_cache.invalidate()
 
 
 def get_current_academic_calendar():
+    if not settings.ACADEMIC_CALENDAR_CACHE_TIMEOUT:
+        return _get_current_academic_calendar()
+
+    # The context is shared, so the callers get their own copy of the calendar
+    return deepcopy(get_current_academic_calendar_context().calendar)
+
+
+def _get_current_academic_calendar():
     return AcademicYearCalendar.objects.order_by('-academic_year') \
         .select_related('first_semester', 'second_semester').first()
 
@@ -15,17 +146,59 @@ def check_event_is_semester_end(event_type):
     return event_type in SEMESTER_END_EVENTS
 
 
+def get_second_semester_end_event_type(class_grade_arabic, is_technological_school):
+    if class_grade_arabic == 8:
+        return SchoolEvent.EventTypes.SECOND_SEMESTER_END_VIII_GRADE
+    if class_grade_arabic in [9, 10, 11] and is_technological_school:
+        return SchoolEvent.EventTypes.SECOND_SEMESTER_END_IX_XI_FILIERA_TEHNOLOGICA
+    if class_grade_arabic in [12, 13]:
+        return SchoolEvent.EventTypes.SECOND_SEMESTER_END_XII_XIII_GRADE
+    return None
+
+
 def get_second_semester_end_events(current_calendar):
+    if settings.ACADEMIC_CALENDAR_CACHE_TIMEOUT:
+        context = get_current_academic_calendar_context()
+        if context.calendar and context.calendar.id == current_calendar.id:
+            return deepcopy(context.second_semester_end_events)
+
+    return _get_second_semester_end_events(current_calendar, _get_calendar_events(current_calendar))
+
+
+def get_calendar_index(calendar):
+    if settings.ACADEMIC_CALENDAR_CACHE_TIMEOUT:
+        context = get_current_academic_calendar_context()
+        if context.calendar and context.calendar.id == calendar.id:
+            return context.index
+
+    events = _get_calendar_events(calendar)
+    return CalendarIndex(calendar, events, _get_second_semester_end_events(calendar, events))
+
+
+def _get_calendar_events(calendar):
+    return list(SchoolEvent.objects.filter(Q(academic_year_calendar_id=calendar.id) | Q(semester_id=calendar.second_semester_id))
+                .order_by('starts_at', 'id'))
+
+
+def _get_second_semester_end_events(calendar, events):
+    second_semester_events = [event for event in events if event.semester_id == calendar.second_semester_id]
+    end_events = _get_first_event_by_type(second_semester_events)
     return {
-        SchoolEvent.EventTypes.SECOND_SEMESTER_END_VIII_GRADE: current_calendar.second_semester.school_events
-            .filter(event_type=SchoolEvent.EventTypes.SECOND_SEMESTER_END_VIII_GRADE).first(),
-        SchoolEvent.EventTypes.SECOND_SEMESTER_END_IX_XI_FILIERA_TEHNOLOGICA: current_calendar.second_semester.school_events
-            .filter(event_type=SchoolEvent.EventTypes.SECOND_SEMESTER_END_IX_XI_FILIERA_TEHNOLOGICA).first(),
-        SchoolEvent.EventTypes.SECOND_SEMESTER_END_XII_XIII_GRADE: current_calendar.second_semester.school_events
-            .filter(event_type=SchoolEvent.EventTypes.SECOND_SEMESTER_END_XII_XIII_GRADE).first(),
+        event_type: end_events.get(event_type) for event_type in [
+            SchoolEvent.EventTypes.SECOND_SEMESTER_END_VIII_GRADE,
+            SchoolEvent.EventTypes.SECOND_SEMESTER_END_IX_XI_FILIERA_TEHNOLOGICA,
+            SchoolEvent.EventTypes.SECOND_SEMESTER_END_XII_XIII_GRADE
+        ]
     }
 
 
+def _get_first_event_by_type(events):
+    events_by_type = {}
+    for event in events:
+        events_by_type.setdefault(event.event_type, event)
+    return events_by_type
+
+
 def generate_next_year_academic_calendar():
     current_calendar = get_current_academic_calendar()
     next_year = current_calendar.academic_year + 1
@@ -68,3 +241,4 @@ def generate_next_year_academic_calendar():
             ends_at=event.ends_at + relativedelta(years=1)
         ))
     SchoolEvent.objects.bulk_create(events_to_create)
+    invalidate_academic_calendar_cache()
@@ -9,6 +9,7 @@ from edualert.schools.constants import PROFILES_WITH_CORE_SUBJECTS
 from edualert.study_classes.constants import CLASS_GRADE_MAPPING
 from edualert.subjects.models import ProgramSubjectThrough, Subject
 from edualert.subjects.serializers import ProgramSubjectThroughSerializer, OptionalProgramSubjectThroughSerializer
+from edualert.subjects.utils import invalidate_curriculum_cache
 
 
 class GenericAcademicProgramSerializer(serializers.ModelSerializer):
@@ -143,6 +144,7 @@ class AcademicProgramCreateSerializer(serializers.ModelSerializer):
             )
 
         ProgramSubjectThrough.objects.bulk_create(program_subject_through_set)
+        invalidate_curriculum_cache()
 
     def to_representation(self, instance):
         serializer = AcademicProgramDetailSerializer(instance=instance)
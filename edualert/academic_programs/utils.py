@@ -2,6 +2,7 @@ from edualert.academic_calendars.utils import get_current_academic_calendar
 from edualert.academic_programs.models import AcademicProgram
 from edualert.common.utils import clone_object_and_override_fields
 from edualert.subjects.models import ProgramSubjectThrough
+from edualert.subjects.utils import invalidate_curriculum_cache
 
 
 def generate_next_year_academic_programs():
@@ -31,3 +32,4 @@ def generate_next_year_academic_programs():
                 subject_through, save=False, academic_program=cloned_programs[index])
             )
     ProgramSubjectThrough.objects.bulk_create(program_subjects_through_to_clone, batch_size=100)
+    invalidate_curriculum_cache()
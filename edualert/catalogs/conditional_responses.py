@@ -0,0 +1,125 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.utils.translation import get_language
+from rest_framework import status
+from rest_framework.response import Response
+
+from edualert.academic_calendars.utils import ACADEMIC_CALENDAR_VERSION_KEY
+from edualert.subjects.utils import CURRICULUM_VERSION_KEY
+
+STUDY_CLASS_SCOPE = 'study_class'
+STUDENT_SCOPE = 'student'
+
+CATALOG_VERSION_KEY = 'catalog_version_{}_{}'
+
+
+def get_study_class_version_key(study_class_id):
+    return CATALOG_VERSION_KEY.format(STUDY_CLASS_SCOPE, study_class_id)
+
+
+def get_student_version_key(student_id):
+    return CATALOG_VERSION_KEY.format(STUDENT_SCOPE, student_id)
+
+
+def get_study_class_catalog_version_keys(study_class):
+    """
+    The study class' catalogs change when the study class changes, or when the catalogs of any of its students change.
+    """
+    student_ids = study_class.student_catalogs_per_year.values_list('student_id', flat=True)
+    return [get_study_class_version_key(study_class.id), *[get_student_version_key(student_id) for student_id in student_ids]]
+
+
+def get_student_catalog_version_keys(student):
+    """
+    The student's catalogs also include data of the student's study class (e.g. the teachers).
+    """
+    keys = [get_student_version_key(student.id)]
+    if student.student_in_class_id:
+        keys.append(get_study_class_version_key(student.student_in_class_id))
+    return keys
+
+
+def invalidate_catalogs(study_class_ids=(), student_ids=()):
+    """
+    To be called after the catalogs of the given students (grades, absences, averages, labels etc.) or the given
+    study classes (students, teachers, class master) were changed.
+    Each catalog gets a new random version, so a version is never reused after it's evicted from the cache.
+    """
+    keys = [get_study_class_version_key(study_class_id) for study_class_id in set(study_class_ids)] + \
+           [get_student_version_key(student_id) for student_id in set(student_ids) if student_id is not None]
+    if keys:
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+
+
+def get_catalog_versions(keys):
+    """
+    Returns the current versions of the given catalogs (the missing ones are given a new version).
+    """
+    versions = cache.get_many(keys)
+    missing_keys = [key for key in keys if key not in versions]
+    if missing_keys:
+        for key in missing_keys:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+        versions.update(cache.get_many(missing_keys))
+
+    return [versions.get(key, '') for key in keys]
+
+
+class ConditionalCatalogResponseMixin:
+    """
+    Adds an ETag to the response of a catalog view, derived from the versions of the catalogs it shows.
+    When the client already has the current version (sent in If-None-Match), a 304 response is returned,
+    without loading and serializing the catalogs.
+    Changes which aren't tracked by the catalog versions (e.g. a teacher's name) are picked up the next day at the latest.
+    """
+
+    def get_catalog_version_keys(self):
+        """
+        Override this to return the version keys of the catalogs shown by the view. The access checks
+        (which raise 404) must be done here, since this is called before the response is built.
+        """
+        raise NotImplementedError
+
+    def get_catalog_etag(self):
+        # The calendar and curriculum versions are counters, which are missing until they are first incremented
+        counters = cache.get_many([ACADEMIC_CALENDAR_VERSION_KEY, CURRICULUM_VERSION_KEY])
+        versions = [counters.get(ACADEMIC_CALENDAR_VERSION_KEY, 0), counters.get(CURRICULUM_VERSION_KEY, 0),
+                    *get_catalog_versions(self.get_catalog_version_keys())]
+
+        etag_data = '_'.join([
+            self.__class__.__name__, str(self.request.user.id), self.request.get_full_path(), get_language() or '',
+            str(timezone.now().date()), *[str(version) for version in versions]
+        ])
+        return '"{}"'.format(hashlib.md5(etag_data.encode('utf-8')).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        if not settings.CONDITIONAL_CATALOG_RESPONSES_ENABLED:
+            return super().get(request, *args, **kwargs)
+
+        etag = self.get_catalog_etag()
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            # Weak comparison, since the responses might have been compressed in the meantime
+            client_etags = [client_etag[2:] if client_etag.startswith('W/') else client_etag
+                            for client_etag in parse_etags(if_none_match)]
+            if etag in client_etags or '*' in client_etags:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                self.add_conditional_headers(response, etag)
+                return response
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self.add_conditional_headers(response, etag)
+        return response
+
+    @staticmethod
+    def add_conditional_headers(response, etag):
+        response['ETag'] = etag
+        # The clients can keep the response, but have to revalidate it every time
+        patch_cache_control(response, private=True, no_cache=True)
@@ -0,0 +1,56 @@
+# Generated by Django 3.0.4 on 2026-10-19 14:07
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without locking the catalog tables against writes, which can't be done inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('catalogs', '0014_auto_20200612_0855'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='examinationgrade',
+            index=models.Index(fields=['catalog_per_subject', 'grade_type', 'semester'], name='catalogs_ex_catalog_500d4d_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='studentcatalogpersubject',
+            index=models.Index(fields=['student', 'study_class', 'subject'], name='catalogs_st_student_a333ba_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='studentcatalogpersubject',
+            index=models.Index(condition=models.Q(is_enrolled=True), fields=['study_class', 'subject'], name='catalogs_sps_enrolled_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='studentcatalogpersubject',
+            index=models.Index(condition=models.Q(('is_at_risk', True), ('is_enrolled', True)), fields=['student', 'academic_year'], name='catalogs_sps_at_risk_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='studentcatalogperyear',
+            index=models.Index(fields=['student', 'academic_year'], name='catalogs_st_student_f4f2cf_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='studentcatalogperyear',
+            index=models.Index(fields=['academic_year', 'study_class'], name='catalogs_st_academi_16d97d_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='subjectabsence',
+            index=models.Index(fields=['student', 'taken_at'], name='catalogs_su_student_df2043_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='subjectabsence',
+            index=models.Index(condition=models.Q(is_founded=False), fields=['student', 'academic_year', 'semester'], name='catalogs_abs_unfounded_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='subjectgrade',
+            index=models.Index(fields=['student', 'taken_at'], name='catalogs_su_student_83be3b_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='subjectgrade',
+            index=models.Index(fields=['catalog_per_subject', 'semester'], name='catalogs_su_catalog_9e1ee6_idx'),
+        ),
+    ]
@@ -1,9 +1,11 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
 from django.utils.translation import gettext_lazy as _
 from django_extensions.db.models import TimeStampedModel
 
 from edualert.catalogs import constants
 from edualert.catalogs.models import StudentCatalogPerSubject
+from edualert.catalogs.signals import catalog_changed
 
 
 class ExaminationGrade(TimeStampedModel):
@@ -30,3 +32,10 @@ class ExaminationGrade(TimeStampedModel):
 
     class Meta:
         ordering = ['-taken_at', '-created']
+        indexes = [
+            models.Index(fields=['catalog_per_subject', 'grade_type', 'semester']),
+        ]
+
+
+post_save.connect(catalog_changed, sender=ExaminationGrade)
+post_delete.connect(catalog_changed, sender=ExaminationGrade)
@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
 from django.utils.translation import gettext_lazy as _
 
+from edualert.catalogs.signals import catalog_changed
+
 
 class StudentCatalogPerSubject(models.Model):
     student = models.ForeignKey("profiles.UserProfile", on_delete=models.CASCADE, related_name="student_catalogs_per_subject",
@@ -49,3 +52,15 @@ class StudentCatalogPerSubject(models.Model):
 
     def __str__(self):
         return f"StudentCatalogPerSubject {self.student.id} - {self.subject_name} ({self.academic_year})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'study_class', 'subject']),
+            models.Index(fields=['study_class', 'subject'], condition=models.Q(is_enrolled=True), name='catalogs_sps_enrolled_idx'),
+            models.Index(fields=['student', 'academic_year'], condition=models.Q(is_at_risk=True, is_enrolled=True),
+                         name='catalogs_sps_at_risk_idx'),
+        ]
+
+
+post_save.connect(catalog_changed, sender=StudentCatalogPerSubject)
+post_delete.connect(catalog_changed, sender=StudentCatalogPerSubject)
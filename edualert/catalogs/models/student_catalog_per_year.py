@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
 from django.utils.translation import gettext_lazy as _
 
+from edualert.catalogs.signals import catalog_changed
+
 
 class StudentCatalogPerYear(models.Model):
     student = models.ForeignKey("profiles.UserProfile", on_delete=models.CASCADE, related_name="student_catalogs_per_year",
@@ -54,3 +57,13 @@ class StudentCatalogPerYear(models.Model):
 
     def __str__(self):
         return f"StudentCatalogPerYear {self.student.id} ({self.academic_year})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'academic_year']),
+            models.Index(fields=['academic_year', 'study_class']),
+        ]
+
+
+post_save.connect(catalog_changed, sender=StudentCatalogPerYear)
+post_delete.connect(catalog_changed, sender=StudentCatalogPerYear)
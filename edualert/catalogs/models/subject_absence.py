@@ -1,7 +1,9 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
 from django_extensions.db.models import TimeStampedModel
 
 from edualert.catalogs.models import StudentCatalogPerSubject
+from edualert.catalogs.signals import catalog_changed
 
 
 class SubjectAbsence(TimeStampedModel):
@@ -22,3 +24,12 @@ class SubjectAbsence(TimeStampedModel):
 
     class Meta:
         ordering = ['-taken_at', '-created']
+        indexes = [
+            models.Index(fields=['student', 'taken_at']),
+            models.Index(fields=['student', 'academic_year', 'semester'], condition=models.Q(is_founded=False),
+                         name='catalogs_abs_unfounded_idx'),
+        ]
+
+
+post_save.connect(catalog_changed, sender=SubjectAbsence)
+post_delete.connect(catalog_changed, sender=SubjectAbsence)
@@ -1,8 +1,10 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
 from django_extensions.db.models import TimeStampedModel
 
 from edualert.catalogs import constants
 from edualert.catalogs.models import StudentCatalogPerSubject
+from edualert.catalogs.signals import catalog_changed
 
 
 class SubjectGrade(TimeStampedModel):
@@ -25,3 +27,11 @@ class SubjectGrade(TimeStampedModel):
 
     class Meta:
         ordering = ['-taken_at', '-created']
+        indexes = [
+            models.Index(fields=['student', 'taken_at']),
+            models.Index(fields=['catalog_per_subject', 'semester']),
+        ]
+
+
+post_save.connect(catalog_changed, sender=SubjectGrade)
+post_delete.connect(catalog_changed, sender=SubjectGrade)
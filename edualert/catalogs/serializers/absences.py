@@ -4,6 +4,7 @@ from edualert.catalogs.models import SubjectAbsence
 from edualert.catalogs.serializers import StudentCatalogPerSubjectSerializer
 from edualert.catalogs.serializers.common import SubjectGradeAbsenceCreateBulkBaseSerializer, validate_and_get_semester
 from edualert.catalogs.utils import update_last_change_in_catalog, change_absences_counts_on_add, change_absence_counts_on_bulk_add
+from edualert.statistics.activity_feed import create_student_activities
 
 
 class SubjectAbsenceCreateSerializer(serializers.ModelSerializer):
@@ -61,6 +62,7 @@ class SubjectAbsenceCreateBulkSerializer(SubjectGradeAbsenceCreateBulkBaseSerial
 
         instances = SubjectAbsence.objects.bulk_create(instances_to_create)
         change_absence_counts_on_bulk_add(instances, semester)
+        create_student_activities(absences=instances)
 
         update_last_change_in_catalog(self.context['request'].user.user_profile)
         return instances
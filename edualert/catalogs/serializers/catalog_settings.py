@@ -3,6 +3,7 @@ from django.utils.translation import gettext as _
 from rest_framework import serializers
 
 from edualert.academic_calendars.utils import get_current_academic_calendar
+from edualert.catalogs.conditional_responses import invalidate_catalogs
 from edualert.catalogs.models import StudentCatalogPerSubject
 from edualert.catalogs.utils import compute_averages
 from edualert.profiles.constants import EXEMPTED_SPORT_LABEL, EXEMPTED_RELIGION_LABEL
@@ -49,6 +50,7 @@ class CatalogSettingsListSerializer(serializers.ListSerializer):
         if instances_to_update:
             StudentCatalogPerSubject.objects.bulk_update(instances_to_update, ['wants_level_testing_grade', 'wants_thesis',
                                                                                'wants_simulation', 'is_exempted', 'is_enrolled'])
+            invalidate_catalogs(student_ids=[catalog.student_id for catalog in instances_to_update])
             current_calendar = get_current_academic_calendar()
             if not current_calendar:
                 semester = 1
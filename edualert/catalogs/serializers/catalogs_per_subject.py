@@ -4,7 +4,8 @@ from rest_framework import serializers
 
 from edualert.academic_calendars.utils import get_current_academic_calendar
 from edualert.catalogs.models import StudentCatalogPerSubject, SubjectAbsence, ExaminationGrade, SubjectGrade
-from edualert.catalogs.utils import get_avg_limit_for_subject, has_technological_category, get_working_weeks_count, get_weekly_hours_count
+from edualert.catalogs.utils import get_avg_limit_for_subject, has_technological_category, get_working_weeks_count, get_weekly_hours_count, \
+    get_weekly_hours_counts
 from edualert.profiles.models import UserProfile
 from edualert.profiles.serializers.users import StudentBaseSerializer, UserProfileBaseSerializer, LabelSerializer
 from edualert.study_classes.serializers import StudyClassNameSerializer
@@ -60,6 +61,9 @@ class StudentCatalogPerSubjectWithTeacherSerializer(serializers.ModelSerializer)
 
     @lru_cache(maxsize=None)
     def get_weekly_hours_count(self, obj):
+        weekly_hours_counts = self.context.get('weekly_hours_counts', {})
+        if (obj.study_class_id, obj.subject_id) in weekly_hours_counts:
+            return weekly_hours_counts[(obj.study_class_id, obj.subject_id)]
         return get_weekly_hours_count(obj.study_class, obj.subject_id)
 
     @lru_cache(maxsize=None)
@@ -140,16 +144,22 @@ class PupilStudyClassSerializer(serializers.ModelSerializer):
         study_class = self.context['study_class']
         is_technological_school = has_technological_category(study_class.school_unit)
 
+        catalogs = list(
+            obj.student_catalogs_per_subject.filter(study_class=study_class, is_enrolled=True)
+                .select_related('teacher', 'study_class__school_unit__academic_profile', 'study_class__academic_program')
+                .prefetch_related('grades', 'absences', 'examination_grades')
+                .order_by('-is_coordination_subject', Lower('subject_name'))
+        )
+        weekly_hours_counts = get_weekly_hours_counts(study_class, [catalog.subject_id for catalog in catalogs])
+
         self.context.update({
             'working_weeks_count_sem1': get_working_weeks_count(calendar, 1, study_class, is_technological_school),
-            'working_weeks_count_sem2': get_working_weeks_count(calendar, 2, study_class, is_technological_school)
+            'working_weeks_count_sem2': get_working_weeks_count(calendar, 2, study_class, is_technological_school),
+            'weekly_hours_counts': {(study_class.id, subject_id): count for subject_id, count in weekly_hours_counts.items()}
         })
 
         return StudentCatalogPerSubjectWithTeacherSerializer(
-            instance=obj.student_catalogs_per_subject.filter(study_class=study_class, is_enrolled=True)
-                .select_related('teacher', 'study_class__school_unit__academic_profile', 'study_class__academic_program')
-                .prefetch_related('grades', 'absences', 'examination_grades')
-                .order_by('-is_coordination_subject', Lower('subject_name')),
+            instance=catalogs,
             many=True,
             context=self.context
         ).data
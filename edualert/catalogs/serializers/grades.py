@@ -3,11 +3,13 @@ from django.utils.translation import gettext as _
 from rest_framework import serializers
 
 from edualert.academic_calendars.utils import get_current_academic_calendar
+from edualert.catalogs.conditional_responses import invalidate_catalogs
 from edualert.catalogs.models import SubjectGrade
 from edualert.catalogs.serializers import StudentCatalogPerSubjectSerializer
 from edualert.catalogs.serializers.common import SubjectGradeAbsenceCreateBulkBaseSerializer
 from edualert.catalogs.utils import update_last_change_in_catalog, compute_averages
 from edualert.catalogs.tasks import update_behavior_grades_task
+from edualert.statistics.activity_feed import create_student_activities
 
 
 class SubjectGradeCreateUpdateBaseSerializer(serializers.ModelSerializer):
@@ -143,6 +145,8 @@ class SubjectGradeCreateBulkSerializer(SubjectGradeAbsenceCreateBulkBaseSerializ
             )
 
         instances = SubjectGrade.objects.bulk_create(instances_to_create)
+        create_student_activities(grades=instances)
+        invalidate_catalogs(student_ids=[instance.student_id for instance in instances])
 
         compute_averages(list(set(instance.catalog_per_subject for instance in instances)), semester)
         update_last_change_in_catalog(self.context['request'].user.user_profile)
@@ -0,0 +1,3 @@
+def catalog_changed(sender, instance, **kwargs):
+    from edualert.catalogs.conditional_responses import invalidate_catalogs
+    invalidate_catalogs(student_ids=[instance.student_id])
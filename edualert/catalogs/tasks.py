@@ -4,10 +4,14 @@ from celery import shared_task
 from django.db.models import Avg, Q, Sum
 from django.utils import timezone
 
+from edualert.catalogs.conditional_responses import invalidate_catalogs
 from edualert.catalogs.models import StudentCatalogPerSubject, SubjectGrade, StudentCatalogPerYear
+from edualert.common.reporting_database import reads_from_reporting_database
 from edualert.profiles.constants import FAILING_1_SUBJECT_LABEL, FAILING_2_SUBJECTS_LABEL
 from edualert.profiles.models import UserProfile, Label
+from edualert.schools.models import RegisteredSchoolUnit
 from edualert.statistics.models import SchoolUnitStats
+from edualert.statistics.response_cache import invalidate_school_unit_statistics, invalidate_all_statistics
 from edualert.study_classes.models import StudyClass
 from edualert.subjects.models import Subject
 
@@ -16,6 +20,7 @@ from edualert.subjects.models import Subject
 def calculate_students_risk_level_task():
     from edualert.catalogs.utils import calculate_students_risk_level
     calculate_students_risk_level()
+    invalidate_all_statistics()
 
 
 @shared_task
@@ -36,8 +41,20 @@ def calculate_students_placements_task():
     calculate_student_placements()
 
 
+@shared_task
+@reads_from_reporting_database
+def generate_school_catalogs_archive_task(school_unit_id, academic_year):
+    from edualert.catalogs.utils import generate_school_catalogs_archive
+
+    school_unit = RegisteredSchoolUnit.objects.filter(id=school_unit_id).first()
+    if school_unit:
+        generate_school_catalogs_archive(school_unit, academic_year)
+
+
 @shared_task()
 def create_behavior_grades_task(student_ids):
+    from edualert.statistics.activity_feed import create_student_activities
+
     coordination_subject = Subject.objects.get(is_coordination=True)
     taken_at = timezone.now().date()
     grades = []
@@ -63,7 +80,9 @@ def create_behavior_grades_task(student_ids):
                              grade_type=SubjectGrade.GradeTypes.REGULAR, grade=10)
             )
     SubjectGrade.objects.bulk_create(grades)
+    create_student_activities(grades=grades)
     StudentCatalogPerSubject.objects.bulk_update(catalogs_to_update, ['avg_sem1', 'avg_sem2', 'avg_annual', 'avg_final'])
+    invalidate_catalogs(student_ids=[catalog.student_id for catalog in catalogs_to_update])
 
 
 @shared_task()
@@ -113,6 +132,7 @@ def update_averages_for_students_task(student_ids, study_class_id, academic_year
 
     # Update averages for school_unit
     update_school_unit_averages(study_class.school_unit_id, academic_year)
+    invalidate_school_unit_statistics(study_class.school_unit_id)
 
 
 def update_catalog_per_year_averages(student_id, study_class_id, core_subject):
@@ -207,6 +227,7 @@ def update_absences_counts_for_students_task(catalog_ids):
 
     # Update absences averages for school_unit
     update_school_unit_absences(study_class.school_unit_id, study_class.academic_year)
+    invalidate_school_unit_statistics(study_class.school_unit_id)
 
 
 def update_catalog_per_year_absences(student_id, study_class_id):
@@ -316,3 +316,27 @@ class StudentPlacementTestCase(CommonAPITestCase):
         self.assertEqual(catalog5.school_place_by_abs_annual, 1)
         self.assertEqual(catalog4.class_place_by_abs_annual, 1)
         self.assertEqual(catalog5.class_place_by_abs_annual, 1)
+
+    @patch('django.utils.timezone.now', return_value=datetime(2020, 12, 11).replace(tzinfo=utc))
+    def test_student_placement_by_annual_absences(self, mocked_method):
+        catalog1 = StudentCatalogPerYearFactory(
+            study_class=self.study_class,
+            abs_count_sem1=4,
+            abs_count_sem2=1,
+            abs_count_annual=5
+        )
+        catalog2 = StudentCatalogPerYearFactory(
+            study_class=self.study_class,
+            abs_count_sem1=1,
+            abs_count_sem2=2,
+            abs_count_annual=3
+        )
+
+        self.assertTrue(calculate_student_placements())
+        catalog1.refresh_from_db()
+        catalog2.refresh_from_db()
+
+        self.assertEqual(catalog1.school_place_by_abs_sem2, 2)
+        self.assertEqual(catalog2.school_place_by_abs_sem2, 1)
+        self.assertEqual(catalog1.school_place_by_abs_annual, 1)
+        self.assertEqual(catalog2.school_place_by_abs_annual, 2)
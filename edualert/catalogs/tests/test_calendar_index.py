@@ -0,0 +1,136 @@
+import datetime
+import random
+from unittest.mock import patch
+
+from django.utils import timezone
+from pytz import utc
+
+from edualert.academic_calendars.constants import SEMESTER_END_EVENTS
+from edualert.academic_calendars.factories import AcademicYearCalendarFactory, SchoolEventFactory
+from edualert.academic_calendars.models import AcademicYearCalendar, SemesterCalendar, SchoolEvent
+from edualert.academic_calendars.utils import CalendarIndex, check_event_is_semester_end
+from edualert.catalogs.utils import can_update_grades_or_absences, get_current_semester
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.schools.factories import RegisteredSchoolUnitFactory, SchoolUnitCategoryFactory
+from edualert.study_classes.factories import StudyClassFactory
+
+OTHER_EVENTS = [event_type for event_type in SchoolEvent.EventTypes.values if event_type not in SEMESTER_END_EVENTS]
+
+
+def random_date(rng, starts_at, ends_at):
+    return starts_at + datetime.timedelta(days=rng.randint(0, (ends_at - starts_at).days))
+
+
+def generate_calendar(rng):
+    first_semester = SemesterCalendar(id=1, starts_at=random_date(rng, datetime.date(2019, 9, 1), datetime.date(2019, 9, 20)),
+                                      ends_at=random_date(rng, datetime.date(2019, 12, 15), datetime.date(2020, 1, 31)))
+    second_semester = SemesterCalendar(id=2, starts_at=random_date(rng, datetime.date(2020, 2, 1), datetime.date(2020, 2, 20)),
+                                       ends_at=random_date(rng, datetime.date(2020, 6, 1), datetime.date(2020, 6, 30)))
+    calendar = AcademicYearCalendar(id=1, academic_year=2020, first_semester=first_semester, second_semester=second_semester)
+
+    events = []
+    for _ in range(rng.randint(0, 8)):
+        starts_at = random_date(rng, datetime.date(2019, 8, 25), datetime.date(2020, 8, 31))
+        event = SchoolEvent(event_type=rng.choice(OTHER_EVENTS), starts_at=starts_at,
+                            ends_at=starts_at + datetime.timedelta(days=rng.randint(0, 20)))
+        if rng.random() < 0.5:
+            event.academic_year_calendar = calendar
+        else:
+            event.semester = second_semester
+        events.append(event)
+    for event_type in SEMESTER_END_EVENTS:
+        if rng.random() < 0.7:
+            ends_at = random_date(rng, datetime.date(2020, 5, 1), datetime.date(2020, 7, 15))
+            events.append(SchoolEvent(event_type=event_type, starts_at=ends_at, ends_at=ends_at, semester=second_semester))
+
+    events.sort(key=lambda event: event.starts_at)
+    return calendar, events
+
+
+def get_second_semester_end_events(calendar, events):
+    end_events = {}
+    for event in events:
+        if event.semester_id == calendar.second_semester_id and check_event_is_semester_end(event.event_type):
+            end_events.setdefault(event.event_type, event)
+    return end_events
+
+
+def is_editable(today, calendar, events, class_grade_arabic, is_technological_school):
+    """
+    The checks done by can_update_grades_or_absences before the calendar index was introduced.
+    """
+    second_semester_end_event = None
+    if class_grade_arabic == 8:
+        event_type = SchoolEvent.EventTypes.SECOND_SEMESTER_END_VIII_GRADE
+    elif class_grade_arabic in [9, 10, 11] and is_technological_school:
+        event_type = SchoolEvent.EventTypes.SECOND_SEMESTER_END_IX_XI_FILIERA_TEHNOLOGICA
+    elif class_grade_arabic in [12, 13]:
+        event_type = SchoolEvent.EventTypes.SECOND_SEMESTER_END_XII_XIII_GRADE
+    else:
+        event_type = None
+    for event in events:
+        if event.event_type == event_type:
+            second_semester_end_event = event
+            break
+
+    second_semester_end = second_semester_end_event.ends_at if second_semester_end_event else calendar.second_semester.ends_at
+    if not calendar.first_semester.starts_at <= today <= calendar.first_semester.ends_at and not \
+            calendar.second_semester.starts_at <= today <= second_semester_end:
+        return False
+
+    for event in events:
+        if not check_event_is_semester_end(event.event_type) and event.starts_at < today < event.ends_at:
+            return False
+
+    return True
+
+
+class CalendarIndexTestCase(CommonAPITestCase):
+    def test_calendar_index_matches_the_calendar_rules(self):
+        rng = random.Random(2020)
+        dates = [datetime.date(2019, 8, 1) + datetime.timedelta(days=day) for day in range(420)]
+
+        for _ in range(25):
+            calendar, events = generate_calendar(rng)
+            second_semester_end_events = get_second_semester_end_events(calendar, events)
+            index = CalendarIndex(calendar, events, second_semester_end_events)
+
+            for class_grade_arabic in range(0, 14):
+                for is_technological_school in [False, True]:
+                    expected_semesters = [get_current_semester(date, calendar, second_semester_end_events, class_grade_arabic, is_technological_school)
+                                          for date in dates]
+                    expected_editable = [is_editable(date, calendar, events, class_grade_arabic, is_technological_school)
+                                         for date in dates]
+
+                    self.assertEqual(index.get_semesters(dates, class_grade_arabic, is_technological_school), expected_semesters)
+                    self.assertEqual(index.are_editable(dates, class_grade_arabic, is_technological_school), expected_editable)
+
+                    date = rng.choice(dates)
+                    self.assertEqual(index.get_semester(date, class_grade_arabic, is_technological_school),
+                                     expected_semesters[dates.index(date)])
+                    self.assertEqual(index.is_editable(date, class_grade_arabic, is_technological_school),
+                                     expected_editable[dates.index(date)])
+
+    def test_can_update_grades_or_absences_matches_the_calendar_rules(self):
+        calendar = AcademicYearCalendarFactory()
+        school_unit = RegisteredSchoolUnitFactory()
+        school_unit.categories.add(SchoolUnitCategoryFactory(name='Liceu - Filieră Tehnologică'))
+        # The first semester events aren't taken into account
+        SchoolEventFactory(semester=calendar.first_semester, event_type=SchoolEvent.EventTypes.WINTER_HOLIDAY,
+                           starts_at=datetime.date(2019, 10, 1), ends_at=datetime.date(2019, 10, 20))
+        SchoolEventFactory(semester=calendar.second_semester, event_type=SchoolEvent.EventTypes.SPRING_HOLIDAY,
+                           starts_at=datetime.date(2020, 4, 10), ends_at=datetime.date(2020, 4, 20))
+        SchoolEventFactory(academic_year_calendar=calendar, event_type=SchoolEvent.EventTypes.LEGAL_PUBLIC_HOLIDAY,
+                           starts_at=datetime.date(2019, 11, 29), ends_at=datetime.date(2019, 12, 2))
+        SchoolEventFactory(semester=calendar.second_semester, event_type=SchoolEvent.EventTypes.SECOND_SEMESTER_END_IX_XI_FILIERA_TEHNOLOGICA,
+                           starts_at=datetime.date(2020, 5, 22), ends_at=datetime.date(2020, 5, 22))
+        events = list(calendar.school_events.all() | calendar.second_semester.school_events.all())
+
+        study_classes = [StudyClassFactory(school_unit=school_unit, class_grade_arabic=class_grade_arabic)
+                         for class_grade_arabic in [5, 8, 10, 12]]
+        for day in range(0, 400, 3):
+            date = datetime.date(2019, 8, 15) + datetime.timedelta(days=day)
+            with patch('django.utils.timezone.now', return_value=timezone.datetime(date.year, date.month, date.day).replace(tzinfo=utc)):
+                for study_class in study_classes:
+                    self.assertEqual(can_update_grades_or_absences(study_class),
+                                     is_editable(date, calendar, events, study_class.class_grade_arabic, True))
@@ -14,6 +14,7 @@ from edualert.academic_calendars.models import SchoolEvent
 from edualert.catalogs.factories import StudentCatalogPerSubjectFactory, SubjectGradeFactory, ExaminationGradeFactory, StudentCatalogPerYearFactory
 from edualert.catalogs.models import SubjectGrade, ExaminationGrade
 from edualert.common.api_tests import CommonAPITestCase
+from edualert.common.models import ImportJob
 from edualert.profiles.factories import UserProfileFactory, LabelFactory
 from edualert.profiles.models import UserProfile
 from edualert.schools.factories import RegisteredSchoolUnitFactory
@@ -268,6 +269,19 @@ class CatalogImportTestCase(CommonAPITestCase):
         response = self.get_response(self.build_url(self.study_class.id, self.subject.id), file)
         self.assertError(response, 'Nume', "A catalog for this student and subject doesn't exist yet.")
 
+    def test_catalog_import_catalog_of_other_subject(self):
+        self.client.login(username=self.teacher.username, password='passwd')
+        self.catalog.delete()
+        other_catalog = StudentCatalogPerSubjectFactory(study_class=self.study_class, teacher=self.teacher, subject=SubjectFactory(),
+                                                        student=self.student, is_enrolled=True)
+
+        file = self.create_file(self.file_name)
+        self.write_data(file, self.data)
+
+        response = self.get_response(self.build_url(self.study_class.id, self.subject.id), file)
+        self.assertError(response, 'Nume', "A catalog for this student and subject doesn't exist yet.")
+        self.assertFalse(other_catalog.grades.exists())
+
     @data(
         'good, v good', 'vgood', 'good; good'
     )
@@ -734,4 +748,88 @@ class CatalogImportTestCase(CommonAPITestCase):
 
             self.assertFalse(catalog.is_exempted)
 
+    def test_catalog_import_empty_labels_and_absences(self):
+        self.client.login(username=self.teacher.username, password='passwd')
+        for field in ['Etichete', 'Absențe motivate sem. I', 'Absențe motivate sem. II', 'Absențe nemotivate sem. I', 'Absențe nemotivate sem. II']:
+            self.data[field] = ''
+
+        file = self.create_file(self.file_name)
+        self.write_data(file, self.data)
+
+        response = self.get_response(self.build_url(self.study_class.id, self.subject.id), file)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'errors': {}, 'report': '1 out of 1 catalog saved successfully.'})
+
+        self.assertEqual(self.student.labels.count(), 0)
+        self.catalog.refresh_from_db()
+        self.assertEqual(self.catalog.absences.count(), 0)
+        self.assertEqual(self.catalog.founded_abs_count_annual, 0)
+        self.assertEqual(self.catalog.unfounded_abs_count_annual, 0)
+
+    def test_catalog_import_async(self):
+        self.client.login(username=self.teacher.username, password='passwd')
+        file = self.create_file(self.file_name)
+        self.write_data(file, self.data)
+
+        response = self.get_response(self.build_url(self.study_class.id, self.subject.id) + '?async=true', file)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        import_job = ImportJob.objects.get(id=response.data['id'])
+        self.assertEqual(import_job.import_type, ImportJob.ImportTypes.CATALOGS)
+        self.assertEqual(import_job.study_class, self.study_class)
+        self.assertEqual(import_job.subject, self.subject)
+        self.assertEqual(import_job.status, ImportJob.Statuses.FINISHED)
+        self.assertEqual(import_job.processed_rows_count, 1)
+        self.assertEqual(import_job.report, {'errors': {}, 'report': '1 out of 1 catalog saved successfully.'})
+
+        self.catalog.refresh_from_db()
+        self.assertEqual(self.catalog.remarks, self.data['Observații'])
+
+    def test_catalog_import_dry_run_success(self):
+        self.client.login(username=self.teacher.username, password='passwd')
+        file = self.create_file(self.file_name)
+        self.write_data(file, self.data)
+
+        response = self.get_response(self.build_url(self.study_class.id, self.subject.id) + '?dry_run=true', file)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'errors': {}, 'report': '1 out of 1 catalog can be saved.'})
+
+        # Nothing was saved
+        self.catalog.refresh_from_db()
+        self.assertIsNone(self.catalog.remarks)
+        self.assertFalse(self.catalog.grades.exists())
+        self.assertFalse(self.catalog.absences.exists())
+        self.assertFalse(self.catalog.examination_grades.exists())
+        self.assertFalse(self.student.labels.exists())
+
+    def test_catalog_import_dry_run_catalog_of_other_subject(self):
+        self.client.login(username=self.teacher.username, password='passwd')
+        self.catalog.delete()
+        StudentCatalogPerSubjectFactory(study_class=self.study_class, teacher=self.teacher, subject=SubjectFactory(), student=self.student)
+
+        file = self.create_file(self.file_name)
+        self.write_data(file, self.data)
+
+        response = self.get_response(self.build_url(self.study_class.id, self.subject.id) + '?dry_run=true', file)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'errors': {1: {'Nume': "A catalog for this student and subject doesn't exist yet."}},
+            'report': '0 out of 1 catalog can be saved.'
+        })
+
+    def test_catalog_import_dry_run_reports_same_errors_as_import(self):
+        self.client.login(username=self.teacher.username, password='passwd')
+        file = self.create_file(self.file_name)
+        writer = self.write_data(file, {**self.data, 'Nume': 'Ceva nume'})
+        writer.writerow({**self.data, 'Absențe motivate sem. II': '12-12-2019', 'Etichete': 'good; inexistent'})
+        writer.writerow({**self.data, 'Note sem. II': '4-4-2020: 11'})
+        writer.writerow(self.data)
+
+        url = self.build_url(self.study_class.id, self.subject.id)
+        dry_run_response = self.get_response(url + '?dry_run=true', file)
+        self.assertEqual(dry_run_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(dry_run_response.data['report'], '1 out of 4 catalogs can be saved.')
+        self.assertCountEqual(dry_run_response.data['errors'].keys(), [1, 2, 3])
 
+        response = self.get_response(url, file)
+        self.assertEqual(dry_run_response.data['errors'], response.data['errors'])
@@ -6,18 +6,24 @@ from django.urls import reverse
 from rest_framework import status
 
 from edualert.academic_calendars.factories import AcademicYearCalendarFactory
-from edualert.catalogs.factories import StudentCatalogPerSubjectFactory, SubjectGradeFactory, SubjectAbsenceFactory, ExaminationGradeFactory
+from edualert.catalogs.factories import StudentCatalogPerSubjectFactory, SubjectGradeFactory, SubjectAbsenceFactory, ExaminationGradeFactory, \
+    StudentCatalogPerYearFactory
 from edualert.catalogs.models import SubjectGrade, ExaminationGrade, StudentCatalogPerSubject
-from edualert.common.api_tests import CommonAPITestCase
+from edualert.common.api_tests import CommonAPITestCase, RequestBudget
 from edualert.profiles.factories import UserProfileFactory
 from edualert.profiles.models import UserProfile
 from edualert.schools.factories import RegisteredSchoolUnitFactory
 from edualert.study_classes.factories import StudyClassFactory, TeacherClassThroughFactory
 from edualert.subjects.factories import SubjectFactory, ProgramSubjectThroughFactory
+from edualert.subjects.utils import invalidate_curriculum_cache
 
 
 @ddt
 class OwnStudyClassCatalogPerSubjectTestCase(CommonAPITestCase):
+    request_budgets = {
+        'catalogs:own-study-class-catalog-by-subject': RequestBudget(queries=16)
+    }
+
     @classmethod
     def setUpTestData(cls):
         cls.calendar = AcademicYearCalendarFactory()
@@ -400,3 +406,38 @@ class OwnStudyClassCatalogPerSubjectTestCase(CommonAPITestCase):
 
         for catalog_data, catalog in zip(response.data, StudentCatalogPerSubject.objects.annotate(last_grade_date=Max('grade__taken_at')).order_by('-last_grade_date')):
             self.assertEqual(catalog_data['id'], catalog.id)
+
+    def test_own_study_class_catalog_per_subject_conditional_response(self):
+        self.client.login(username=self.teacher.username, password='passwd')
+        student = UserProfileFactory(user_role=UserProfile.UserRoles.STUDENT, school_unit=self.school_unit, student_in_class=self.study_class)
+        StudentCatalogPerYearFactory(student=student, study_class=self.study_class)
+        catalog = StudentCatalogPerSubjectFactory(subject=self.subject, teacher=self.teacher, student=student, study_class=self.study_class)
+
+        response = self.client.get(self.build_url(self.study_class.id, self.subject.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(self.build_url(self.study_class.id, self.subject.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        # A change in another study class doesn't change the ETag
+        other_study_class = StudyClassFactory(school_unit=self.school_unit)
+        other_student = UserProfileFactory(user_role=UserProfile.UserRoles.STUDENT, school_unit=self.school_unit, student_in_class=other_study_class)
+        StudentCatalogPerYearFactory(student=other_student, study_class=other_study_class)
+        SubjectGradeFactory(student=other_student, catalog_per_subject=StudentCatalogPerSubjectFactory(student=other_student, study_class=other_study_class))
+        response = self.client.get(self.build_url(self.study_class.id, self.subject.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # The weekly hours are part of the response
+        invalidate_curriculum_cache()
+        response = self.client.get(self.build_url(self.study_class.id, self.subject.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        SubjectGradeFactory(student=student, catalog_per_subject=catalog)
+        response = self.client.get(self.build_url(self.study_class.id, self.subject.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data[0]['grades_sem1']), 1)
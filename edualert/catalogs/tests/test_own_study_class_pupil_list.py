@@ -4,7 +4,7 @@ from rest_framework import status
 
 from edualert.catalogs.factories import StudentCatalogPerYearFactory
 from edualert.catalogs.models import StudentCatalogPerYear
-from edualert.common.api_tests import CommonAPITestCase
+from edualert.common.api_tests import CommonAPITestCase, RequestBudget
 from edualert.profiles.factories import UserProfileFactory
 from edualert.profiles.models import UserProfile
 from edualert.schools.factories import RegisteredSchoolUnitFactory
@@ -13,6 +13,10 @@ from edualert.study_classes.factories import StudyClassFactory, TeacherClassThro
 
 @ddt
 class OwnStudyClassPupilListTestCase(CommonAPITestCase):
+    request_budgets = {
+        'catalogs:own-study-class-pupil-list': RequestBudget(queries=9)
+    }
+
     @classmethod
     def setUpTestData(cls):
         cls.school_unit = RegisteredSchoolUnitFactory()
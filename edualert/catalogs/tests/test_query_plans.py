@@ -0,0 +1,117 @@
+import datetime
+
+from django.db import connection
+
+from edualert.catalogs.factories import StudentCatalogPerSubjectFactory, StudentCatalogPerYearFactory, SubjectGradeFactory, \
+    SubjectAbsenceFactory, ExaminationGradeFactory
+from edualert.catalogs.models import StudentCatalogPerSubject, StudentCatalogPerYear, SubjectGrade, SubjectAbsence, ExaminationGrade
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.profiles.factories import UserProfileFactory
+from edualert.profiles.models import UserProfile
+from edualert.schools.factories import RegisteredSchoolUnitFactory
+from edualert.study_classes.factories import StudyClassFactory
+from edualert.subjects.factories import SubjectFactory
+
+
+class CatalogQueryPlansTestCase(CommonAPITestCase):
+    """
+    Checks which indexes answer the hot catalog queries. The sequential scans are disabled, since with the few seeded
+    rows they would always be cheaper; the index the planner picks instead has to be the one added for the query.
+    On so few rows, the indexes of the foreign keys which the added ones start with cost the same, and so do the bitmap
+    scans on any index of the filtered columns, so these indexes are dropped and the bitmap scans disabled as well.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_unit = RegisteredSchoolUnitFactory()
+        cls.study_class = StudyClassFactory(school_unit=cls.school_unit)
+        cls.subject = SubjectFactory()
+        cls.teacher = UserProfileFactory(user_role=UserProfile.UserRoles.TEACHER, school_unit=cls.school_unit)
+        # The teacher also teaches other subjects, so the filters by teacher are less selective than the ones by study class & subject
+        other_subjects = [SubjectFactory() for _ in range(3)]
+
+        for index in range(5):
+            student = UserProfileFactory(user_role=UserProfile.UserRoles.STUDENT, school_unit=cls.school_unit, student_in_class=cls.study_class)
+            StudentCatalogPerYearFactory(student=student, study_class=cls.study_class)
+            catalog = StudentCatalogPerSubjectFactory(student=student, teacher=cls.teacher, study_class=cls.study_class, subject=cls.subject,
+                                                      is_at_risk=index % 2 == 0)
+            for other_subject in other_subjects:
+                StudentCatalogPerSubjectFactory(student=student, teacher=cls.teacher, study_class=cls.study_class, subject=other_subject)
+            for day in range(1, 4):
+                SubjectGradeFactory(student=student, catalog_per_subject=catalog, taken_at=datetime.date(2020, 3, day))
+                SubjectAbsenceFactory(student=student, catalog_per_subject=catalog, taken_at=datetime.date(2020, 3, day), is_founded=day == 1)
+            ExaminationGradeFactory(student=student, catalog_per_subject=catalog)
+
+        cls.student = student
+        cls.catalog = catalog
+
+    def setUp(self):
+        tables = ('catalogs_studentcatalogpersubject', 'catalogs_studentcatalogperyear', 'catalogs_subjectgrade',
+                  'catalogs_subjectabsence', 'catalogs_examinationgrade')
+        with connection.cursor() as cursor:
+            # Like the settings below, only for the current transaction, which is rolled back after each test
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename IN %s AND "
+                           "(indexdef LIKE '%%(student_id)' OR indexdef LIKE '%%(catalog_per_subject_id)')", [tables])
+            for index_name, in cursor.fetchall():
+                cursor.execute('DROP INDEX {}'.format(index_name))
+            cursor.execute('ANALYZE {}'.format(', '.join(tables)))
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_bitmapscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        table = queryset.model._meta.db_table
+        plan = queryset.explain()
+        self.assertNotIn('Seq Scan on {}'.format(table), plan)
+        self.assertRegex(plan, r'(Index|Index Only) Scan( Backward)? using {0} on {1}'.format(index_name, table))
+
+    def test_catalog_per_subject_query_plans(self):
+        self.assertUsesIndex(
+            StudentCatalogPerSubject.objects.filter(student_id=self.student.id, study_class_id=self.study_class.id, subject_id=self.subject.id),
+            'catalogs_st_student_a333ba_idx'
+        )
+        self.assertUsesIndex(
+            StudentCatalogPerSubject.objects.filter(study_class_id=self.study_class.id, subject_id=self.subject.id,
+                                                    teacher_id=self.teacher.id, is_enrolled=True),
+            'catalogs_sps_enrolled_idx'
+        )
+        self.assertUsesIndex(
+            StudentCatalogPerSubject.objects.filter(student_id=self.student.id, academic_year=self.study_class.academic_year,
+                                                    is_at_risk=True, is_enrolled=True),
+            'catalogs_sps_at_risk_idx'
+        )
+
+    def test_catalog_per_year_query_plans(self):
+        self.assertUsesIndex(
+            StudentCatalogPerYear.objects.filter(student_id=self.student.id, academic_year=self.study_class.academic_year),
+            'catalogs_st_student_f4f2cf_idx'
+        )
+        self.assertUsesIndex(
+            StudentCatalogPerYear.objects.filter(student_id=self.student.id, study_class_id=self.study_class.id),
+            'catalogs_st_student_f4f2cf_idx'
+        )
+        self.assertUsesIndex(
+            StudentCatalogPerYear.objects.filter(study_class__school_unit_id=self.school_unit.id, academic_year=self.study_class.academic_year),
+            'catalogs_st_academi_16d97d_idx'
+        )
+
+    def test_grades_and_absences_query_plans(self):
+        self.assertUsesIndex(
+            SubjectGrade.objects.filter(student_id=self.student.id, taken_at__gte=datetime.date(2020, 3, 1), taken_at__lte=datetime.date(2020, 3, 7)),
+            'catalogs_su_student_83be3b_idx'
+        )
+        self.assertUsesIndex(
+            self.catalog.grades.filter(semester=1),
+            'catalogs_su_catalog_9e1ee6_idx'
+        )
+        self.assertUsesIndex(
+            SubjectAbsence.objects.filter(student_id=self.student.id, academic_year=2020, semester=2, is_founded=False),
+            'catalogs_abs_unfounded_idx'
+        )
+        self.assertUsesIndex(
+            self.student.absences.filter(taken_at__year=2020, taken_at__month=3),
+            'catalogs_su_student_df2043_idx'
+        )
+        self.assertUsesIndex(
+            self.catalog.examination_grades.filter(grade_type=ExaminationGrade.GradeTypes.DIFFERENCE, semester=1),
+            'catalogs_ex_catalog_500d4d_idx'
+        )
@@ -0,0 +1,109 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+
+from ddt import data, ddt
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from edualert.academic_calendars.factories import AcademicYearCalendarFactory
+from edualert.catalogs.factories import StudentCatalogPerSubjectFactory
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.profiles.factories import UserProfileFactory
+from edualert.profiles.models import UserProfile
+from edualert.schools.factories import RegisteredSchoolUnitFactory
+from edualert.study_classes.factories import StudyClassFactory, TeacherClassThroughFactory
+from edualert.subjects.factories import SubjectFactory
+
+
+@ddt
+class SchoolCatalogsArchiveTestCase(CommonAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = RegisteredSchoolUnitFactory()
+        cls.principal = cls.school.school_principal
+        cls.teacher = UserProfileFactory(user_role=UserProfile.UserRoles.TEACHER, school_unit=cls.school)
+        cls.study_class = StudyClassFactory(school_unit=cls.school, class_grade='IX', class_letter='B')
+        cls.subject1 = SubjectFactory(name='Matematică')
+        cls.subject2 = SubjectFactory(name='Limba Română')
+        for subject in [cls.subject1, cls.subject2]:
+            TeacherClassThroughFactory(study_class=cls.study_class, teacher=cls.teacher, subject=subject)
+        cls.catalog1 = StudentCatalogPerSubjectFactory(study_class=cls.study_class, teacher=cls.teacher, subject=cls.subject1, student__full_name='a')
+        cls.catalog2 = StudentCatalogPerSubjectFactory(study_class=cls.study_class, teacher=cls.teacher, subject=cls.subject2, student__full_name='b')
+        cls.current_calendar = AcademicYearCalendarFactory()
+        cls.url = reverse('catalogs:export-school-catalogs-archive')
+
+    def setUp(self):
+        private_files_root = tempfile.mkdtemp()
+        self.archives_root = os.path.join(private_files_root, 'catalog_archives')
+        settings_override = override_settings(PRIVATE_FILE_STORAGE_OPTIONS={'location': private_files_root})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, private_files_root)
+        cache.clear()
+
+    def test_school_catalogs_archive_unauthenticated(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @data(
+        UserProfile.UserRoles.ADMINISTRATOR,
+        UserProfile.UserRoles.TEACHER,
+        UserProfile.UserRoles.STUDENT,
+        UserProfile.UserRoles.PARENT
+    )
+    def test_school_catalogs_archive_wrong_user_type(self, user_role):
+        user = UserProfileFactory(user_role=user_role, school_unit=self.school if user_role != UserProfile.UserRoles.ADMINISTRATOR else None)
+        self.client.login(username=user.username, password='passwd')
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_school_catalogs_archive_no_calendar(self):
+        self.current_calendar.delete()
+        self.client.login(username=self.principal.username, password='passwd')
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_school_catalogs_archive_success(self):
+        self.client.login(username=self.principal.username, password='passwd')
+
+        # The first request starts generating the archive
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertCountEqual(archive.namelist(), ['IX_B/Matematică.csv', 'IX_B/Limba Română.csv'])
+
+        rows = list(csv.DictReader(io.StringIO(archive.read('IX_B/Matematică.csv').decode('utf-8'))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['Nume'], 'a')
+        self.assertEqual(rows[0]['Clasă'], 'IX B')
+
+    def test_school_catalogs_archive_regenerated_after_catalog_change(self):
+        self.client.login(username=self.principal.username, password='passwd')
+        self.client.get(self.url)
+        old_archives = os.listdir(self.archives_root)
+        self.assertEqual(len(old_archives), 1)
+
+        self.school.last_change_in_catalog = timezone.now()
+        self.school.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        # Only the archive for the latest catalog version is kept
+        new_archives = os.listdir(self.archives_root)
+        self.assertEqual(len(new_archives), 1)
+        self.assertNotEqual(old_archives, new_archives)
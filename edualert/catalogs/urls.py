@@ -30,5 +30,6 @@ urlpatterns = [
 
     # Export / import
     path('own-study-classes/<int:study_class_id>/subjects/<int:subject_id>/export/', views.ExportSubjectCatalogs.as_view(), name='export-subject-catalogs'),
-    path('own-study-classes/<int:study_class_id>/subjects/<int:subject_id>/import/', views.ImportSubjectCatalogs.as_view(), name='import-subject-catalogs')
+    path('own-study-classes/<int:study_class_id>/subjects/<int:subject_id>/import/', views.ImportSubjectCatalogs.as_view(), name='import-subject-catalogs'),
+    path('school-catalogs-archive/', views.ExportSchoolCatalogsArchive.as_view(), name='export-school-catalogs-archive'),
 ]
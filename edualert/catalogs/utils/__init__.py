@@ -1,12 +1,13 @@
 from .common import can_update_grades_or_absences, can_update_examination_grades, \
     update_last_change_in_catalog, has_technological_category, get_working_weeks_count, \
-    get_weekly_hours_count, get_current_semester
+    get_weekly_hours_count, get_weekly_hours_counts, get_current_semester, get_second_semester_end
 from .absences import change_absences_counts_on_add, change_absences_counts_on_authorize, \
     change_absences_counts_on_delete, change_absence_counts_on_bulk_add
 from .grades import compute_averages, get_avg_limit_for_subject, get_behavior_grade_limit, \
     change_averages_after_examination_grade_operation
 from .importer import CatalogsImporter
-from .exporter import get_catalog_csv_representation
+from .exporter import get_catalog_csv_representation, write_catalogs_csv
+from .school_archive import get_school_catalogs_archive_name, generate_school_catalogs_archive
 from .risk_levels import calculate_students_risk_level
 from .risk_alerts import send_alerts_for_risks
 from .student_placements import calculate_student_placements
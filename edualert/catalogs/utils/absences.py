@@ -1,3 +1,4 @@
+from edualert.catalogs.conditional_responses import invalidate_catalogs
 from edualert.catalogs.models import StudentCatalogPerSubject
 from edualert.catalogs.tasks import update_absences_counts_for_students_task
 
@@ -114,5 +115,6 @@ def change_absence_counts_on_bulk_add(absences, semester):
                             'founded_abs_count_sem2', 'founded_abs_count_annual']
 
     StudentCatalogPerSubject.objects.bulk_update(catalogs_to_update, fields_to_update)
+    invalidate_catalogs(student_ids=[catalog.student_id for catalog in catalogs_to_update])
     catalog_ids = [catalog.id for catalog in catalogs_to_update]
     update_absences_counts_for_students_task.delay(catalog_ids)
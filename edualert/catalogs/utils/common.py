@@ -1,44 +1,23 @@
-from django.db.models import Q
 from django.utils import timezone
 
 from edualert.academic_calendars.models import SchoolEvent
-from edualert.academic_calendars.utils import get_current_academic_calendar, check_event_is_semester_end
+from edualert.academic_calendars.utils import get_current_academic_calendar, get_current_academic_calendar_context, \
+    get_second_semester_end_event_type
 from edualert.catalogs.models import ExaminationGrade
-from edualert.subjects.models import ProgramSubjectThrough
+from edualert.subjects.utils import get_program_subjects_through
 
 
 def can_update_grades_or_absences(study_class):
-    today = timezone.now().date()
-    current_calendar = get_current_academic_calendar()
-    if current_calendar is None:
-        return False
-
-    if study_class.academic_year != current_calendar.academic_year:
+    current_calendar_context = get_current_academic_calendar_context()
+    if current_calendar_context.calendar is None:
         return False
 
-    events = current_calendar.school_events.all() | current_calendar.second_semester.school_events.all()
-
-    second_semester_end_event = None
-    if study_class.class_grade_arabic == 8:
-        second_semester_end_event = events.filter(event_type=SchoolEvent.EventTypes.SECOND_SEMESTER_END_VIII_GRADE).first()
-    elif study_class.class_grade_arabic in [9, 10, 11]:
-        if has_technological_category(study_class.school_unit):
-            second_semester_end_event = events.filter(
-                event_type=SchoolEvent.EventTypes.SECOND_SEMESTER_END_IX_XI_FILIERA_TEHNOLOGICA
-            ).first()
-    elif study_class.class_grade_arabic in [12, 13]:
-        second_semester_end_event = events.filter(event_type=SchoolEvent.EventTypes.SECOND_SEMESTER_END_XII_XIII_GRADE).first()
-
-    second_semester_end = second_semester_end_event.ends_at if second_semester_end_event else current_calendar.second_semester.ends_at
-    if not current_calendar.first_semester.starts_at <= today <= current_calendar.first_semester.ends_at and not \
-            current_calendar.second_semester.starts_at <= today <= second_semester_end:
+    if study_class.academic_year != current_calendar_context.calendar.academic_year:
         return False
 
-    for event in events:
-        if not check_event_is_semester_end(event.event_type) and event.starts_at < today < event.ends_at:
-            return False
-
-    return True
+    # Only the IX-XI grades have a different semester end for the technological schools
+    is_technological_school = study_class.class_grade_arabic in [9, 10, 11] and has_technological_category(study_class.school_unit)
+    return current_calendar_context.index.is_editable(timezone.now().date(), study_class.class_grade_arabic, is_technological_school)
 
 
 def can_update_examination_grades(study_class, grade_type):
@@ -65,12 +44,13 @@ def can_update_examination_grades(study_class, grade_type):
 def update_last_change_in_catalog(user_profile):
     now = timezone.now()
     user_profile.last_change_in_catalog = now
+    user_profile.save(update_fields=['last_change_in_catalog'])
     user_profile.school_unit.last_change_in_catalog = now
     user_profile.school_unit.save()
 
 
 def has_technological_category(school_unit):
-    return school_unit.categories.filter(name='Liceu - Filieră Tehnologică').exists()
+    return school_unit.is_technological
 
 
 def get_working_weeks_count(calendar, semester, study_class, is_technological_school):
@@ -96,34 +76,31 @@ def get_working_weeks_count(calendar, semester, study_class, is_technological_sc
 
 
 def get_weekly_hours_count(study_class, subject_id):
-    program_subject_through = ProgramSubjectThrough.objects \
-        .filter(Q(academic_program_id=study_class.academic_program_id) |
-                Q(generic_academic_program_id=study_class.academic_program.generic_academic_program_id),
-                subject_id=subject_id, class_grade=study_class.class_grade).first()
+    return get_weekly_hours_counts(study_class, [subject_id])[subject_id]
 
-    if program_subject_through:
-        return program_subject_through.weekly_hours_count
 
-    return 1
+def get_weekly_hours_counts(study_class, subject_ids):
+    return {
+        subject_id: program_subject_through.weekly_hours_count if program_subject_through else 1
+        for subject_id, program_subject_through in get_program_subjects_through(study_class, subject_ids).items()
+    }
 
 
 def get_current_semester(today, current_calendar, second_semester_end_events, class_grade_arabic, is_technological_school):
     if today < current_calendar.second_semester.starts_at:
         current_semester = 1
     else:
-        second_semester_end_event = None
-        if class_grade_arabic == 8:
-            second_semester_end_event = second_semester_end_events.get(SchoolEvent.EventTypes.SECOND_SEMESTER_END_VIII_GRADE)
-        elif class_grade_arabic in [9, 10, 11]:
-            if is_technological_school:
-                second_semester_end_event = second_semester_end_events.get(SchoolEvent.EventTypes.SECOND_SEMESTER_END_IX_XI_FILIERA_TEHNOLOGICA)
-        elif class_grade_arabic in [12, 13]:
-            second_semester_end_event = second_semester_end_events.get(SchoolEvent.EventTypes.SECOND_SEMESTER_END_XII_XIII_GRADE)
-
-        second_semester_end = second_semester_end_event.ends_at if second_semester_end_event else current_calendar.second_semester.ends_at
+        second_semester_end = get_second_semester_end(current_calendar, second_semester_end_events, class_grade_arabic, is_technological_school)
         if today < second_semester_end:
             current_semester = 2
         else:
             current_semester = None
 
     return current_semester
+
+
+def get_second_semester_end(current_calendar, second_semester_end_events, class_grade_arabic, is_technological_school):
+    second_semester_end_event = second_semester_end_events.get(
+        get_second_semester_end_event_type(class_grade_arabic, is_technological_school)
+    )
+    return second_semester_end_event.ends_at if second_semester_end_event else current_calendar.second_semester.ends_at
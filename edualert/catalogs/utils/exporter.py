@@ -1,3 +1,5 @@
+import csv
+
 from django.conf import settings
 
 from edualert.catalogs.models import ExaminationGrade, SubjectGrade
@@ -134,3 +136,32 @@ def get_catalog_csv_representation(catalog, study_class):
         'Scutit': catalog.is_exempted,
         'Înregistrat opțional': catalog.is_enrolled
     }
+
+
+def write_catalogs_csv(file, catalogs, study_class):
+    # Don't set the field names here
+    writer = csv.DictWriter(file, [], restval='-')
+    wrote_header = False
+
+    for catalog in catalogs:
+        fields = get_catalog_csv_representation(catalog, study_class)
+
+        # Only write the headers once per file
+        if not wrote_header:
+            writer.fieldnames = fields.keys()
+            writer.writeheader()
+            wrote_header = True
+
+        # Remove keys which don't have a value, and handle Boolean translation
+        cleaned_fields = {}
+        for key, value in fields.items():
+            if value is True:
+                cleaned_fields[key] = 'Da'
+            elif value is False:
+                cleaned_fields[key] = 'Nu'
+            elif value:
+                cleaned_fields[key] = value
+            else:
+                cleaned_fields[key] = '-'
+
+        writer.writerow(cleaned_fields)
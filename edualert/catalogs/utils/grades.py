@@ -1,12 +1,11 @@
 import decimal
 import math
 
-from django.db.models import Q
-
 from edualert.catalogs.models import SubjectGrade, ExaminationGrade
 from edualert.catalogs.tasks import update_averages_for_students_task
 from edualert.schools.constants import BEHAVIOR_GRADE_EXCEPTIONS_PROFILES, PROFILES_WITH_CORE_SUBJECTS
 from edualert.subjects.models import ProgramSubjectThrough
+from edualert.subjects.utils import get_program_subject_through
 
 
 def grades_mean(grades):
@@ -25,10 +24,10 @@ def compute_averages(catalogs, semester, is_async=True):
         return
 
     study_class = catalogs[0].study_class
-    weekly_hours_count = ProgramSubjectThrough.objects \
-        .get(Q(academic_program_id=study_class.academic_program_id) |
-             Q(generic_academic_program_id=study_class.academic_program.generic_academic_program_id),
-             subject_id=catalogs[0].subject_id, class_grade=study_class.class_grade).weekly_hours_count
+    program_subject_through = get_program_subject_through(study_class, catalogs[0].subject_id)
+    if program_subject_through is None:
+        raise ProgramSubjectThrough.DoesNotExist()
+    weekly_hours_count = program_subject_through.weekly_hours_count
 
     student_ids = []
     for catalog in catalogs:
@@ -8,11 +8,13 @@ from django.utils import timezone
 from django.utils.translation import pgettext
 
 from edualert.academic_calendars.models import SchoolEvent
-from edualert.academic_calendars.utils import get_current_academic_calendar, get_second_semester_end_events
+from edualert.academic_calendars.utils import get_current_academic_calendar, get_calendar_index
+from edualert.catalogs.conditional_responses import invalidate_catalogs
 from edualert.catalogs.models import StudentCatalogPerSubject, SubjectGrade, SubjectAbsence, ExaminationGrade
 from edualert.catalogs.utils import compute_averages, change_averages_after_examination_grade_operation, \
-    has_technological_category, get_current_semester
+    has_technological_category
 from edualert.catalogs.tasks import update_absences_counts_for_students_task
+from edualert.common.constants import IMPORT_JOB_CHUNK_SIZE
 from edualert.profiles.models import Label, UserProfile
 from edualert.subjects.models import ProgramSubjectThrough
 
@@ -30,8 +32,10 @@ class CatalogsImporter:
     differences_event = None
     second_examinations_event = None
     is_technological_school = False
-    second_semester_end_events = None
+    calendar_index = None
     subject_through = None
+    student_labels = None
+    progress_callback = None
     field_mapping = {
         'Nume': 'full_name',
         'Etichete': 'labels',
@@ -74,7 +78,7 @@ class CatalogsImporter:
         'written_second_examination2', 'grades_sem1', 'grades_sem2'
     ]
 
-    def __init__(self, file, study_class, subject, current_calendar):
+    def __init__(self, file, study_class, subject, current_calendar, progress_callback=None):
         self.report = {'errors': {}}
         self.file = file
         self.study_class = study_class
@@ -82,6 +86,9 @@ class CatalogsImporter:
         self.today = timezone.now().date()
         self.current_calendar = current_calendar or get_current_academic_calendar()
         self.reverse_field_mapping = {value: field for field, value in self.field_mapping.items()}
+        # Called with the number of processed rows, after every chunk of rows
+        self.progress_callback = progress_callback
+        self.parsed_dates = {}
 
     def import_catalogs_and_get_report(self):
         catalogs = self._fetch_from_csv()
@@ -89,17 +96,70 @@ class CatalogsImporter:
         self._update_report_with_statistics()
         return self.report
 
+    def validate_catalogs_and_get_report(self):
+        """
+        Dry run of the import: returns the same errors as the import would, without saving anything.
+        The students, catalogs and labels needed by the whole file are fetched with a few queries. The rows are still
+        cleaned and validated one by one, by the same code as the import, so the two can't report different errors.
+        """
+        self._prepare()
+        cleaned_rows = [self._clean_data(catalog_dict) for catalog_dict in self._fetch_from_csv()]
+
+        students = {}
+        for student in UserProfile.objects.filter(
+                user_role=UserProfile.UserRoles.STUDENT,
+                student_in_class_id=self.study_class.id,
+                full_name__in={cleaned_data['full_name'] for cleaned_data in cleaned_rows}
+        ).order_by('id'):
+            students.setdefault(student.full_name, student)
+
+        catalogs = {}
+        for catalog in StudentCatalogPerSubject.objects.filter(
+                student_id__in=[student.id for student in students.values()],
+                study_class_id=self.study_class.id,
+                subject=self.subject,
+                academic_year=self.current_calendar.academic_year
+        ).prefetch_related('grades', 'examination_grades').order_by('id'):
+            catalogs.setdefault(catalog.student_id, catalog)
+
+        for index, cleaned_data in enumerate(cleaned_rows):
+            self.number_of_catalogs += 1
+
+            errors = cleaned_data.pop('errors', None)
+            if errors:
+                self._add_row_to_report(index + 1, errors)
+                continue
+
+            user_profile = students.get(cleaned_data['full_name'])
+            if not user_profile:
+                self._add_row_to_report(index + 1, {self.reverse_field_mapping['full_name']: _("A student with this name doesn't exist yet.")})
+                continue
+
+            catalog = catalogs.get(user_profile.id)
+            if not catalog:
+                self._add_row_to_report(index + 1, {self.reverse_field_mapping['full_name']: _("A catalog for this student and subject doesn't exist yet.")})
+                continue
+
+            validated_data = self._validate_data(catalog, cleaned_data, self._get_examination_grades(catalog))
+            errors = validated_data.pop('errors', None)
+            if errors:
+                self._add_row_to_report(index + 1, errors)
+
+        valid_catalogs = self.number_of_catalogs - len(self.report['errors'])
+        self.report['report'] = pgettext(
+            'catalogs', '{} out of {} {} can be saved.'
+        ).format(valid_catalogs, self.number_of_catalogs, _('catalog') if self.number_of_catalogs == 1 else _('catalogs'))
+        return self.report
+
     def _fetch_from_csv(self):
         return csv.DictReader(self.file)
 
-    def _save(self, catalog_data):
-        catalogs_to_update = []
-        catalog_fields_to_update = ['remarks', 'wants_level_testing_grade', 'wants_thesis', 'wants_simulation', 'is_exempted', 'is_enrolled']
-        catalogs_with_difference_grades = []
-        catalogs_with_second_examination_grades = []
+    def _prepare(self):
+        # Everything which is the same for all the rows is computed only once per file
         self.is_technological_school = has_technological_category(self.study_class.school_unit)
-        self.second_semester_end_events = get_second_semester_end_events(self.current_calendar)
+        self.calendar_index = get_calendar_index(self.current_calendar)
         self.examination_events = self._get_examination_events()
+        self.student_labels = {label.text: label for label in Label.objects.filter(user_role=UserProfile.UserRoles.STUDENT)}
 
         self.subject_through = ProgramSubjectThrough.objects.filter(
             class_grade=self.study_class.class_grade,
@@ -107,7 +167,22 @@ class CatalogsImporter:
             subject=self.subject
         ).first()
 
+    def _get_semester(self, date):
+        return self.calendar_index.get_semester(date, self.study_class.class_grade_arabic, self.is_technological_school)
+
+    def _save(self, catalog_data):
+        from edualert.statistics.activity_feed import create_student_activities, update_examination_activities
+
+        catalogs_to_update = []
+        catalog_fields_to_update = ['remarks', 'wants_level_testing_grade', 'wants_thesis', 'wants_simulation', 'is_exempted', 'is_enrolled']
+        catalogs_with_difference_grades = []
+        catalogs_with_second_examination_grades = []
+        self._prepare()
+
         for index, catalog_dict in enumerate(catalog_data):
+            if self.progress_callback and self.number_of_catalogs and self.number_of_catalogs % IMPORT_JOB_CHUNK_SIZE == 0:
+                self.progress_callback(self.number_of_catalogs)
+
             self.number_of_catalogs += 1
 
             # Clean data
@@ -131,6 +206,7 @@ class CatalogsImporter:
             catalog = StudentCatalogPerSubject.objects.filter(
                 student_id=user_profile.id,
                 study_class_id=self.study_class.id,
+                subject=self.subject,
                 academic_year=self.current_calendar.academic_year
             ).prefetch_related(
                 'grades', 'examination_grades'
@@ -229,6 +305,9 @@ class CatalogsImporter:
                     SubjectGrade.objects.bulk_create(grades_to_create)
                     SubjectAbsence.objects.bulk_create(absences_to_create)
                     ExaminationGrade.objects.bulk_create(examination_grades_to_create)
+                    create_student_activities(absences=absences_to_create, grades=grades_to_create)
+                    if examination_grades_to_create:
+                        update_examination_activities([catalog.id])
                 catalogs_to_update.append(catalog)
 
             except DatabaseError:
@@ -242,6 +321,7 @@ class CatalogsImporter:
                 'founded_abs_count_annual', 'unfounded_abs_count_annual'
             ]
         )
+        invalidate_catalogs(student_ids=[catalog.student_id for catalog in catalogs_to_update])
 
         for catalog in catalogs_to_update:
             catalog.refresh_from_db()
@@ -256,7 +336,7 @@ class CatalogsImporter:
 
         cleaned_data = {
             'full_name': catalog_dict.get('Nume'),
-            'labels': [label.strip() for label in catalog_dict.get('Etichete', '').split(';')],
+            'labels': [label.strip() for label in catalog_dict.get('Etichete', '').split(';') if label.strip()],
             'remarks': catalog_dict.get('Observații')
         }
 
@@ -285,13 +365,19 @@ class CatalogsImporter:
                     cleaned_data[grade_key] = [(taken_at, grade_value)]
 
         for absence_key in ['Absențe motivate sem. I', 'Absențe motivate sem. II', 'Absențe nemotivate sem. I', 'Absențe nemotivate sem. II', ]:
-            for absence in catalog_dict[absence_key].replace(' ', '').split(';') if absence_key in catalog_dict else []:
+            cleaned_data_key = self.field_mapping[absence_key]
+            absences = catalog_dict[absence_key].replace(' ', '').split(';') if absence_key in catalog_dict else []
+
+            if not any(absences):
+                cleaned_data[cleaned_data_key] = []
+                continue
+
+            for absence in absences:
                 taken_at, error = self._validate_and_clean_date(absence)
                 if error:
                     errors[absence_key] = error
                     continue
 
-                cleaned_data_key = self.field_mapping[absence_key]
                 if cleaned_data_key in cleaned_data:
                     cleaned_data[cleaned_data_key].append(taken_at)
                 else:
@@ -315,7 +401,7 @@ class CatalogsImporter:
         outside_second_semester_error = _('Must be inside the second semester.')
 
         # Validate labels
-        actual_labels = Label.objects.filter(user_role=UserProfile.UserRoles.STUDENT, text__in=data['labels'])
+        actual_labels = [self.student_labels[text] for text in set(data['labels']) if text in self.student_labels]
         if len(actual_labels) != len(data['labels']):
             errors[self.reverse_field_mapping['labels']] = _('Labels must exist, be unique, and be for the student user role.')
         data['labels'] = actual_labels
@@ -333,16 +419,12 @@ class CatalogsImporter:
 
         for field in ['grades_sem1', 'thesis_sem1']:
             for grade in data[field]:
-                if not get_current_semester(
-                        grade[0], self.current_calendar, self.second_semester_end_events, self.study_class.class_grade_arabic, self.is_technological_school
-                ) == 1:
+                if not self._get_semester(grade[0]) == 1:
                     errors[self.reverse_field_mapping[field]] = outside_first_semester_error
 
         for field in ['grades_sem2', 'thesis_sem2']:
             for grade in data[field]:
-                if not get_current_semester(
-                        grade[0], self.current_calendar, self.second_semester_end_events, self.study_class.class_grade_arabic, self.is_technological_school
-                ) == 2:
+                if not self._get_semester(grade[0]) == 2:
                     errors[self.reverse_field_mapping[field]] = outside_second_semester_error
 
         sem1_differences_keys = ['oral_difference1_sem1', 'oral_difference2_sem1', 'written_difference1_sem1', 'written_difference2_sem1']
@@ -395,16 +477,12 @@ class CatalogsImporter:
         # Validate absences
         for field in ['founded_abs_sem1', 'unfounded_abs_sem1']:
             for absence in data[field]:
-                if not get_current_semester(
-                        absence, self.current_calendar, self.second_semester_end_events, self.study_class.class_grade_arabic, self.is_technological_school
-                ) == 1:
+                if not self._get_semester(absence) == 1:
                     errors[self.reverse_field_mapping[field]] = outside_first_semester_error
 
         for field in ['founded_abs_sem2', 'unfounded_abs_sem2']:
             for absence in data[field]:
-                if not get_current_semester(
-                        absence, self.current_calendar, self.second_semester_end_events, self.study_class.class_grade_arabic, self.is_technological_school
-                ) == 2:
+                if not self._get_semester(absence) == 2:
                     errors[self.reverse_field_mapping[field]] = outside_second_semester_error
 
         # Validate remarks
@@ -687,6 +765,12 @@ class CatalogsImporter:
             return None, None, error
 
     def _validate_and_clean_date(self, date):
+        # The same dates usually appear in many rows, so each one is only parsed once
+        if date not in self.parsed_dates:
+            self.parsed_dates[date] = self._parse_date(date)
+        return self.parsed_dates[date]
+
+    def _parse_date(self, date):
         error = ''
         try:
             date = datetime.datetime.strptime(date.replace(' ', ''), settings.DATE_FORMAT).date()
@@ -1,9 +1,10 @@
 from django.utils import timezone
 
-from edualert.academic_calendars.utils import get_current_academic_calendar, get_second_semester_end_events
+from edualert.academic_calendars.utils import get_current_academic_calendar, get_calendar_index
 from edualert.academic_programs.models import AcademicProgram
+from edualert.catalogs.conditional_responses import invalidate_catalogs
 from edualert.catalogs.models import StudentCatalogPerSubject, StudentCatalogPerYear
-from edualert.catalogs.utils import has_technological_category, get_current_semester
+from edualert.catalogs.utils import has_technological_category
 from edualert.profiles.constants import ABANDONMENT_RISK_1_LABEL, ABANDONMENT_RISK_2_LABEL
 from edualert.profiles.models import Label, UserProfile
 from edualert.schools.models import RegisteredSchoolUnit
@@ -17,7 +18,7 @@ def calculate_students_risk_level():
     current_calendar = get_current_academic_calendar()
     if not current_calendar:
         return
-    second_semester_end_events = get_second_semester_end_events(current_calendar)
+    calendar_index = get_calendar_index(current_calendar)
 
     risk_1_label = Label.objects.filter(text=ABANDONMENT_RISK_1_LABEL).first()
     risk_2_label = Label.objects.filter(text=ABANDONMENT_RISK_2_LABEL).first()
@@ -38,8 +39,7 @@ def calculate_students_risk_level():
         catalogs_per_subject = get_mapped_catalogs_per_subject(current_calendar.academic_year, school_unit.id)
 
         for catalog in catalogs_per_year:
-            current_semester = get_current_semester(today, current_calendar, second_semester_end_events,
-                                                    catalog.study_class.class_grade_arabic, is_technological_school)
+            current_semester = calendar_index.get_semester(today, catalog.study_class.class_grade_arabic, is_technological_school)
             student = catalog.student
             student.is_at_risk = False
             student.risk_description = None
@@ -85,6 +85,7 @@ def calculate_students_risk_level():
         StudentCatalogPerSubject.objects.bulk_update(catalogs_per_subject_to_update, ['is_at_risk'], batch_size=100)
     if students_to_update:
         UserProfile.objects.bulk_update(students_to_update, ['is_at_risk', 'risk_description'], batch_size=100)
+        invalidate_catalogs(student_ids=[student.id for student in students_to_update])
 
     country_risk_stats = risk_stats_map.get('by_country')
     set_daily_risk_count(country_risk_stats, students_at_risk_count_by_country, today.day)
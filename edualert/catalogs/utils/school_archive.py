@@ -0,0 +1,74 @@
+import io
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.core.files import File
+
+from edualert.catalogs.models import StudentCatalogPerSubject
+from edualert.catalogs.utils.exporter import write_catalogs_csv
+from edualert.common.utils import get_private_storage
+from edualert.study_classes.models import TeacherClassThrough
+
+
+def get_school_catalogs_archive_name(school_unit):
+    # The archive is regenerated only after a change was made in the school's catalogs
+    if school_unit.last_change_in_catalog:
+        version = school_unit.last_change_in_catalog.strftime('%Y%m%d%H%M%S%f')
+    else:
+        version = 'initial'
+    return f'{settings.CATALOG_ARCHIVES_LOCATION}/{school_unit.id}_{version}.zip'
+
+
+def generate_school_catalogs_archive(school_unit, academic_year):
+    storage = get_private_storage()
+    archive_name = get_school_catalogs_archive_name(school_unit)
+    if storage.exists(archive_name):
+        return archive_name
+
+    # The archive is written into a local temporary file first & saved once complete, so a partially written archive is never served
+    with tempfile.TemporaryFile() as temp_file:
+        with zipfile.ZipFile(temp_file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            _write_school_catalogs(archive, school_unit, academic_year)
+        temp_file.seek(0)
+        storage.save(archive_name, File(temp_file))
+
+    _remove_old_school_catalogs_archives(storage, school_unit, archive_name)
+    return archive_name
+
+
+def _write_school_catalogs(archive, school_unit, academic_year):
+    teacher_class_through_qs = TeacherClassThrough.objects.filter(study_class__school_unit_id=school_unit.id, academic_year=academic_year) \
+        .select_related('study_class') \
+        .order_by('study_class__class_grade_arabic', 'study_class__class_letter', 'subject_name')
+
+    written_catalogs = set()
+    for teacher_class_through in teacher_class_through_qs:
+        study_class = teacher_class_through.study_class
+        if (study_class.id, teacher_class_through.subject_id) in written_catalogs:
+            continue
+        written_catalogs.add((study_class.id, teacher_class_through.subject_id))
+
+        catalogs = StudentCatalogPerSubject.objects.filter(
+            study_class=study_class,
+            subject_id=teacher_class_through.subject_id
+        ).prefetch_related(
+            'student__labels',
+            'examination_grades',
+            'grades',
+            'absences'
+        ).order_by(
+            'student__full_name'
+        )
+
+        # Each CSV is written straight into the archive, so only one study class catalog is kept in memory at a time
+        file_name = '{}_{}/{}.csv'.format(study_class.class_grade, study_class.class_letter, teacher_class_through.subject_name.replace('/', '-'))
+        with io.TextIOWrapper(archive.open(file_name, 'w'), encoding='utf-8', newline='') as file:
+            write_catalogs_csv(file, catalogs, study_class)
+
+
+def _remove_old_school_catalogs_archives(storage, school_unit, current_archive_name):
+    for file_name in storage.listdir(settings.CATALOG_ARCHIVES_LOCATION)[1]:
+        archive_name = f'{settings.CATALOG_ARCHIVES_LOCATION}/{file_name}'
+        if file_name.startswith(f'{school_unit.id}_') and archive_name != current_archive_name:
+            storage.delete(archive_name)
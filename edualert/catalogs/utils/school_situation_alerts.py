@@ -2,11 +2,11 @@ from django.conf import settings
 from django.template.loader import get_template
 from django.utils import timezone
 
-from edualert.academic_calendars.utils import get_current_academic_calendar, get_second_semester_end_events
+from edualert.academic_calendars.utils import get_current_academic_calendar, get_calendar_index
 from edualert.catalogs.constants import SCHOOL_SITUATION_SMS_BODY, SCHOOL_SITUATION_EMAIL_TITLE, \
     SCHOOL_SITUATION_EMAIL_BODY, SCHOOL_SITUATION_EMAIL_SIGNATURE
 from edualert.catalogs.models import SubjectGrade, SubjectAbsence
-from edualert.catalogs.utils import has_technological_category, get_current_semester
+from edualert.catalogs.utils import has_technological_category
 from edualert.notifications.utils import send_sms, send_mail
 from edualert.profiles.models import UserProfile
 from edualert.schools.models import RegisteredSchoolUnit
@@ -21,7 +21,7 @@ def send_alerts_for_school_situation():
     current_calendar = get_current_academic_calendar()
     if not current_calendar:
         return
-    second_semester_end_events = get_second_semester_end_events(current_calendar)
+    calendar_index = get_calendar_index(current_calendar)
 
     for school_unit in RegisteredSchoolUnit.objects.all():
         is_technological_school = has_technological_category(school_unit)
@@ -29,8 +29,7 @@ def send_alerts_for_school_situation():
         for student in UserProfile.objects.filter(school_unit_id=school_unit.id, user_role=UserProfile.UserRoles.STUDENT,
                                                   is_active=True).select_related('student_in_class'):
             try:
-                current_semester = get_current_semester(today, current_calendar, second_semester_end_events,
-                                                        student.student_in_class.class_grade_arabic, is_technological_school)
+                current_semester = calendar_index.get_semester(today, student.student_in_class.class_grade_arabic, is_technological_school)
                 if current_semester is None:
                     continue
 
@@ -79,7 +79,7 @@ def set_rankings(current_calendar, today, second_semester_run_dates):
                 school_averages_ranking_annual.add(catalog.avg_final)
                 school_absences_ranking_sem1.add(catalog.abs_count_sem1)
                 school_absences_ranking_sem2.add(catalog.abs_count_sem2)
-                school_absences_ranking_annual.add(catalog.abs_count_sem2)
+                school_absences_ranking_annual.add(catalog.abs_count_annual)
 
             school_averages_ranking_sem1 = sorted(list(school_averages_ranking_sem1), key=lambda x: 0 if x is None else x, reverse=True)
             school_averages_ranking_sem2 = sorted(list(school_averages_ranking_sem2), key=lambda x: 0 if x is None else x, reverse=True)
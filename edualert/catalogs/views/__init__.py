@@ -4,4 +4,4 @@ from .absences import AbsenceCreate, AbsenceAuthorize, AbsenceDelete, AbsenceBul
 from .catalog_settings import CatalogSettings
 from .remarks import CatalogsPerSubjectRemarks, CatalogsPerYearRemarks
 from .examination_grades import ExaminationGradeCreate, ExaminationGradeDetail
-from .import_export import ExportSubjectCatalogs, ImportSubjectCatalogs
+from .import_export import ExportSubjectCatalogs, ImportSubjectCatalogs, ExportSchoolCatalogsArchive
@@ -1,7 +1,8 @@
-import csv
-
-from django.http import HttpResponse, Http404
+from django.core.cache import cache
+from django.http import HttpResponse, Http404, FileResponse
 from django.utils import timezone
+from django.utils.translation import gettext as _
+from rest_framework import status
 from rest_framework.generics import get_object_or_404
 from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
@@ -9,14 +10,20 @@ from rest_framework.views import APIView
 
 from edualert.academic_calendars.utils import get_current_academic_calendar
 from edualert.catalogs.models import StudentCatalogPerSubject
-from edualert.catalogs.utils import CatalogsImporter, get_catalog_csv_representation
-from edualert.common.permissions import IsTeacher
-from edualert.common.serializers import CsvUploadSerializer
+from edualert.catalogs.tasks import generate_school_catalogs_archive_task
+from edualert.catalogs.utils import CatalogsImporter, write_catalogs_csv, get_school_catalogs_archive_name, \
+    update_last_change_in_catalog
+from edualert.common.models import ImportJob
+from edualert.common.permissions import IsTeacher, IsPrincipal
+from edualert.common.reporting_database import ReportingDatabaseMixin
+from edualert.common.serializers import CsvUploadSerializer, ImportJobSerializer
+from edualert.common.tasks import process_import_job_task
+from edualert.common.utils import get_private_storage
 from edualert.study_classes.models import StudyClass
 from edualert.subjects.models import Subject
 
 
-class ExportSubjectCatalogs(APIView):
+class ExportSubjectCatalogs(ReportingDatabaseMixin, APIView):
     permission_classes = (IsTeacher,)
 
     def get(self, request, *args, **kwargs):
@@ -35,10 +42,6 @@ class ExportSubjectCatalogs(APIView):
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename="{file_name}"'
 
-        # Don't set the field names here
-        writer = csv.DictWriter(response, [], restval='-')
-        wrote_header = False
-
         catalogs = StudentCatalogPerSubject.objects.filter(
             study_class=study_class,
             subject=subject
@@ -50,29 +53,7 @@ class ExportSubjectCatalogs(APIView):
         ).order_by(
             'student__full_name'
         )
-
-        for catalog in catalogs:
-            fields = get_catalog_csv_representation(catalog, study_class)
-
-            # Only write the headers once per file
-            if not wrote_header:
-                writer.fieldnames = fields.keys()
-                writer.writeheader()
-                wrote_header = True
-
-            # Remove keys which don't have a value, and handle Boolean translation
-            cleaned_fields = {}
-            for key, value in fields.items():
-                if value is True:
-                    cleaned_fields[key] = 'Da'
-                elif value is False:
-                    cleaned_fields[key] = 'Nu'
-                elif value:
-                    cleaned_fields[key] = value
-                else:
-                    cleaned_fields[key] = '-'
-
-            writer.writerow(cleaned_fields)
+        write_catalogs_csv(response, catalogs, study_class)
 
         return response
 
@@ -103,8 +84,53 @@ class ImportSubjectCatalogs(APIView):
         serializer = CsvUploadSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         file = serializer.validated_data['file']
+
+        if request.query_params.get('dry_run') == 'true':
+            importer = CatalogsImporter(file=file, study_class=study_class, subject=subject, current_calendar=current_calendar)
+            return Response(
+                data=importer.validate_catalogs_and_get_report()
+            )
+
+        if request.query_params.get('async') == 'true':
+            # Large files are imported in the background; the client polls the returned job for the report
+            import_job = ImportJob.objects.create(
+                created_by=profile,
+                import_type=ImportJob.ImportTypes.CATALOGS,
+                study_class=study_class,
+                subject=subject,
+                file_content=file.getvalue()
+            )
+            process_import_job_task.delay(import_job.id)
+            return Response(ImportJobSerializer(import_job).data, status=status.HTTP_202_ACCEPTED)
+
         importer = CatalogsImporter(file=file, study_class=study_class, subject=subject, current_calendar=current_calendar)
+        report = importer.import_catalogs_and_get_report()
+        update_last_change_in_catalog(profile)
 
         return Response(
-            data=importer.import_catalogs_and_get_report()
+            data=report
         )
+
+
+class ExportSchoolCatalogsArchive(ReportingDatabaseMixin, APIView):
+    permission_classes = (IsPrincipal,)
+    # Only one archive generation per school & catalog version is started during this interval
+    generation_lock_timeout = 10 * 60
+
+    def get(self, request, *args, **kwargs):
+        current_calendar = get_current_academic_calendar()
+        if not current_calendar:
+            raise Http404()
+
+        school_unit = request.user.user_profile.school_unit
+        # The archive is generated by the celery workers, so it's read from the storage they share with the app
+        storage = get_private_storage()
+        archive_name = get_school_catalogs_archive_name(school_unit)
+        if storage.exists(archive_name):
+            file_name = f"cataloage_{school_unit.id}_{current_calendar.academic_year}.zip"
+            return FileResponse(storage.open(archive_name, 'rb'), as_attachment=True, filename=file_name, content_type='application/zip')
+
+        if cache.add(f'school_catalogs_archive_{archive_name}', True, timeout=self.generation_lock_timeout):
+            generate_school_catalogs_archive_task.delay(school_unit.id, current_calendar.academic_year)
+
+        return Response({'message': _('The archive is being generated. Please try again in a few minutes.')}, status=status.HTTP_202_ACCEPTED)
@@ -4,18 +4,21 @@ from django.http import Http404
 from methodtools import lru_cache
 from rest_framework import generics
 from rest_framework.generics import get_object_or_404
+from rest_framework.renderers import BrowsableAPIRenderer
 
 from edualert.academic_calendars.utils import get_current_academic_calendar
+from edualert.catalogs.conditional_responses import ConditionalCatalogResponseMixin, get_study_class_catalog_version_keys
 from edualert.catalogs.serializers import StudentCatalogPerYearSerializer, PupilStudyClassSerializer, StudentCatalogPerSubjectSerializer
 from edualert.catalogs.utils import get_avg_limit_for_subject, has_technological_category, get_working_weeks_count, get_weekly_hours_count
 from edualert.common.permissions import IsTeacher
+from edualert.common.renderers import FastJSONRenderer
 from edualert.common.search_and_filters import CommonOrderingFilter
 from edualert.profiles.models import UserProfile
 from edualert.study_classes.models import StudyClass
 from edualert.subjects.models import Subject
 
 
-class OwnStudyClassPupilList(generics.ListAPIView):
+class OwnStudyClassPupilList(ConditionalCatalogResponseMixin, generics.ListAPIView):
     permission_classes = (IsTeacher,)
     filter_backends = [CommonOrderingFilter]
     ordering_fields = [
@@ -27,12 +30,19 @@ class OwnStudyClassPupilList(generics.ListAPIView):
     serializer_class = StudentCatalogPerYearSerializer
     pagination_class = None
 
-    def get_queryset(self):
-        study_class = get_object_or_404(
+    @lru_cache(maxsize=None)
+    def get_study_class(self):
+        return get_object_or_404(
             StudyClass,
             id=self.kwargs['id'],
             class_master=self.request.user.user_profile
         )
+
+    def get_catalog_version_keys(self):
+        return get_study_class_catalog_version_keys(self.get_study_class())
+
+    def get_queryset(self):
+        study_class = self.get_study_class()
         return study_class.student_catalogs_per_year.filter(student__is_active=True) \
             .select_related('student').prefetch_related('student__labels')
 
@@ -67,8 +77,10 @@ class OwnStudyClassPupilDetail(generics.RetrieveAPIView):
         return context
 
 
-class OwnStudyClassCatalogBySubject(generics.ListAPIView):
+class OwnStudyClassCatalogBySubject(ConditionalCatalogResponseMixin, generics.ListAPIView):
     permission_classes = (IsTeacher,)
+    # Every grade & absence of every student, so the encoding time matters
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
     filter_backends = [CommonOrderingFilter]
     ordering_fields = [
         'student_name', 'avg_sem1', 'avg_sem2', 'avg_final',
@@ -93,12 +105,15 @@ class OwnStudyClassCatalogBySubject(generics.ListAPIView):
         profile = self.request.user.user_profile
         subject = self.get_subject()
         return get_object_or_404(
-            StudyClass.objects.distinct(),
+            StudyClass.objects.select_related('school_unit__academic_profile').distinct(),
             id=self.kwargs['study_class_id'],
             teachers=profile,
             teacher_class_through__subject_id=subject.id
         )
 
+    def get_catalog_version_keys(self):
+        return get_study_class_catalog_version_keys(self.get_study_class())
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
         study_class = self.get_study_class()
@@ -42,10 +42,26 @@ app.conf.beat_schedule = {
         'task': 'edualert.catalogs.tasks.calculate_students_placements_task',
         'schedule': crontab(hour=23, minute=59),
     },
+    'export_analytics_data_task': {
+        'task': 'edualert.statistics.tasks.export_analytics_data_task',
+        'schedule': crontab(hour=2, minute=0),
+    },
     'send_request_log_to_cloud_watch_task': {
         'task': 'edualert.common.tasks.send_request_log_to_cloud_watch_task',
         'schedule': crontab(minute='*/5'),
     },
+    'delete_old_request_log_archives_task': {
+        'task': 'edualert.common.tasks.delete_old_request_log_archives_task',
+        'schedule': crontab(hour=1, minute=45),
+    },
+    'delete_old_student_activities_task': {
+        'task': 'edualert.statistics.tasks.delete_old_student_activities_task',
+        'schedule': crontab(hour=1, minute=30),
+    },
+    'flush_last_online_task': {
+        'task': 'edualert.profiles.tasks.flush_last_online_task',
+        'schedule': crontab(minute='*'),
+    },
 }
 
 
@@ -1,14 +1,136 @@
-from rest_framework.test import APITestCase
+import functools
+import time
+from collections import namedtuple
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, Resolver404
+from rest_framework.test import APITestCase, APIClient
+
+from edualert.common.utils import get_duplicated_queries
+
+RequestBudget = namedtuple('RequestBudget', ['queries', 'duration_ms'], defaults=(None, None))
+RequestRecord = namedtuple('RequestRecord', ['test', 'method', 'path', 'url_name', 'user_role', 'queries_count', 'duration_ms'])
+
+# All the requests made by the API tests, reported at the end of the test run
+request_records = []
+
+
+def request_budget(queries=None, duration_ms=None):
+    """
+    Test method decorator: each request made by the test can run at most `queries` SQL queries,
+    and take at most `duration_ms` milliseconds. It takes precedence over the class' `request_budgets`.
+    """
+    def decorator(test_method):
+        @functools.wraps(test_method)
+        def wrapper(self, *args, **kwargs):
+            self.current_request_budget = RequestBudget(queries, duration_ms)
+            try:
+                return test_method(self, *args, **kwargs)
+            finally:
+                self.current_request_budget = None
+        return wrapper
+    return decorator
+
+
+class BudgetAPIClient(APIClient):
+    """
+    Counts the queries and measures the time of each request, and lets the test case check them.
+    """
+    test_case = None
+
+    def request(self, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            started_at = time.perf_counter()
+            response = super().request(**kwargs)
+            duration_ms = (time.perf_counter() - started_at) * 1000
+
+        if self.test_case is not None:
+            self.test_case.check_request_budget(response, context.captured_queries, duration_ms)
+        return response
 
 
 class CommonAPITestCase(APITestCase):
+    client_class = BudgetAPIClient
+    # The budgets of the requests made by the tests, by URL name, either as a RequestBudget or as a dict of RequestBudgets
+    # by user role, e.g. {'catalogs:own-study-class-pupil-list': RequestBudget(queries=10, duration_ms=500)}.
+    # Tests which make the same request with fixtures of different sizes can catch the N+1 queries this way.
+    request_budgets = {}
+    current_request_budget = None
+
+    def _pre_setup(self):
+        super()._pre_setup()
+        self.client.test_case = self
+
     @staticmethod
     def refresh_objects_from_db(list_of_objects):
         for obj in list_of_objects:
             obj.refresh_from_db()
 
+    def get_request_budget(self, url_name, user_role):
+        if self.current_request_budget is not None:
+            return self.current_request_budget
+
+        budget = self.request_budgets.get(url_name)
+        if isinstance(budget, dict):
+            return budget.get(user_role)
+        return budget
+
+    def check_request_budget(self, response, queries, duration_ms):
+        request = response.wsgi_request
+        try:
+            url_name = resolve(request.path_info).view_name
+        except Resolver404:
+            url_name = None
+        user_profile = getattr(getattr(request, 'user', None), 'user_profile', None)
+        user_role = user_profile.user_role if user_profile else None
+
+        request_records.append(RequestRecord(self.id(), request.method, request.get_full_path(), url_name, user_role,
+                                             len(queries), duration_ms))
+
+        budget = self.get_request_budget(url_name, user_role)
+        if budget is None:
+            return
+
+        errors = []
+        if budget.queries is not None and len(queries) > budget.queries:
+            errors.append('{} queries were run, over the budget of {}.'.format(len(queries), budget.queries))
+            duplicates = get_duplicated_queries([query['sql'] for query in queries], ignore_params=True)
+            if duplicates:
+                errors.append('Duplicated queries:')
+                errors.extend('  {} times: {}'.format(count, sql) for sql, count in duplicates)
+        if budget.duration_ms is not None and duration_ms > budget.duration_ms:
+            errors.append('The request took {:.0f} ms, over the budget of {} ms.'.format(duration_ms, budget.duration_ms))
+
+        if errors:
+            self.fail('\n'.join(['{} {} ({}):'.format(request.method, request.get_full_path(), user_role or 'anonymous'), *errors]))
+
     def tearDown(self):
         super().tearDown()
 
         if not self._outcome.errors[1][1]:
             print('{} PASSED'.format(self._testMethodName))
+
+
+def get_requests_report(records, size):
+    """
+    Returns the report lines of the endpoints which ran the most queries and took the longest in a request.
+    """
+    by_endpoint = {}
+    for record in records:
+        key = (record.method, record.url_name or record.path)
+        by_endpoint.setdefault(key, []).append(record)
+
+    lines = []
+    for title, attribute, value_format in [
+        ('Most queries in a request', 'queries_count', '{:>6}'),
+        ('Longest requests (ms)', 'duration_ms', '{:>6.0f}'),
+    ]:
+        worst_records = [max(endpoint_records, key=lambda item: getattr(item, attribute)) for endpoint_records in by_endpoint.values()]
+        worst_records.sort(key=lambda item: getattr(item, attribute), reverse=True)
+
+        lines.append('{}:'.format(title))
+        for record in worst_records[:size]:
+            lines.append('  {} {} {} ({}, {})'.format(value_format.format(getattr(record, attribute)), record.method,
+                                                      record.url_name or record.path, record.user_role or 'anonymous', record.test))
+    return lines
@@ -0,0 +1,57 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.handlers import asgi
+from django.db import close_old_connections
+from django.urls import resolve, Resolver404
+
+DEFAULT_THREAD_POOL = 'default'
+# The read-only endpoints which parents & students poll (e.g. right after the teachers enter the grades)
+POLLING_THREAD_POOL = 'polling'
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """
+    Runs the (synchronous) views in bounded thread pools, so the number of database connections is bounded as well.
+    The views whose class sets `asgi_thread_pool = POLLING_THREAD_POOL` run in a separate pool, so a burst of polling
+    requests waits on the event loop instead of taking the threads of the other requests.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.executors = {
+            DEFAULT_THREAD_POOL: ThreadPoolExecutor(max_workers=settings.ASGI_THREADS, thread_name_prefix='asgi'),
+            POLLING_THREAD_POOL: ThreadPoolExecutor(max_workers=settings.ASGI_POLLING_THREADS, thread_name_prefix='asgi-polling'),
+        }
+
+    async def get_response(self, request):
+        executor = self.executors[self.get_thread_pool(request)]
+        # Run with a copy of the current context, like asgiref's sync_to_async
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(executor, context.run, self.get_response_in_thread, request)
+
+    @staticmethod
+    def get_thread_pool(request):
+        try:
+            resolver_match = resolve(request.path_info)
+        except Resolver404:
+            return DEFAULT_THREAD_POOL
+
+        view_class = getattr(resolver_match.func, 'view_class', None)
+        return getattr(view_class, 'asgi_thread_pool', DEFAULT_THREAD_POOL)
+
+    def get_response_in_thread(self, request):
+        # The request_started & request_finished signals, which close the expired connections, run in other threads
+        close_old_connections()
+        try:
+            return super().get_response(request)
+        finally:
+            close_old_connections()
+
+
+def get_asgi_application():
+    django.setup(set_prefix=False)
+    return ASGIHandler()
@@ -1,3 +1,6 @@
+from django.db.models import TextChoices
+from django.utils.translation import gettext_lazy as _
+
 POST = 'POST'
 PUT = 'PUT'
 PATCH = 'PATCH'
@@ -16,3 +19,19 @@ WEEKDAYS_MAP = {
     5: 'Sâ',
     6: 'Du'
 }
+
+
+class ImportTypes(TextChoices):
+    USERS = 'USERS', _('Users')
+    CATALOGS = 'CATALOGS', _('Catalogs')
+
+
+class ImportJobStatuses(TextChoices):
+    PENDING = 'PENDING', _('Pending')
+    IN_PROGRESS = 'IN_PROGRESS', _('In progress')
+    FINISHED = 'FINISHED', _('Finished')
+    FAILED = 'FAILED', _('Failed')
+
+
+# Number of CSV rows after which the progress of an import job is saved
+IMPORT_JOB_CHUNK_SIZE = 50
@@ -0,0 +1,443 @@
+import gzip
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from edualert.common.request_log import iter_request_logs, ack_request_logs, REQUEST_LOG_STREAM
+
+REQUEST_LOG_SHIPPING_METRICS_KEY = 'request_log_shipping_metrics'
+REQUEST_LOG_SHIPPING_LOCK_KEY = 'request_log_shipping_lock'
+# Released by the run when it ends; the timeout only frees it after a run which crashed
+REQUEST_LOG_SHIPPING_LOCK_TIMEOUT = 60 * 60
+SPOOL_FILE_SUFFIX = '.jsonl'
+ATTEMPTS_FILE_SUFFIX = '.attempts'
+QUARANTINE_DIR = 'quarantine'
+# A batch which failed to upload this many times is quarantined, so it doesn't hold back the next ones
+MAX_UPLOAD_ATTEMPTS = 5
+# The Cloud Watch Logs errors after which retrying the same batch is pointless
+NON_RETRYABLE_ERROR_CODES = ('InvalidParameterException',)
+
+# `MAX_BATCH_SIZE_BYTES`, `LOG_EVENT_EXTRA_BYTES` and `MAX_BATCH_SIZE` are taken from here:
+# https://docs.aws.amazon.com/AmazonCloudWatchLogs/latest/APIReference/API_PutLogEvents.html
+MAX_BATCH_SIZE_BYTES = 1_048_576  # 1MB
+LOG_EVENT_EXTRA_BYTES = 26
+MAX_BATCH_SIZE = 10_000
+
+# The results of the batch uploads
+UPLOADED = 'uploaded'
+FAILED = 'failed'
+QUARANTINED = 'quarantined'
+
+
+class BatchRejectedError(Exception):
+    """
+    Raised by the sinks when a batch can never be uploaded (e.g. it's invalid), so it's quarantined right away.
+    """
+
+
+class RequestLogSpool:
+    """
+    Append-only directory of the batches of log events which weren't uploaded yet, one JSON lines file per batch.
+    The files are named after their creation time, so they are uploaded in order. The batches which can't be uploaded
+    are moved to the quarantine subdirectory, where they are kept for inspection.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.quarantine_root = os.path.join(root, QUARANTINE_DIR)
+        self.last_time_ns = 0
+        os.makedirs(self.root, exist_ok=True)
+
+    def append(self, batch):
+        """
+        Writes the batch to a temporary file first, so a crash never leaves a partial batch in the spool.
+        """
+        # Strictly increasing, so the batches spooled by a run keep their order
+        self.last_time_ns = max(time.time_ns(), self.last_time_ns + 1)
+        name = '{:020d}-{}{}'.format(self.last_time_ns, uuid.uuid4().hex, SPOOL_FILE_SUFFIX)
+        temporary_path = os.path.join(self.root, '.{}.tmp'.format(name))
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            file.writelines('{}\n'.format(json.dumps(event)) for event in batch)
+            file.flush()
+            os.fsync(file.fileno())
+        os.rename(temporary_path, os.path.join(self.root, name))
+
+    def get_batch_paths(self):
+        return [os.path.join(self.root, name) for name in sorted(os.listdir(self.root)) if name.endswith(SPOOL_FILE_SUFFIX)]
+
+    @staticmethod
+    def read(path):
+        with open(path, encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    @staticmethod
+    def archive(path, archive_storage):
+        """
+        Saves the uploaded batch, gzipped, in the archive folder of the day (of the given storage), and removes it from the spool.
+        """
+        if archive_storage:
+            with open(path, 'rb') as file:
+                content = gzip.compress(file.read())
+            archive_name = '{}/{}/{}.gz'.format(settings.REQUEST_LOG_ARCHIVE_LOCATION, timezone.now().date().isoformat(), os.path.basename(path))
+            archive_storage.save(archive_name, ContentFile(content))
+        os.remove(path)
+        RequestLogSpool._remove_attempts(path)
+
+    @staticmethod
+    def record_failed_attempt(path):
+        """
+        Returns the number of failed uploads of the batch, which is counted in a file next to it.
+        """
+        attempts_path = path + ATTEMPTS_FILE_SUFFIX
+        attempts = 1
+        if os.path.exists(attempts_path):
+            with open(attempts_path) as file:
+                attempts += int(file.read() or 0)
+        with open(attempts_path, 'w') as file:
+            file.write(str(attempts))
+        return attempts
+
+    def quarantine(self, path):
+        os.makedirs(self.quarantine_root, exist_ok=True)
+        os.rename(path, os.path.join(self.quarantine_root, os.path.basename(path)))
+        self._remove_attempts(path)
+
+    @staticmethod
+    def _remove_attempts(path):
+        if os.path.exists(path + ATTEMPTS_FILE_SUFFIX):
+            os.remove(path + ATTEMPTS_FILE_SUFFIX)
+
+    def get_metrics(self):
+        paths = self.get_batch_paths()
+        oldest_timestamp = int(os.path.basename(paths[0]).split('-')[0]) / 1e9 if paths else None
+        return {
+            'spool_batches': len(paths),
+            'spool_bytes': sum(os.path.getsize(path) for path in paths),
+            'lag_seconds': max(time.time() - oldest_timestamp, 0) if oldest_timestamp else 0,
+            'quarantined_batches': len(os.listdir(self.quarantine_root)) if os.path.isdir(self.quarantine_root) else 0,
+        }
+
+
+class CloudWatchSink:
+    """
+    Uploads the batches to Cloud Watch Logs.
+
+    The name of the log group in which to put the logs is retrieved from `settings.REQUEST_LOG`.
+    The name of the log stream is composed from the current month and year in the MM-YYYY format.
+    `settings.REQUEST_LOG['ENDPOINT_URL']` can point the client to a local stub of the Cloud Watch Logs API.
+
+    Requires permission to execute the following AWS actions:
+    - logs:DescribeLogGroups
+    - logs:DescribeLogStreams
+    - logs:CreateLogGroup
+    - logs:CreateLogStream
+    - logs:PutLogEvents
+    """
+    # The uploads to a log stream have to be sequential, since each one needs the sequence token of the previous one
+    max_concurrency = 1
+
+    def __init__(self, options):
+        self.options = options
+        self.client = None
+        self.log_group = None
+        self.log_stream = None
+        self.sequence_token = None
+
+    def upload(self, batch):
+        if self.client is None:
+            self.client = boto3.client('logs', endpoint_url=self.options.get('ENDPOINT_URL'),
+                                       config=Config(region_name=self.options['REGION_NAME']))
+            self.log_group = _provide_log_group(self.client, self.options['LOG_GROUP_NAME'])
+            self.log_stream = _provide_log_stream(self.client, self.log_group)
+            self.sequence_token = self.log_stream['uploadSequenceToken'] if 'uploadSequenceToken' in self.log_stream else None
+
+        self.sequence_token, is_dispatched = _dispatch_batch(self.client, self.log_group, self.log_stream, self.sequence_token, batch)
+        return is_dispatched
+
+
+class FileSink:
+    """
+    Appends the log events to a local JSON lines file (`settings.REQUEST_LOG['FILE_PATH']`), e.g. for local development.
+    """
+    max_concurrency = 1
+
+    def __init__(self, options):
+        self.path = options['FILE_PATH']
+
+    def upload(self, batch):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.writelines('{}\n'.format(json.dumps(event)) for event in batch)
+        return True
+
+
+class MemorySink:
+    """
+    Keeps the uploaded batches in memory, as a stub for the tests.
+    """
+    max_concurrency = 4
+    batches = []
+
+    def __init__(self, options):
+        self.options = options
+
+    def upload(self, batch):
+        self.batches.append(batch)
+        return True
+
+
+def get_request_log_sink():
+    sink_class = import_string(settings.REQUEST_LOG.get('SINK', 'edualert.common.log_shipping.CloudWatchSink'))
+    return sink_class(settings.REQUEST_LOG)
+
+
+def spool_request_logs(redis, spool):
+    """
+    Moves the logs from the request log stream to the spool, in batches which meet the Cloud Watch Logs limits.
+    The logs are acknowledged (and removed from the stream) once their batch is safely in the spool.
+
+    Warning!
+    From the requirements of posting events to a stream which are listed here:
+    https://docs.aws.amazon.com/AmazonCloudWatchLogs/latest/APIReference/API_PutLogEvents.html
+    only a couple are handled by this function. Namely the size in bytes, the chronological order and the maximum
+    number of events.
+    """
+    max_batch_size_bytes = settings.REQUEST_LOG.get('MAX_BATCH_SIZE_BYTES', MAX_BATCH_SIZE_BYTES)
+    max_batch_size = settings.REQUEST_LOG.get('MAX_BATCH_SIZE', MAX_BATCH_SIZE)
+    batch = []
+    batch_log_ids = []
+    batch_size_bytes = 0
+
+    for log_id, log_str in iter_request_logs(redis, count=max_batch_size):
+        try:
+            event, log_bytes = _get_log_event(log_str, max_batch_size_bytes)
+        except Exception:
+            # Acknowledged, since it would be read again (and fail again) by every run otherwise
+            logging.exception('Dropped the request log %s, which could not be read', log_id)
+            ack_request_logs(redis, [log_id])
+            continue
+
+        if log_bytes is None:
+            # If any log is bigger than the permitted batch size, spool the current batch, and the truncated log
+            # on it's own
+            _spool_batch(redis, spool, batch, batch_log_ids)
+            batch = []
+            batch_log_ids = []
+            batch_size_bytes = 0
+
+            _spool_batch(redis, spool, [event], [log_id])
+        else:
+            # Spool the current batch if we reached the maximum size of the batch OR before we exceed the
+            # maximum size of the batch in bytes.
+            if len(batch) == max_batch_size or batch_size_bytes + log_bytes > max_batch_size_bytes:
+                _spool_batch(redis, spool, batch, batch_log_ids)
+                batch = []
+                batch_log_ids = []
+                batch_size_bytes = 0
+
+            batch.append(event)
+            batch_log_ids.append(log_id)
+            batch_size_bytes += log_bytes
+
+    # Spool the batch if there are any logs left
+    _spool_batch(redis, spool, batch, batch_log_ids)
+
+
+def ship_spooled_batches(spool, sink, archive_storage=None):
+    """
+    Uploads the spooled batches in order (at most `sink.max_concurrency` at a time), and archives the uploaded ones.
+    Stops at the first failed upload (e.g. when throttled), so the rest are uploaded by the next run. The batches which
+    the sink rejects, or which failed `settings.REQUEST_LOG['MAX_UPLOAD_ATTEMPTS']` times, are quarantined instead,
+    so they don't block the next ones.
+    Returns the number of uploaded batches.
+    """
+    paths = spool.get_batch_paths()
+    uploaded_count = 0
+
+    for index in range(0, len(paths), sink.max_concurrency):
+        paths_group = paths[index:index + sink.max_concurrency]
+        if len(paths_group) == 1:
+            results = [_upload_batch(spool, sink, paths_group[0], archive_storage)]
+        else:
+            with ThreadPoolExecutor(max_workers=len(paths_group)) as executor:
+                results = list(executor.map(lambda path: _upload_batch(spool, sink, path, archive_storage), paths_group))
+
+        uploaded_count += results.count(UPLOADED)
+        if FAILED in results:
+            break
+
+    return uploaded_count
+
+
+def delete_old_request_log_archives(archive_storage):
+    """
+    Deletes the archived batches which are older than `settings.REQUEST_LOG_ARCHIVE_DAYS`, a day folder at a time.
+    """
+    oldest_kept_day = (timezone.now().date() - timezone.timedelta(days=settings.REQUEST_LOG_ARCHIVE_DAYS)).isoformat()
+    try:
+        days = archive_storage.listdir(settings.REQUEST_LOG_ARCHIVE_LOCATION)[0]
+    except FileNotFoundError:
+        # Nothing was archived yet, in a local folder
+        return
+
+    for day in days:
+        if day >= oldest_kept_day:
+            continue
+        day_location = '{}/{}'.format(settings.REQUEST_LOG_ARCHIVE_LOCATION, day)
+        for file_name in archive_storage.listdir(day_location)[1]:
+            archive_storage.delete('{}/{}'.format(day_location, file_name))
+
+
+def publish_shipping_metrics(redis, spool):
+    """
+    The spool is local to the worker, so its metrics are published through the cache, for the metrics endpoint.
+    """
+    metrics = spool.get_metrics()
+    metrics['stream_length'] = redis.xlen(REQUEST_LOG_STREAM)
+    metrics['last_run_timestamp'] = int(time.time())
+    cache.set(REQUEST_LOG_SHIPPING_METRICS_KEY, metrics, timeout=None)
+
+
+def _get_log_event(log_str, max_batch_size_bytes):
+    """
+    Returns the log event of the log, and its size in bytes. The request body of a log which is bigger than the
+    permitted batch size is truncated, and its size is returned as None.
+    """
+    log = json.loads(log_str)
+    log_bytes = len(log_str.encode('utf-8')) + LOG_EVENT_EXTRA_BYTES
+    if log_bytes <= max_batch_size_bytes:
+        return {'timestamp': log['timestamp_ms'], 'message': log_str}, log_bytes
+
+    request_body = log['request_body']
+    if not isinstance(request_body, str):
+        # The JSON request bodies are truncated as text
+        request_body = json.dumps(request_body)
+        log_bytes = len(_dump_truncated_log(log, request_body).encode('utf-8')) + LOG_EVENT_EXTRA_BYTES
+
+    # Truncate the request body by a multiple of 4, to be sure we don't break utf-8
+    extra_bytes = log_bytes - max_batch_size_bytes
+    extra_bytes_reminder = extra_bytes % 4
+    bytes_to_truncate = extra_bytes + extra_bytes_reminder
+    return {'timestamp': log['timestamp_ms'], 'message': _dump_truncated_log(log, request_body[:-bytes_to_truncate])}, None
+
+
+def _dump_truncated_log(log, request_body):
+    return json.dumps({
+        'timestamp_ms': log['timestamp_ms'],
+        'user_id': log['user_id'],
+        'method': log['method'],
+        'path': log['path'],
+        'status_code': log['status_code'],
+        'request_body': request_body,
+    })
+
+
+def _spool_batch(redis, spool, batch, log_ids):
+    if batch:
+        spool.append(batch)
+    ack_request_logs(redis, log_ids)
+
+
+def _upload_batch(spool, sink, path, archive_storage):
+    batch = spool.read(path)
+    try:
+        is_uploaded = sink.upload(sorted(batch, key=lambda x: x['timestamp']))
+    except BatchRejectedError:
+        logging.error('Quarantined the request log batch %s, which was rejected', os.path.basename(path))
+        spool.quarantine(path)
+        return QUARANTINED
+
+    if not is_uploaded:
+        max_attempts = settings.REQUEST_LOG.get('MAX_UPLOAD_ATTEMPTS', MAX_UPLOAD_ATTEMPTS)
+        if spool.record_failed_attempt(path) < max_attempts:
+            return FAILED
+        logging.error('Quarantined the request log batch %s, after %s failed uploads', os.path.basename(path), max_attempts)
+        spool.quarantine(path)
+        return QUARANTINED
+
+    spool.archive(path, archive_storage)
+    return UPLOADED
+
+
+def _dispatch_batch(client, log_group, log_stream, sequence_token, batch):
+    """
+    Returns the next sequence token, and whether the batch was sent.
+    """
+    try:
+        sorted_batch = sorted(batch, key=lambda x: x['timestamp'])
+        params = {
+            'logGroupName': log_group['logGroupName'],
+            'logStreamName': log_stream['logStreamName'],
+            'logEvents': sorted_batch,
+        }
+        if sequence_token:
+            params['sequenceToken'] = sequence_token
+        response = client.put_log_events(**params)
+        return response['nextSequenceToken'], True
+    except Exception as e:
+        # in case the request fails log the error and return the sequence_token; the batch stays in the spool
+        logging.exception('Failed to send log events batch to Cloud Watch')
+        if isinstance(e, ClientError) and e.response['Error']['Code'] in NON_RETRYABLE_ERROR_CODES:
+            raise BatchRejectedError() from e
+        return sequence_token, False
+
+
+def _provide_log_group(client, log_group_name):
+    try:
+        log_group = _retrieve_track_request_log_group(client, log_group_name)
+    except IndexError:
+        client.create_log_group(logGroupName=log_group_name)
+        log_group = _retrieve_track_request_log_group(client, log_group_name)
+    return log_group
+
+
+def _provide_log_stream(client, log_group):
+    now = timezone.now()
+    log_stream_name = '{}-{}'.format(now.month, now.year)
+    try:
+        log_stream = _retrieve_track_request_log_stream(client, log_group, log_stream_name)
+    except IndexError:
+        client.create_log_stream(logGroupName=log_group['logGroupName'], logStreamName=log_stream_name)
+        log_stream = _retrieve_track_request_log_stream(client, log_group, log_stream_name)
+    return log_stream
+
+
+def _retrieve_track_request_log_stream(client, log_group, stream_name):
+    """
+    Try to retrieve the track requests log stream.
+
+    When multiple log streams matching the stream name are found, the recently created one is returned.
+    When no log streams are found an IndexError exception is raised.
+    """
+    response = client.describe_log_streams(logGroupName=log_group['logGroupName'], logStreamNamePrefix=stream_name)
+    log_streams = response['logStreams']
+    if len(log_streams) > 1:
+        # return the most recently created log group
+        return sorted(log_streams, key=lambda x: x['creationTime'], reverse=True)[0]
+    return log_streams[0]
+
+
+def _retrieve_track_request_log_group(client, log_group_name):
+    """
+    Try to retrieve the track requests log group.
+
+    When multiple log groups matching the track request prefix are found, the recently created one is returned.
+    When no log groups are found an IndexError exception is raised.
+    """
+    response = client.describe_log_groups(logGroupNamePrefix=log_group_name)
+    log_groups = response['logGroups']
+    if len(log_groups) > 1:
+        # return the most recently created log group
+        return sorted(log_groups, key=lambda x: x['creationTime'], reverse=True)[0]
+    return log_groups[0]
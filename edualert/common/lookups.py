@@ -0,0 +1,60 @@
+from django.db.models import CharField, TextField, Transform
+
+
+class ImmutableUnaccent(Transform):
+    """
+    Same as the `unaccent` lookup, but uses the `immutable_unaccent` database function (created by the common migrations),
+    which can be used in the expression indexes of the searched columns.
+    """
+    bilateral = True
+    lookup_name = 'immutable_unaccent'
+    function = 'immutable_unaccent'
+
+
+CharField.register_lookup(ImmutableUnaccent)
+TextField.register_lookup(ImmutableUnaccent)
+
+
+def is_trigram_extension_available(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def is_index_invalid(schema_editor, index_name):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(%s) AND NOT indisvalid', [index_name])
+        return cursor.fetchone() is not None
+
+
+def get_search_index_name(table, column):
+    return '{}_{}_trgm'.format(table, column)
+
+
+class CreateSearchIndexes:
+    """
+    Migration code which creates trigram indexes on the given (table, column) pairs, matching the `immutable_unaccent__icontains` lookups.
+    The indexes are skipped if the database server doesn't provide the pg_trgm extension (the searches still work, without an index).
+    The indexes are built concurrently, so the tables aren't locked against writes; the migrations using this must be non-atomic.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __call__(self, apps, schema_editor):
+        if not is_trigram_extension_available(schema_editor):
+            return
+
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, column in self.columns:
+            index_name = get_search_index_name(table, column)
+            # A concurrent build which failed leaves an invalid index behind, which has to be built again
+            if is_index_invalid(schema_editor, index_name):
+                schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS {}'.format(index_name))
+            schema_editor.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS {} ON {} USING gin (upper(immutable_unaccent({})) gin_trgm_ops)'.format(
+                index_name, table, column
+            ))
+
+    def reverse(self, apps, schema_editor):
+        for table, column in self.columns:
+            schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS {}'.format(get_search_index_name(table, column)))
@@ -1,15 +1,22 @@
 import json
 import logging
+import random
 import time
-import uuid
-from collections import Counter
+from contextlib import ExitStack
 
 from django.conf import settings
-from django.core.cache import cache
 from django.core.exceptions import MiddlewareNotUsed
-from django.db import connection
-from django.utils import timezone
+from django.db import connection, connections
 from django.utils.deprecation import MiddlewareMixin
+from django_redis import get_redis_connection
+from rest_framework.permissions import SAFE_METHODS
+
+from edualert.common.reporting_database import record_recent_writes
+from edualert.common.request_log import append_request_logs
+from edualert.common.request_metrics import RequestMetrics, QueryTimer, install_serializer_timer, set_current_metrics, \
+    record_request_metrics
+from edualert.common.utils import get_duplicated_queries
+from edualert.profiles.last_online import record_last_online
 
 
 class UpdateLastOnlineMiddleware:
@@ -19,12 +26,83 @@ class UpdateLastOnlineMiddleware:
     def __call__(self, request):
         response = self.get_response(request)
 
-        if request.user.is_authenticated and getattr(request.user, 'user_profile', None):
-            request.user.user_profile.last_online = timezone.now()
-            request.user.user_profile.save()
+        if request.user.is_authenticated:
+            record_last_online(request.user)
+
+        return response
+
+
+class ReportingDatabaseStickinessMiddleware:
+    """
+    Keeps the reads of the users who changed something on the primary database for REPORTING_DATABASE_STICKY_SECONDS,
+    so they see their own changes, even if the reporting replica lags behind.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REPORTING_DATABASE_ENABLED:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if request.method not in SAFE_METHODS and request.user.is_authenticated:
+            record_recent_writes(request.user)
+
+        return response
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures the latency, the SQL queries, the serialization time and the response size of a sample of the requests,
+    aggregated by URL name & method in the cache. The requests slower than REQUEST_METRICS_SLOW_REQUEST_MS are logged.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        install_serializer_timer()
+
+    def __call__(self, request):
+        metrics = RequestMetrics() if random.random() < settings.REQUEST_METRICS_SAMPLE_RATE else None
+
+        started_at = time.perf_counter()
+        if metrics is None:
+            response = self.get_response(request)
+        else:
+            set_current_metrics(metrics)
+            try:
+                with ExitStack() as stack:
+                    for db_connection in connections.all():
+                        stack.enter_context(db_connection.execute_wrapper(QueryTimer(metrics)))
+                    response = self.get_response(request)
+            finally:
+                set_current_metrics(None)
+        duration = time.perf_counter() - started_at
+
+        try:
+            self.record(request, response, duration, metrics)
+        except Exception:
+            # regardless of error do not obstruct the requests
+            logging.exception('Failed to record the request metrics')
 
         return response
 
+    @staticmethod
+    def record(request, response, duration, metrics):
+        resolver_match = getattr(request, 'resolver_match', None)
+        url_name = resolver_match.view_name if resolver_match else None
+
+        if duration * 1000 >= settings.REQUEST_METRICS_SLOW_REQUEST_MS:
+            logging.warning('Slow request: %s %s took %.0f ms (status %s%s).', request.method, request.get_full_path(), duration * 1000,
+                            response.status_code, ', {} SQL queries'.format(metrics.queries_count) if metrics else '')
+
+        response_size = None if response.streaming else len(response.content)
+        record_request_metrics(request.method, url_name, duration, metrics, response_size)
+
 
 class SQLPrintingMiddleware(MiddlewareMixin):
     """
@@ -78,13 +156,12 @@ class SQLPrintingMiddleware(MiddlewareMixin):
         replace_tuple = (" " * indentation, YELLOW, str(total_time), str(len(connection.queries)), WHITE)
         print("{}{}[TOTAL TIME: {} seconds ({} queries)]{}\n".format(*replace_tuple))
 
-        duplicate_count = Counter(raw_queries)
-        if duplicate_count:
+        duplicates = get_duplicated_queries(raw_queries)
+        if duplicates:
             print('{}{}Duplicates:{}\n'.format(" " * indentation, RED, WHITE))
-            for key, value in duplicate_count.items():
-                if value > 1:
-                    print(" " * indentation + key)
-                    print('{}Duplicated {}[{}]{} times\n'.format(RED, " " * indentation, value, WHITE))
+            for key, value in duplicates:
+                print(" " * indentation + key)
+                print('{}Duplicated {}[{}]{} times\n'.format(RED, " " * indentation, value, WHITE))
 
         end = time.time()
         replace_tuple = (" " * indentation, YELLOW, str(end - start), WHITE)
@@ -124,8 +201,8 @@ def _process_request(request, response):
     if not user or user.is_anonymous or not user.id:
         return response
 
-    # Save request information in cache to be extracted and saved to a persistent storage
-    cache_value_raw = {
+    # Append request information to the request log stream, to be extracted and saved to a persistent storage
+    log = {
         'timestamp_ms': int(time.time() * 1000),
         'user_id': request.user.id,
         'method': request.method,
@@ -133,9 +210,7 @@ def _process_request(request, response):
         'status_code': response.status_code,
         'request_body': _get_request_body(request),
     }
-    cache_key = 'track_request_{}'.format(uuid.uuid4())
-    cache_value = json.dumps(cache_value_raw)
-    cache.set(cache_key, cache_value, timeout=None)
+    append_request_logs(get_redis_connection('default'), [json.dumps(log)])
 
 
 def _get_request_body(request):
@@ -0,0 +1,42 @@
+# Generated by Django 3.0.4 on 2026-10-19 13:13
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('study_classes', '0009_auto_20201002_1400'),
+        ('subjects', '0016_delete_categorysubjectthrough'),
+        ('profiles', '0018_auto_20201027_1345'),
+        ('common', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('import_type', models.CharField(choices=[('USERS', 'Users'), ('CATALOGS', 'Catalogs')], max_length=64)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('IN_PROGRESS', 'In progress'), ('FINISHED', 'Finished'), ('FAILED', 'Failed')], default='PENDING', max_length=64)),
+                ('language', models.CharField(default='en', help_text='Only for user imports.', max_length=10)),
+                ('file_content', models.TextField()),
+                ('rows_count', models.PositiveIntegerField(default=0)),
+                ('processed_rows_count', models.PositiveIntegerField(default=0)),
+                ('report', django.contrib.postgres.fields.jsonb.JSONField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', related_query_name='import_job', to='profiles.UserProfile')),
+                ('study_class', models.ForeignKey(blank=True, help_text='Only for catalog imports.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', related_query_name='import_job', to='study_classes.StudyClass')),
+                ('subject', models.ForeignKey(blank=True, help_text='Only for catalog imports.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', related_query_name='import_job', to='subjects.Subject')),
+            ],
+            options={
+                'ordering': ('-modified', '-created'),
+                'get_latest_by': 'modified',
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations
+
+
+def create_immutable_unaccent(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT to_regprocedure('public.unaccent(regdictionary, text)') IS NOT NULL")
+        has_dictionary_variant = cursor.fetchone()[0]
+
+    # unaccent(text) is only STABLE (it looks up the dictionary in the search path), so it can't be used in an index expression;
+    # passing the dictionary explicitly makes the result depend only on the argument
+    body = "public.unaccent('public.unaccent'::regdictionary, $1)" if has_dictionary_variant else "public.unaccent($1)"
+    schema_editor.execute(
+        "CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text AS $$ SELECT {} $$ "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT".format(body)
+    )
+
+
+def drop_immutable_unaccent(apps, schema_editor):
+    schema_editor.execute("DROP FUNCTION IF EXISTS immutable_unaccent(text)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_importjob'),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RunPython(code=create_immutable_unaccent, reverse_code=drop_immutable_unaccent),
+    ]
@@ -3,11 +3,17 @@ import hmac
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.postgres.fields import JSONField
 from django.db import IntegrityError
 from django.db import models
 from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from django_extensions.db.models import TimeStampedModel
 from oauthlib.common import generate_token
 
+from edualert.common import constants
+from edualert.common import lookups  # noqa (registers the search lookups)
+
 
 class AccessKey(models.Model):
     """
@@ -80,3 +86,34 @@ class AccessKey(models.Model):
 
     def __str__(self):
         return self.token
+
+
+class ImportJob(TimeStampedModel):
+    """
+    A CSV import which is processed in the background.
+
+    The uploaded file is stored together with the job, so it can be processed by any worker.
+    The report has the same structure as the one returned by the synchronous imports.
+    """
+    created_by = models.ForeignKey("profiles.UserProfile", on_delete=models.CASCADE, related_name="import_jobs", related_query_name="import_job")
+
+    ImportTypes = constants.ImportTypes
+    import_type = models.CharField(max_length=64, choices=ImportTypes.choices)
+    Statuses = constants.ImportJobStatuses
+    status = models.CharField(max_length=64, choices=Statuses.choices, default=Statuses.PENDING)
+
+    language = models.CharField(max_length=10, default='en', help_text=_("Only for user imports."))
+    study_class = models.ForeignKey("study_classes.StudyClass", on_delete=models.CASCADE, null=True, blank=True,
+                                    related_name="import_jobs", related_query_name="import_job", help_text=_("Only for catalog imports."))
+    subject = models.ForeignKey("subjects.Subject", on_delete=models.CASCADE, null=True, blank=True,
+                                related_name="import_jobs", related_query_name="import_job", help_text=_("Only for catalog imports."))
+
+    file_content = models.TextField()
+    rows_count = models.PositiveIntegerField(default=0)
+    processed_rows_count = models.PositiveIntegerField(default=0)
+    report = JSONField(null=True, blank=True)
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f"ImportJob {self.id} {self.import_type}"
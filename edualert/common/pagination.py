@@ -1,7 +1,180 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
 
 
 class CommonPagination(PageNumberPagination):
     page_size = 30
     page_size_query_param = 'page_size'
     max_page_size = 1000
+
+
+class CommonKeysetPagination(CommonPagination):
+    """
+    Page number pagination, which switches to keyset (cursor) pagination when the `cursor` query param is present
+    (an empty value requests the first page).
+    In cursor mode, each page seeks after the ordering values of the previous page's last row, instead of using an OFFSET,
+    and the total COUNT query is skipped. An estimated count (taken from the query planner) can be requested with `count=estimated`.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    estimated_count_value = 'estimated'
+    invalid_cursor_message = 'Invalid cursor.'
+    keyset_annotation_prefix = '_keyset_'
+
+    def __init__(self):
+        self.use_cursor = False
+        self.keyset = None
+        self.next_position = None
+        self.estimated_count = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        if request.query_params.get(self.count_query_param) == self.estimated_count_value:
+            self.estimated_count = self.get_estimated_count(queryset)
+
+        queryset, self.keyset = self.annotate_keyset(queryset)
+        position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.get_seek_filter(position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:page_size + 1])
+        self.next_position = None
+        if len(results) > page_size:
+            results = results[:page_size]
+            self.next_position = [getattr(results[-1], name) for name, descending, nulls_last in self.keyset]
+
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+
+        response_data = [
+            ('next', self.get_next_link()),
+            ('results', data)
+        ]
+        if self.estimated_count is not None:
+            response_data.insert(0, ('count', self.estimated_count))
+        return Response(OrderedDict(response_data))
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def annotate_keyset(self, queryset):
+        """
+        Annotates the queryset with one value for each of its ordering terms (with the primary key added as a tie-breaker),
+        and orders it by these annotations, keeping the NULLs placement of the terms. Returns the queryset and a list of
+        (annotation name, is descending, are NULLs last) tuples.
+        """
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not any(term in ['pk', '-pk', 'id', '-id'] for term in ordering):
+            ordering.append('pk')
+
+        keyset = []
+        annotations = {}
+        for index, term in enumerate(ordering):
+            descending = False
+            nulls_last = None
+            if isinstance(term, str):
+                if term.startswith('-'):
+                    descending = True
+                    term = term[1:]
+                expression = F(term)
+            elif isinstance(term, OrderBy):
+                descending = term.descending
+                expression = term.expression
+                if term.nulls_last or term.nulls_first:
+                    nulls_last = term.nulls_last
+            else:
+                expression = term
+
+            if nulls_last is None:
+                # The PostgreSQL default: NULLs are last in ascending order, and first in descending order
+                nulls_last = not descending
+
+            name = '{}{}'.format(self.keyset_annotation_prefix, index)
+            annotations[name] = expression
+            keyset.append((name, descending, nulls_last))
+
+        queryset = queryset.annotate(**annotations).order_by(*[
+            OrderBy(F(name), descending=descending, nulls_last=nulls_last, nulls_first=not nulls_last)
+            for name, descending, nulls_last in keyset
+        ])
+        return queryset, keyset
+
+    def get_seek_filter(self, position):
+        """
+        The rows which come after the given position: (a > x) OR (a = x AND b > y) OR ...
+        NULL values come after or before all the other values, as placed by the ordering.
+        """
+        seek_filter = Q(pk__in=[])
+        equal_filter = Q()
+        for (name, descending, nulls_last), value in zip(self.keyset, position):
+            seek_filter |= equal_filter & self.get_after_filter(name, descending, nulls_last, value)
+            equal_filter &= Q(**{'{}__isnull'.format(name): True}) if value is None else Q(**{name: value})
+        return seek_filter
+
+    @staticmethod
+    def get_after_filter(name, descending, nulls_last, value):
+        if value is None:
+            return Q(pk__in=[]) if nulls_last else Q(**{'{}__isnull'.format(name): False})
+        after_filter = Q(**{'{}__{}'.format(name, 'lt' if descending else 'gt'): value})
+        if nulls_last:
+            after_filter |= Q(**{'{}__isnull'.format(name): True})
+        return after_filter
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position, cls=DjangoJSONEncoder).encode()).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.keyset):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    @staticmethod
+    def get_estimated_count(queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) {}'.format(sql), params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']['Plan Rows']
@@ -0,0 +1,113 @@
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+# The read replica which serves the statistics views, the exports and the nightly reports
+REPORTING_DATABASE = 'reporting'
+# Users who changed something recently, and whose reads stay on the primary database for a while
+RECENT_WRITES_KEY = 'reporting_database_recent_writes_{}'
+
+_reporting_reads = ContextVar('reporting_reads', default=False)
+
+
+class ReportingDatabaseRouter:
+    """
+    Sends the reads made inside `reporting_database_reads()` to the reporting replica, when REPORTING_DATABASE_ENABLED.
+    All the writes go to the primary database, and once something is written, the rest of the reads from the same
+    context go to the primary database as well, so they see the written data.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _reporting_reads.get() and settings.REPORTING_DATABASE_ENABLED:
+            return REPORTING_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        if _reporting_reads.get():
+            _reporting_reads.set(False)
+        # Even for the instances read from the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica has the same data as the primary database
+        databases = {DEFAULT_DB_ALIAS, REPORTING_DATABASE}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPORTING_DATABASE:
+            return False
+        return None
+
+
+@contextmanager
+def reporting_database_reads():
+    """
+    Reads the querysets evaluated inside it from the reporting replica.
+    """
+    token = _reporting_reads.set(True)
+    try:
+        yield
+    finally:
+        _reporting_reads.reset(token)
+
+
+@contextmanager
+def primary_database_reads():
+    """
+    Reads the querysets evaluated inside it from the primary database, even inside `reporting_database_reads()`.
+    """
+    token = _reporting_reads.set(False)
+    try:
+        yield
+    finally:
+        _reporting_reads.reset(token)
+
+
+def reads_from_reporting_database(function):
+    """
+    Decorator for the read-only tasks, which runs them inside `reporting_database_reads()`.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with reporting_database_reads():
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def record_recent_writes(user):
+    cache.set(RECENT_WRITES_KEY.format(user.id), True, timeout=settings.REPORTING_DATABASE_STICKY_SECONDS)
+
+
+def has_recent_writes(user):
+    return user.is_authenticated and cache.get(RECENT_WRITES_KEY.format(user.id), False)
+
+
+class ReportingDatabaseMixin:
+    """
+    Reads the data of the safe requests from the reporting replica. The requests of the users who changed something
+    in the last REPORTING_DATABASE_STICKY_SECONDS are served from the primary database, since the replica might not
+    have their changes yet. The authentication & the permission checks always read from the primary database.
+    """
+    _reporting_reads_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        if request.method in SAFE_METHODS and not has_recent_writes(request.user):
+            self._reporting_reads_token = _reporting_reads.set(True)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self._reporting_reads_token is not None:
+                _reporting_reads.reset(self._reporting_reads_token)
+                self._reporting_reads_token = None
@@ -0,0 +1,73 @@
+from django.conf import settings
+from redis.exceptions import ResponseError
+
+# The tracked requests are appended to this Redis stream, and consumed by `send_request_log_to_cloud_watch_task`
+REQUEST_LOG_STREAM = 'request_log'
+REQUEST_LOG_GROUP = 'cloud_watch'
+REQUEST_LOG_CONSUMER = 'send_request_log_to_cloud_watch_task'
+REQUEST_LOG_FIELD = b'log'
+
+
+def append_request_logs(redis, logs):
+    """
+    Appends the logs (JSON strings) to the request log stream, in a single round trip.
+    The stream is trimmed to about `REQUEST_LOG['MAX_STREAM_LENGTH']` entries, dropping the oldest ones,
+    so its memory stays bounded even when the logs aren't consumed.
+    """
+    max_length = settings.REQUEST_LOG.get('MAX_STREAM_LENGTH', 1_000_000)
+    with redis.pipeline(transaction=False) as pipeline:
+        for log in logs:
+            pipeline.xadd(REQUEST_LOG_STREAM, {REQUEST_LOG_FIELD: log}, maxlen=max_length, approximate=True)
+        pipeline.execute()
+
+
+def iter_request_logs(redis, count=1000):
+    """
+    Yields the (ID, log) pairs of the request logs which were read before but weren't acknowledged
+    (e.g. their dispatch failed), followed by the new ones.
+    Stops when the stream is drained, so a busy stream doesn't keep a run going indefinitely.
+    """
+    try:
+        redis.xgroup_create(REQUEST_LOG_STREAM, REQUEST_LOG_GROUP, id='0', mkstream=True)
+    except ResponseError as error:
+        if 'BUSYGROUP' not in str(error):
+            raise
+
+    # The pending entries stay pending until acknowledged, so they are read from the last seen ID
+    last_pending_id = '0'
+    while True:
+        entries = _read_group(redis, last_pending_id, count)
+        if not entries:
+            break
+        for entry_id, fields in entries:
+            if not fields:
+                # Trimmed from the stream before being acknowledged
+                ack_request_logs(redis, [entry_id])
+                continue
+            yield entry_id, fields[REQUEST_LOG_FIELD].decode('utf-8')
+        last_pending_id = entries[-1][0]
+
+    while True:
+        entries = _read_group(redis, '>', count)
+        for entry_id, fields in entries:
+            yield entry_id, fields[REQUEST_LOG_FIELD].decode('utf-8')
+        if len(entries) < count:
+            break
+
+
+def ack_request_logs(redis, log_ids):
+    """
+    Marks the logs as dispatched, and removes them from the stream.
+    """
+    if not log_ids:
+        return
+
+    with redis.pipeline(transaction=False) as pipeline:
+        pipeline.xack(REQUEST_LOG_STREAM, REQUEST_LOG_GROUP, *log_ids)
+        pipeline.xdel(REQUEST_LOG_STREAM, *log_ids)
+        pipeline.execute()
+
+
+def _read_group(redis, stream_id, count):
+    response = redis.xreadgroup(REQUEST_LOG_GROUP, REQUEST_LOG_CONSUMER, {REQUEST_LOG_STREAM: stream_id}, count=count)
+    return response[0][1] if response else []
@@ -0,0 +1,203 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.serializers import Serializer, ListSerializer
+
+from edualert.common.log_shipping import REQUEST_LOG_SHIPPING_METRICS_KEY
+from edualert.common.utils import increment_cache_counter
+
+# Upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+# The requests which couldn't be resolved to an URL name are counted together
+UNRESOLVED_URL_NAME = 'unresolved'
+
+ENDPOINTS_INDEX_KEY = 'request_metrics_endpoints'
+ENDPOINTS_INDEX_REFRESH_SECONDS = 5 * 60
+METRIC_KEY = 'request_metrics_{}_{}_{}'
+
+# The sums are kept as integers, since the cache can only increment integers
+COUNTER_METRICS = [
+    # (key name, Prometheus name, help, unit divisor)
+    ('requests', 'edualert_http_requests_total', 'Sampled requests.', 1),
+    ('slow_requests', 'edualert_http_slow_requests_total', 'Requests slower than the slow request threshold (all, not only the sampled ones).', 1),
+    ('db_queries', 'edualert_http_db_queries_total', 'SQL queries run by the sampled requests.', 1),
+    ('db_duration_us', 'edualert_http_db_duration_seconds_total', 'Time spent running the SQL queries of the sampled requests.', 1000000),
+    ('serializer_duration_us', 'edualert_http_serializer_duration_seconds_total', 'Time spent serializing the data of the sampled requests.', 1000000),
+    ('response_bytes', 'edualert_http_response_size_bytes_total', 'Size of the responses of the sampled requests.', 1),
+]
+# Published by the request log shipping task
+SHIPPING_METRICS = [
+    ('stream_length', 'edualert_request_log_stream_length', 'Request logs waiting in the Redis stream.'),
+    ('spool_batches', 'edualert_request_log_spool_batches', 'Request log batches waiting in the spool to be uploaded.'),
+    ('spool_bytes', 'edualert_request_log_spool_bytes', 'Size of the request log batches waiting in the spool.'),
+    ('lag_seconds', 'edualert_request_log_lag_seconds', 'Age of the oldest request log batch waiting in the spool.'),
+    ('quarantined_batches', 'edualert_request_log_quarantined_batches', 'Request log batches which were set aside after failing to upload.'),
+    ('last_run_timestamp', 'edualert_request_log_last_run_timestamp_seconds', 'Time of the last run of the shipping task.'),
+]
+
+_local = threading.local()
+_registered_endpoints = {}
+_serializer_timer_installed = False
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries_count = 0
+        self.db_duration = 0
+        self.serializer_duration = 0
+        self.serializer_depth = 0
+
+
+class QueryTimer:
+    """
+    Database execute wrapper, which counts the queries and their duration.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.metrics.queries_count += 1
+            self.metrics.db_duration += time.perf_counter() - started_at
+
+
+def set_current_metrics(metrics):
+    _local.metrics = metrics
+
+
+def install_serializer_timer():
+    """
+    Measures the time spent in the `data` property of the serializers, for the requests which are sampled.
+    Only the outermost serializer is measured, since the nested serializers are part of its time.
+    """
+    global _serializer_timer_installed
+    if _serializer_timer_installed:
+        return
+
+    for serializer_class in [Serializer, ListSerializer]:
+        serializer_class.data = _timed_property(serializer_class.data)
+    _serializer_timer_installed = True
+
+
+def _timed_property(data_property):
+    def data(self):
+        metrics = getattr(_local, 'metrics', None)
+        if metrics is None or metrics.serializer_depth:
+            return data_property.fget(self)
+
+        metrics.serializer_depth += 1
+        started_at = time.perf_counter()
+        try:
+            return data_property.fget(self)
+        finally:
+            metrics.serializer_depth -= 1
+            metrics.serializer_duration += time.perf_counter() - started_at
+
+    return property(data)
+
+
+def record_request_metrics(method, url_name, duration, metrics=None, response_size=None):
+    """
+    Adds a request to the aggregated metrics. Without `metrics`, the request wasn't sampled, so only a slow request is counted.
+    """
+    endpoint = (method, url_name or UNRESOLVED_URL_NAME)
+    counters = {}
+    if duration * 1000 >= settings.REQUEST_METRICS_SLOW_REQUEST_MS:
+        counters['slow_requests'] = 1
+    if metrics is not None:
+        counters.update({
+            'requests': 1,
+            'duration_us': int(duration * 1000000),
+            'db_queries': metrics.queries_count,
+            'db_duration_us': int(metrics.db_duration * 1000000),
+            'serializer_duration_us': int(metrics.serializer_duration * 1000000),
+            'response_bytes': response_size or 0,
+            get_bucket_name(duration): 1,
+        })
+    if not counters:
+        return
+
+    _register_endpoint(endpoint)
+    for name, value in counters.items():
+        increment_cache_counter(METRIC_KEY.format(name, *endpoint), value)
+
+
+def get_bucket_name(duration):
+    for upper_bound in LATENCY_BUCKETS:
+        if duration <= upper_bound:
+            return 'bucket_{}'.format(upper_bound)
+    return 'bucket_inf'
+
+
+def render_prometheus_metrics():
+    """
+    Returns the aggregated metrics of all the endpoints, in the Prometheus text format.
+    """
+    endpoints = cache.get(ENDPOINTS_INDEX_KEY) or []
+    names = [name for name, *_ in COUNTER_METRICS] + ['duration_us'] + \
+        ['bucket_{}'.format(upper_bound) for upper_bound in LATENCY_BUCKETS] + ['bucket_inf']
+    values = cache.get_many([METRIC_KEY.format(name, *endpoint) for endpoint in endpoints for name in names])
+
+    lines = [
+        '# HELP edualert_http_requests_sample_rate The sampled fraction of the requests.',
+        '# TYPE edualert_http_requests_sample_rate gauge',
+        'edualert_http_requests_sample_rate {}'.format(settings.REQUEST_METRICS_SAMPLE_RATE),
+    ]
+    for name, metric_name, metric_help, divisor in COUNTER_METRICS:
+        lines.append('# HELP {} {}'.format(metric_name, metric_help))
+        lines.append('# TYPE {} counter'.format(metric_name))
+        for endpoint in endpoints:
+            value = values.get(METRIC_KEY.format(name, *endpoint), 0)
+            lines.append('{}{{{}}} {}'.format(metric_name, _get_labels(endpoint), value / divisor if divisor != 1 else value))
+
+    metric_name = 'edualert_http_request_duration_seconds'
+    lines.append('# HELP {} Duration of the sampled requests.'.format(metric_name))
+    lines.append('# TYPE {} histogram'.format(metric_name))
+    for endpoint in endpoints:
+        cumulative_count = 0
+        for upper_bound in LATENCY_BUCKETS:
+            cumulative_count += values.get(METRIC_KEY.format('bucket_{}'.format(upper_bound), *endpoint), 0)
+            lines.append('{}_bucket{{{},le="{}"}} {}'.format(metric_name, _get_labels(endpoint), upper_bound, cumulative_count))
+        cumulative_count += values.get(METRIC_KEY.format('bucket_inf', *endpoint), 0)
+        lines.append('{}_bucket{{{},le="+Inf"}} {}'.format(metric_name, _get_labels(endpoint), cumulative_count))
+        duration_sum = values.get(METRIC_KEY.format('duration_us', *endpoint), 0) / 1000000
+        lines.append('{}_sum{{{}}} {}'.format(metric_name, _get_labels(endpoint), duration_sum))
+        lines.append('{}_count{{{}}} {}'.format(metric_name, _get_labels(endpoint), cumulative_count))
+
+    shipping_metrics = cache.get(REQUEST_LOG_SHIPPING_METRICS_KEY)
+    if shipping_metrics:
+        for name, metric_name, metric_help in SHIPPING_METRICS:
+            if name not in shipping_metrics:
+                # Published by an older version of the task
+                continue
+            lines.append('# HELP {} {}'.format(metric_name, metric_help))
+            lines.append('# TYPE {} gauge'.format(metric_name))
+            lines.append('{} {}'.format(metric_name, shipping_metrics[name]))
+
+    return '\n'.join(lines) + '\n'
+
+
+def _get_labels(endpoint):
+    return 'method="{}",url_name="{}"'.format(*endpoint)
+
+
+def _register_endpoint(endpoint):
+    """
+    Adds the endpoint to the index of the exported endpoints. The index is checked again from time to time,
+    in case a concurrent update of the index lost the endpoint.
+    """
+    now = time.monotonic()
+    registered_at = _registered_endpoints.get(endpoint)
+    if registered_at is not None and now - registered_at < ENDPOINTS_INDEX_REFRESH_SECONDS:
+        return
+
+    endpoints = cache.get(ENDPOINTS_INDEX_KEY) or []
+    if list(endpoint) not in endpoints:
+        cache.set(ENDPOINTS_INDEX_KEY, endpoints + [list(endpoint)], timeout=None)
+    _registered_endpoints[endpoint] = now
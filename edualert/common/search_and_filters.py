@@ -1,6 +1,8 @@
 from django.db.models.constants import LOOKUP_SEP
 from rest_framework import filters
 
+from edualert.common.lookups import ImmutableUnaccent
+
 
 class CommonSearchFilter(filters.SearchFilter):
     def construct_search(self, field_name):
@@ -8,7 +10,7 @@ class CommonSearchFilter(filters.SearchFilter):
         if lookup:
             field_name = field_name[1:]
         else:
-            lookup = LOOKUP_SEP.join(['unaccent', 'icontains'])
+            lookup = LOOKUP_SEP.join([ImmutableUnaccent.lookup_name, 'icontains'])
         return LOOKUP_SEP.join([field_name, lookup])
 
 
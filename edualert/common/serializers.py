@@ -3,6 +3,7 @@ import io
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 
+from edualert.common.models import ImportJob
 from edualert.common.validators import FileNameValidator
 
 
@@ -41,3 +42,9 @@ class CsvUploadSerializer(serializers.Serializer):
 
     def update(self, instance, validated_data):
         pass
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = ('id', 'import_type', 'status', 'rows_count', 'processed_rows_count', 'report', 'created', 'modified')
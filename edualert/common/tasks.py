@@ -1,17 +1,24 @@
-import json
+import csv
+import io
 import logging
-import boto3
 
-from botocore.config import Config
 from celery import shared_task
 from django.conf import settings
 from django.core.cache import cache
-from django.utils import timezone
+from django.utils import timezone, translation
+from django_redis import get_redis_connection
 
 from edualert.academic_calendars.utils import get_current_academic_calendar, generate_next_year_academic_calendar
 from edualert.academic_programs.utils import generate_next_year_academic_programs
+from edualert.catalogs.utils import CatalogsImporter, update_last_change_in_catalog
+from edualert.common.models import ImportJob
+from edualert.common.log_shipping import RequestLogSpool, get_request_log_sink, spool_request_logs, ship_spooled_batches, \
+    publish_shipping_metrics, delete_old_request_log_archives, REQUEST_LOG_SHIPPING_LOCK_KEY, REQUEST_LOG_SHIPPING_LOCK_TIMEOUT
+from edualert.common.utils import get_private_storage
 from edualert.profiles.constants import FAILING_1_SUBJECT_LABEL, FAILING_2_SUBJECTS_LABEL, EXEMPTED_SPORT_LABEL, EXEMPTED_RELIGION_LABEL
+from edualert.profiles.import_user_profiles import UserProfileImporter
 from edualert.profiles.models import Label, UserProfile
+from edualert.statistics.response_cache import invalidate_all_statistics
 
 
 @shared_task
@@ -25,6 +32,7 @@ def generate_next_study_year_task():
         generate_next_year_academic_calendar()
         generate_next_year_academic_programs()
         remove_students_from_study_classes()
+        invalidate_all_statistics()
 
 
 def remove_students_from_study_classes():
@@ -38,33 +46,72 @@ def remove_students_from_study_classes():
     UserProfile.objects.bulk_update(students_to_update, ['student_in_class'], batch_size=100)
 
 
+@shared_task
+def process_import_job_task(import_job_id):
+    """
+    Run a pending import job. The progress is saved after every chunk of processed rows, so it can be polled
+    by the client; the final report is saved on the job once all the rows were processed.
+    """
+    # Claim the job in a single query, so a job which is delivered twice is only run by one of the workers
+    claimed = ImportJob.objects.filter(id=import_job_id, status=ImportJob.Statuses.PENDING) \
+        .update(status=ImportJob.Statuses.IN_PROGRESS, modified=timezone.now())
+    if claimed != 1:
+        return
+
+    import_job = ImportJob.objects \
+        .select_related('created_by__school_unit', 'study_class__school_unit', 'study_class__academic_program', 'subject') \
+        .get(id=import_job_id)
+    import_job.rows_count = sum(1 for _ in csv.DictReader(io.StringIO(import_job.file_content)))
+    import_job.save(update_fields=['rows_count', 'modified'])
+
+    def save_progress(processed_rows_count):
+        import_job.processed_rows_count = processed_rows_count
+        import_job.save(update_fields=['processed_rows_count', 'modified'])
+
+    try:
+        with translation.override(import_job.language):
+            importer = _get_importer(import_job, io.StringIO(import_job.file_content), save_progress)
+            if import_job.import_type == ImportJob.ImportTypes.USERS:
+                report = importer.import_users_and_get_report()
+            else:
+                report = importer.import_catalogs_and_get_report()
+                update_last_change_in_catalog(import_job.created_by)
+    except Exception as e:
+        logging.exception('Import job {} failed: {}'.format(import_job.id, e))
+        import_job.status = ImportJob.Statuses.FAILED
+        import_job.save(update_fields=['status', 'modified'])
+        return
+
+    import_job.status = ImportJob.Statuses.FINISHED
+    import_job.processed_rows_count = import_job.rows_count
+    import_job.report = report
+    import_job.save(update_fields=['status', 'processed_rows_count', 'report', 'modified'])
+
+
+def _get_importer(import_job, file, progress_callback):
+    if import_job.import_type == ImportJob.ImportTypes.USERS:
+        return UserProfileImporter(file=file, request_user_profile=import_job.created_by, language=import_job.language,
+                                   progress_callback=progress_callback)
+
+    return CatalogsImporter(file=file, study_class=import_job.study_class, subject=import_job.subject,
+                            current_calendar=get_current_academic_calendar(), progress_callback=progress_callback)
+
+
 @shared_task()
 def send_request_log_to_cloud_watch_task():
     """
-    Dispatch logs to Cloud Watch Logs.
-
-    The name of the log group in which to put the logs is retrieved from `settings.REQUEST_LOG`.
-    The name of the log stream is composed from the current month and year in the MM-YYYY format.
-
-    Requires permission to execute the following AWS actions:
-    - logs:DescribeLogGroups
-    - logs:DescribeLogStreams
-    - logs:CreateLogGroup
-    - logs:CreateLogStream
-    - logs:PutLogEvents
-
-    Warning!
-    From the requirements of posting events to a stream which are listed here:
-    https://docs.aws.amazon.com/AmazonCloudWatchLogs/latest/APIReference/API_PutLogEvents.html
-    only a couple are handled by this function. Namely the size in bytes, the chronological order and the maximum
-    number of events.
+    Ship the request logs to Cloud Watch Logs (or to the sink set in `settings.REQUEST_LOG['SINK']`).
+
+    The logs are moved from the request log Redis stream to a local spool first, so the batches which fail to upload
+    (e.g. when throttled, or when the worker crashes) are uploaded by the next run. The uploaded batches are archived
+    in the private file storage, in daily folders under `settings.REQUEST_LOG_ARCHIVE_LOCATION`.
     """
 
-    # check we are using the expected redis client because we rely on a specific function from it to iterate through
-    # the cache keys
-    if settings.CACHES['default']['BACKEND'] != "django_redis.cache.RedisCache" or \
-            (not hasattr(cache, 'iter_keys') or not callable(cache.iter_keys)):
-        logging.error("Expected 'default' cache to be django-redis and have a function `iter_keys`.")
+    # check we are using the expected redis client because the logs are kept in a redis stream
+    try:
+        redis = get_redis_connection('default')
+    except NotImplementedError:
+        logging.error("Expected 'default' cache to be django-redis.")
         return
 
     if not hasattr(settings, 'REQUEST_LOG') or \
@@ -74,137 +121,21 @@ def send_request_log_to_cloud_watch_task():
         logging.error("Expected 'LOG_GROUP_NAME' and 'REGION_NAME' to be present in settings.REQUEST_LOG")
         return
 
-    log_group_name = settings.REQUEST_LOG['LOG_GROUP_NAME']
-    log_group_region_name = settings.REQUEST_LOG['REGION_NAME']
-    client = boto3.client('logs', config=Config(region_name=log_group_region_name))
-
-    log_group = _provide_log_group(client, log_group_name)
-    log_stream = _provide_log_stream(client, log_group)
-
-    # `max_batch_size_bytes`, `log_event_extra_bytes` and `max_batch_size` are taken from here:
-    # https://docs.aws.amazon.com/AmazonCloudWatchLogs/latest/APIReference/API_PutLogEvents.html
-    max_batch_size_bytes = settings.REQUEST_LOG.get('MAX_BATCH_SIZE_BYTES', 1_048_576)  # 1MB default
-    log_event_extra_bytes = 26
-    max_batch_size = settings.REQUEST_LOG.get('MAX_BATCH_SIZE', 10_000)
-    batch = []
-    batch_size_bytes = 0
-    sequence_token = log_stream['uploadSequenceToken'] if 'uploadSequenceToken' in log_stream else None
-
-    for cache_key in cache.iter_keys("track_request_*"):
-        # extract log from cache
-        log_str = cache.get(cache_key)
-        cache.set(cache_key, '', timeout=0)
-        # extract timestamp from log
-        log = json.loads(log_str)
-        log_timestamp = log['timestamp_ms']
-
-        log_bytes = len(log_str.encode('utf-8')) + log_event_extra_bytes
-        if log_bytes > max_batch_size_bytes:
-            # If any log is bigger than the permitted batch size, send the current batch, truncate the response body
-            # and send the log on it's own
-
-            sequence_token = _dispatch_batch(client, log_group, log_stream, sequence_token, batch)
-            batch = []
-            batch_size_bytes = 0
-
-            # Truncate the response body by a multiple of 4, to be sure we don't break utf-8 and send it
-            extra_bytes = log_bytes - max_batch_size_bytes
-            extra_bytes_reminder = extra_bytes % 4
-            bytes_to_truncate = extra_bytes + extra_bytes_reminder
-            log_str = json.dumps({
-                'timestamp_ms': log['timestamp_ms'],
-                'user_id': log['user_id'],
-                'method': log['method'],
-                'path': log['path'],
-                'status_code': log['status_code'],
-                'request_body': log['request_body'][:-bytes_to_truncate],
-            })
-            sequence_token = _dispatch_batch(client, log_group, log_stream, sequence_token, [{
-                'timestamp': log_timestamp,
-                'message': log_str,
-            }])
-        else:
-            # Send current bach to Cloud Watch Logs if we reached the maximum size of the batch OR before we exceed the
-            # maximum size of the batch in bytes.
-            if len(batch) == max_batch_size or batch_size_bytes + log_bytes > max_batch_size_bytes:
-                sequence_token = _dispatch_batch(client, log_group, log_stream, sequence_token, batch)
-                batch = []
-                batch_size_bytes = 0
-
-            batch.append({
-                'timestamp': log_timestamp,
-                'message': log_str,
-            })
-            batch_size_bytes += log_bytes
-
-    # Dispatch batch if there are any logs left
-    if len(batch) > 0:
-        _dispatch_batch(client, log_group, log_stream, sequence_token, batch)
-
-
-def _dispatch_batch(client, log_group, log_stream, sequence_token, batch):
-    try:
-        sorted_batch = sorted(batch, key=lambda x: x['timestamp'])
-        params = {
-            'logGroupName': log_group['logGroupName'],
-            'logStreamName': log_stream['logStreamName'],
-            'logEvents': sorted_batch,
-        }
-        if sequence_token:
-            params['sequenceToken'] = sequence_token
-        response = client.put_log_events(**params)
-        return response['nextSequenceToken']
-    except Exception:
-        # in case the request fails log the error and the batch and return the sequence_token
-        logging.exception('Failed to send log events batch to Cloud Watch\nBatch: {}'.format(batch))
-        return sequence_token
-
-
-def _provide_log_group(client, log_group_name):
-    try:
-        log_group = _retrieve_track_request_log_group(client, log_group_name)
-    except IndexError:
-        client.create_log_group(logGroupName=log_group_name)
-        log_group = _retrieve_track_request_log_group(client, log_group_name)
-    return log_group
-
+    # The runs can overlap (e.g. a throttled run lasts longer than the schedule's interval), and would upload the same
+    # spooled batches otherwise
+    if not cache.add(REQUEST_LOG_SHIPPING_LOCK_KEY, True, timeout=REQUEST_LOG_SHIPPING_LOCK_TIMEOUT):
+        logging.warning('The request logs are still being shipped by a previous run.')
+        return
 
-def _provide_log_stream(client, log_group):
-    now = timezone.now()
-    log_stream_name = '{}-{}'.format(now.month, now.year)
     try:
-        log_stream = _retrieve_track_request_log_stream(client, log_group, log_stream_name)
-    except IndexError:
-        client.create_log_stream(logGroupName=log_group['logGroupName'], logStreamName=log_stream_name)
-        log_stream = _retrieve_track_request_log_stream(client, log_group, log_stream_name)
-    return log_stream
+        spool = RequestLogSpool(settings.REQUEST_LOG_SPOOL_ROOT)
+        spool_request_logs(redis, spool)
+        ship_spooled_batches(spool, get_request_log_sink(), get_private_storage())
+        publish_shipping_metrics(redis, spool)
+    finally:
+        cache.delete(REQUEST_LOG_SHIPPING_LOCK_KEY)
 
 
-def _retrieve_track_request_log_stream(client, log_group, stream_name):
-    """
-    Try to retrieve the track requests log stream.
-
-    When multiple log streams matching the stream name are found, the recently created one is returned.
-    When no log streams are found an IndexError exception is raised.
-    """
-    response = client.describe_log_streams(logGroupName=log_group['logGroupName'], logStreamNamePrefix=stream_name)
-    log_streams = response['logStreams']
-    if len(log_streams) > 1:
-        # return the most recently created log group
-        return sorted(log_streams, key=lambda x: x['creationTime'], reverse=True)[0]
-    return log_streams[0]
-
-
-def _retrieve_track_request_log_group(client, log_group_name):
-    """
-    Try to retrieve the track requests log group.
-
-    When multiple log groups matching the track request prefix are found, the recently created one is returned.
-    When no log groups are found an IndexError exception is raised.
-    """
-    response = client.describe_log_groups(logGroupNamePrefix=log_group_name)
-    log_groups = response['logGroups']
-    if len(log_groups) > 1:
-        # return the most recently created log group
-        return sorted(log_groups, key=lambda x: x['creationTime'], reverse=True)[0]
-    return log_groups[0]
+@shared_task()
+def delete_old_request_log_archives_task():
+    delete_old_request_log_archives(get_private_storage())
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+from edualert.common.api_tests import get_requests_report, request_records
+
+
+class CommonTestRunner(DiscoverRunner):
+    """
+    Prints the endpoints which ran the most queries and took the longest during the API tests, after running them.
+    The requests made in the parallel test processes (--parallel) are not reported.
+    """
+
+    def run_suite(self, suite, **kwargs):
+        result = super().run_suite(suite, **kwargs)
+
+        if request_records and settings.TEST_REQUESTS_REPORT_SIZE:
+            print('\n'.join(['', *get_requests_report(request_records, settings.TEST_REQUESTS_REPORT_SIZE)]))
+        return result
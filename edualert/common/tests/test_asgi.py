@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+from django.http import HttpRequest
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+
+from edualert.common.asgi import ASGIHandler, DEFAULT_THREAD_POOL, POLLING_THREAD_POOL
+
+
+class RecordingASGIHandler(ASGIHandler):
+    def __init__(self):
+        super().__init__()
+        self.thread_names = []
+
+    def get_response_in_thread(self, request):
+        self.thread_names.append(threading.current_thread().name)
+        return super().get_response_in_thread(request)
+
+
+class ASGIHandlerTestCase(SimpleTestCase):
+    def setUp(self):
+        self.handler = RecordingASGIHandler()
+
+    def tearDown(self):
+        for executor in self.handler.executors.values():
+            executor.shutdown()
+
+    def get(self, path):
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'', 'headers': [],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 12345), 'scheme': 'http',
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(self.handler(scope, receive, send))
+        return messages[0]['status']
+
+    def test_get_thread_pool(self):
+        for url_name in ['statistics:own-statistics', 'statistics:own-school-situation', 'statistics:own-activity-history',
+                         'notifications:my-received-message-list']:
+            request = HttpRequest()
+            request.path_info = reverse(url_name)
+            self.assertEqual(ASGIHandler.get_thread_pool(request), POLLING_THREAD_POOL)
+
+        for path in [reverse('statistics:pupils-statistics'), '/unknown/']:
+            request = HttpRequest()
+            request.path_info = path
+            self.assertEqual(ASGIHandler.get_thread_pool(request), DEFAULT_THREAD_POOL)
+
+    def test_request_runs_in_thread_pool(self):
+        self.assertEqual(self.get(reverse('statistics:own-statistics')), status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get(reverse('statistics:pupils-statistics')), status.HTTP_401_UNAUTHORIZED)
+
+        self.assertEqual(len(self.handler.thread_names), 2)
+        self.assertTrue(self.handler.thread_names[0].startswith('asgi-polling_'))
+        self.assertTrue(self.handler.thread_names[1].startswith('asgi_'))
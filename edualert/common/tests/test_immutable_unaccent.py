@@ -0,0 +1,30 @@
+from django.urls import reverse
+from rest_framework import status
+
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.profiles.factories import UserProfileFactory
+from edualert.profiles.models import UserProfile
+
+
+class ImmutableUnaccentTestCase(CommonAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile1 = UserProfileFactory(full_name='Ștefan Țurcanu')
+        cls.profile2 = UserProfileFactory(full_name='Stefan Pirvu')
+
+    def test_immutable_unaccent_lookup(self):
+        queryset = UserProfile.objects.filter(full_name__immutable_unaccent__icontains='ștefan')
+        self.assertCountEqual(queryset, [self.profile1, self.profile2])
+        self.assertIn('immutable_unaccent', str(queryset.query))
+
+        self.assertCountEqual(UserProfile.objects.filter(full_name__immutable_unaccent__icontains='TURCANU'), [self.profile1])
+        self.assertCountEqual(UserProfile.objects.filter(full_name__immutable_unaccent__icontains='pîrvu'), [self.profile2])
+
+    def test_search_filter_uses_immutable_unaccent(self):
+        admin = UserProfileFactory(user_role=UserProfile.UserRoles.ADMINISTRATOR)
+        principal = UserProfileFactory(user_role=UserProfile.UserRoles.PRINCIPAL, full_name='Ioana Dumitrașcu')
+        self.client.login(username=admin.username, password='passwd')
+
+        response = self.client.get(reverse('users:user-profile-list'), {'search': 'dumitrascu'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([profile['id'] for profile in response.data['results']], [principal.id])
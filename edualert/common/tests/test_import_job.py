@@ -0,0 +1,140 @@
+import csv
+import io
+from unittest.mock import patch
+
+from ddt import data, ddt
+from django.urls import reverse
+from rest_framework import status
+
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.common.models import ImportJob
+from edualert.common.tasks import process_import_job_task
+from edualert.profiles.factories import UserProfileFactory
+from edualert.profiles.import_user_profiles import UserProfileImporter
+from edualert.profiles.models import UserProfile
+from edualert.schools.factories import RegisteredSchoolUnitFactory
+
+
+@ddt
+class ImportJobTestCase(CommonAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = UserProfileFactory(user_role=UserProfile.UserRoles.ADMINISTRATOR)
+        cls.import_url = reverse('users:import-users')
+
+    def setUp(self):
+        self.rows = [
+            {
+                'Name': 'John Doe',
+                'Use phone as username': 'yes',
+                'Phone number': '+4071299966{}'.format(index),
+                'User role': 'Administrator'
+            } for index in range(3)
+        ]
+
+    @staticmethod
+    def build_url(import_job_id):
+        return reverse('common:import-job-detail', kwargs={'id': import_job_id})
+
+    @staticmethod
+    def create_file(rows):
+        file = io.StringIO()
+        file.name = 'file.csv'
+        writer = csv.DictWriter(file, fieldnames=rows[0].keys())
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+        file.seek(0)
+        return file
+
+    def create_import_job(self, rows):
+        return ImportJob.objects.create(
+            created_by=self.admin,
+            import_type=ImportJob.ImportTypes.USERS,
+            file_content=self.create_file(rows).getvalue()
+        )
+
+    def test_import_job_detail_unauthenticated(self):
+        import_job = self.create_import_job(self.rows)
+        response = self.client.get(self.build_url(import_job.id))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @data(
+        UserProfile.UserRoles.PARENT,
+        UserProfile.UserRoles.STUDENT
+    )
+    def test_import_job_detail_wrong_user_type(self, user_role):
+        profile = UserProfileFactory(user_role=user_role, school_unit=RegisteredSchoolUnitFactory())
+        self.client.login(username=profile.username, password='passwd')
+        import_job = self.create_import_job(self.rows)
+
+        response = self.client.get(self.build_url(import_job.id))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_job_detail_started_by_another_user(self):
+        other_admin = UserProfileFactory(user_role=UserProfile.UserRoles.ADMINISTRATOR)
+        self.client.login(username=other_admin.username, password='passwd')
+        import_job = self.create_import_job(self.rows)
+
+        response = self.client.get(self.build_url(import_job.id))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_import_users_async(self):
+        self.client.login(username=self.admin.username, password='passwd')
+        self.rows[2]['User role'] = 'Invalid'
+
+        response = self.client.post(self.import_url + '?async=true', data={'file': self.create_file(self.rows)}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['import_type'], ImportJob.ImportTypes.USERS)
+        self.assertEqual(response.data['status'], ImportJob.Statuses.PENDING)
+
+        response = self.client.get(self.build_url(response.data['id']))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(response.data.keys(), ['id', 'import_type', 'status', 'rows_count', 'processed_rows_count', 'report', 'created', 'modified'])
+        self.assertEqual(response.data['status'], ImportJob.Statuses.FINISHED)
+        self.assertEqual(response.data['rows_count'], 3)
+        self.assertEqual(response.data['processed_rows_count'], 3)
+        self.assertEqual(response.data['report']['report'], '2 out of 3 users saved successfully.')
+        self.assertCountEqual(response.data['report']['errors'].keys(), ['3'])
+        self.assertTrue(UserProfile.objects.filter(username='+40712999660').exists())
+
+    @patch('edualert.profiles.import_user_profiles.IMPORT_JOB_CHUNK_SIZE', 2)
+    def test_import_job_progress_is_saved_after_each_chunk(self):
+        rows = [{**self.rows[0], 'Phone number': '+4071299967{}'.format(index)} for index in range(5)]
+        processed_rows_counts = []
+        importer = UserProfileImporter(file=self.create_file(rows), request_user_profile=self.admin, language='en',
+                                       progress_callback=processed_rows_counts.append)
+        importer.import_users_and_get_report()
+
+        self.assertEqual(processed_rows_counts, [2, 4, 5])
+
+    @patch('edualert.common.tasks.UserProfileImporter.import_users_and_get_report', side_effect=Exception)
+    def test_import_job_failed(self, mocked_method):
+        import_job = self.create_import_job(self.rows)
+
+        process_import_job_task(import_job.id)
+
+        import_job.refresh_from_db()
+        self.assertEqual(import_job.status, ImportJob.Statuses.FAILED)
+        self.assertIsNone(import_job.report)
+
+    def test_import_job_already_processed(self):
+        import_job = self.create_import_job(self.rows)
+        import_job.status = ImportJob.Statuses.FINISHED
+        import_job.save()
+
+        process_import_job_task(import_job.id)
+
+        self.assertFalse(UserProfile.objects.filter(username='+40712999660').exists())
+
+    def test_import_job_already_claimed(self):
+        import_job = self.create_import_job(self.rows)
+        # Another worker claimed the job first
+        ImportJob.objects.filter(id=import_job.id).update(status=ImportJob.Statuses.IN_PROGRESS)
+
+        process_import_job_task(import_job.id)
+
+        import_job.refresh_from_db()
+        self.assertEqual(import_job.status, ImportJob.Statuses.IN_PROGRESS)
+        self.assertEqual(import_job.rows_count, 0)
+        self.assertFalse(UserProfile.objects.filter(username='+40712999660').exists())
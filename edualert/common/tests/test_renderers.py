@@ -0,0 +1,64 @@
+import datetime
+import decimal
+import io
+import uuid
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from edualert.catalogs.factories import StudentCatalogPerSubjectFactory, SubjectGradeFactory, SubjectAbsenceFactory
+from edualert.catalogs.models import StudentCatalogPerSubject
+from edualert.catalogs.serializers import StudentCatalogPerSubjectSerializer
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.common.renderers import UTF8JSONRenderer, FastJSONRenderer, FastJSONParser
+from edualert.profiles.factories import UserProfileFactory
+from edualert.profiles.models import UserProfile
+
+
+class FastJSONRendererTestCase(SimpleTestCase):
+    def test_render_types(self):
+        data = {
+            'text': 'Ștefan',
+            'lazy': gettext_lazy('Authorized absence'),
+            'decimal': decimal.Decimal('9.55'),
+            'date': datetime.date(2020, 3, 1),
+            'datetime': timezone.datetime(2020, 3, 1, 12, 30, tzinfo=timezone.utc),
+            'uuid': uuid.UUID(int=1),
+            1: [None, True, 1.5],
+        }
+        self.assertEqual(FastJSONRenderer().render(data),
+                         '{"text":"Ștefan","lazy":"Authorized absence","decimal":9.55,"date":"01-03-2020","datetime":"01-03-2020T12:30:00",'
+                         '"uuid":"00000000-0000-0000-0000-000000000001","1":[null,true,1.5]}'.encode('utf-8'))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+        # Indented for the browsable API
+        self.assertEqual(FastJSONRenderer().render({'a': 1}, 'application/json; indent=2'), b'{\n  "a": 1\n}')
+
+    def test_parse(self):
+        self.assertEqual(FastJSONParser().parse(io.BytesIO('{"full_name": "Ștefan", "grade": 9.5}'.encode('utf-8'))),
+                         {'full_name': 'Ștefan', 'grade': 9.5})
+        self.assertEqual(FastJSONParser().parse(io.BytesIO('{"full_name": "Stefan"}'.encode('latin-1')), parser_context={'encoding': 'latin-1'}),
+                         {'full_name': 'Stefan'})
+
+        for content in [b'{"a": ', b'{"a": NaN}', b'']:
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(content))
+
+
+class FastJSONRendererCatalogTestCase(CommonAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(3):
+            student = UserProfileFactory(user_role=UserProfile.UserRoles.STUDENT, full_name='Ștefan Țurcanu {}'.format(index))
+            catalog = StudentCatalogPerSubjectFactory(student=student, avg_sem1=decimal.Decimal('8.67'))
+            SubjectGradeFactory(student=student, catalog_per_subject=catalog)
+            SubjectAbsenceFactory(student=student, catalog_per_subject=catalog)
+
+    def test_same_output_as_standard_renderer(self):
+        data = StudentCatalogPerSubjectSerializer(StudentCatalogPerSubject.objects.all(), many=True).data
+
+        output = FastJSONRenderer().render(data)
+        self.assertEqual(output, UTF8JSONRenderer().render(data))
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(output)), JSONParser().parse(io.BytesIO(output)))
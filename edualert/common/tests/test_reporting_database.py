@@ -0,0 +1,148 @@
+from django.core.cache import cache
+from django.db import connections, router
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from edualert.academic_calendars.factories import AcademicYearCalendarFactory
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.common.reporting_database import REPORTING_DATABASE, reporting_database_reads, reads_from_reporting_database, \
+    record_recent_writes
+from edualert.profiles.factories import UserProfileFactory
+from edualert.profiles.models import UserProfile
+from edualert.schools.factories import RegisteredSchoolUnitFactory
+from edualert.subjects.factories import SubjectFactory
+from edualert.subjects.models import Subject
+
+
+@override_settings(REPORTING_DATABASE_ENABLED=True)
+class ReportingDatabaseTestCase(CommonAPITestCase):
+    # The reporting database is a mirror of the test database, through a separate connection, so it doesn't see
+    # the data created inside the tests' transactions; the tests check on which connection the queries run.
+    databases = {'default', REPORTING_DATABASE}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.principal = UserProfileFactory(user_role=UserProfile.UserRoles.PRINCIPAL)
+        cls.school_unit = RegisteredSchoolUnitFactory(school_principal=cls.principal)
+        cls.principal.school_unit = cls.school_unit
+        cls.principal.save()
+        cls.url = reverse('statistics:pupils-statistics')
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_queries(self, function, default_count, reporting_count):
+        with CaptureQueriesContext(connections['default']) as default_queries, \
+                CaptureQueriesContext(connections[REPORTING_DATABASE]) as reporting_queries:
+            result = function()
+
+        self.assertEqual(len(default_queries), default_count)
+        self.assertEqual(len(reporting_queries), reporting_count)
+        return result
+
+    def test_reads_outside_of_context(self):
+        self.assert_queries(lambda: Subject.objects.count(), 1, 0)
+
+    def test_reads_inside_context(self):
+        with reporting_database_reads():
+            self.assert_queries(lambda: Subject.objects.count(), 0, 1)
+        self.assert_queries(lambda: Subject.objects.count(), 1, 0)
+
+    @override_settings(REPORTING_DATABASE_ENABLED=False)
+    def test_reads_reporting_database_disabled(self):
+        with reporting_database_reads():
+            self.assert_queries(lambda: Subject.objects.count(), 1, 0)
+
+    def test_reads_after_write(self):
+        with reporting_database_reads():
+            self.assert_queries(lambda: Subject.objects.count(), 0, 1)
+            subject = self.assert_queries(lambda: SubjectFactory(), 1, 0)
+            # The written data is read from the primary database, for the rest of the context
+            self.assertEqual(self.assert_queries(lambda: Subject.objects.filter(id=subject.id).count(), 1, 0), 1)
+
+        with reporting_database_reads():
+            self.assert_queries(lambda: Subject.objects.count(), 0, 1)
+
+    def test_write_instance_read_from_reporting_database(self):
+        subject = SubjectFactory()
+        subject._state.db = REPORTING_DATABASE
+
+        self.assertEqual(router.db_for_write(Subject, instance=subject), 'default')
+        self.assertTrue(router.allow_relation(subject, SubjectFactory()))
+
+    def test_allow_migrate(self):
+        self.assertFalse(router.allow_migrate(REPORTING_DATABASE, 'subjects'))
+        self.assertTrue(router.allow_migrate('default', 'subjects'))
+
+    def test_task_decorator(self):
+        @reads_from_reporting_database
+        def count_subjects():
+            return Subject.objects.count()
+
+        self.assert_queries(count_subjects, 0, 1)
+        self.assert_queries(lambda: Subject.objects.count(), 1, 0)
+
+    def test_view_reads_from_reporting_database(self):
+        self.client.login(username=self.principal.username, password='passwd')
+
+        with CaptureQueriesContext(connections[REPORTING_DATABASE]) as reporting_queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(len(reporting_queries), 0)
+
+    def test_view_sticky_primary_after_write(self):
+        self.client.login(username=self.principal.username, password='passwd')
+        other_principal = UserProfileFactory(user_role=UserProfile.UserRoles.PRINCIPAL, school_unit=self.school_unit)
+
+        # Any change request keeps the user's reads on the primary database for a while
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        with CaptureQueriesContext(connections[REPORTING_DATABASE]) as reporting_queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(reporting_queries), 0)
+
+        # The other users' reads are unaffected
+        self.client.login(username=other_principal.username, password='passwd')
+        with CaptureQueriesContext(connections[REPORTING_DATABASE]) as reporting_queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(len(reporting_queries), 0)
+
+    def test_view_sticky_primary_expired(self):
+        self.client.login(username=self.principal.username, password='passwd')
+        with override_settings(REPORTING_DATABASE_STICKY_SECONDS=0):
+            # A timeout of 0 expires the key right away
+            record_recent_writes(self.principal.user)
+
+        with CaptureQueriesContext(connections[REPORTING_DATABASE]) as reporting_queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(len(reporting_queries), 0)
+
+    @override_settings(STATISTICS_CACHE_ENABLED=True)
+    def test_view_cached_statistics_read_from_primary(self):
+        AcademicYearCalendarFactory()
+        self.client.login(username=self.principal.username, password='passwd')
+        url = reverse('statistics:study-classes-averages')
+
+        # The response which is cached is computed from the primary database, which has the recalculated statistics
+        with CaptureQueriesContext(connections[REPORTING_DATABASE]) as reporting_queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(reporting_queries), 0)
+
+        with CaptureQueriesContext(connections[REPORTING_DATABASE]) as reporting_queries:
+            cached_response = self.client.get(url)
+        self.assertEqual(cached_response.data, response.data)
+        self.assertEqual(len(reporting_queries), 0)
+
+        # The responses which aren't cached are still read from the replica
+        with override_settings(STATISTICS_CACHE_ENABLED=False), \
+                CaptureQueriesContext(connections[REPORTING_DATABASE]) as reporting_queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(len(reporting_queries), 0)
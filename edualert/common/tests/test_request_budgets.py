@@ -0,0 +1,71 @@
+from django.urls import reverse
+from rest_framework import status
+
+from edualert.common.api_tests import CommonAPITestCase, RequestBudget, RequestRecord, request_budget, get_requests_report
+from edualert.common.utils import get_duplicated_queries
+from edualert.profiles.factories import UserProfileFactory
+from edualert.profiles.models import UserProfile
+from edualert.schools.factories import RegisteredSchoolUnitFactory
+
+
+class RequestBudgetsTestCase(CommonAPITestCase):
+    request_budgets = {
+        'subjects:subject-list': {
+            UserProfile.UserRoles.PRINCIPAL: RequestBudget(queries=1)
+        }
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.principal = UserProfileFactory(user_role=UserProfile.UserRoles.PRINCIPAL)
+        cls.school_unit = RegisteredSchoolUnitFactory(school_principal=cls.principal)
+        cls.teacher = UserProfileFactory(user_role=UserProfile.UserRoles.TEACHER, school_unit=cls.school_unit)
+        cls.url = reverse('subjects:subject-list')
+
+    def test_request_budget_by_user_role(self):
+        # No budget for the other roles
+        self.client.login(username=self.teacher.username, password='passwd')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.login(username=self.principal.username, password='passwd')
+        with self.assertRaises(AssertionError) as context:
+            self.client.get(self.url)
+        self.assertIn('GET {} (SCHOOL_PRINCIPAL):'.format(self.url), str(context.exception))
+        self.assertIn('queries were run, over the budget of 1.', str(context.exception))
+
+    @request_budget(queries=100, duration_ms=60 * 1000)
+    def test_request_budget_decorator(self):
+        self.client.login(username=self.principal.username, password='passwd')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_duplicated_queries(self):
+        queries = [
+            'SELECT * FROM "catalogs_subjectgrade" WHERE "catalog_per_subject_id" = 1',
+            'SELECT * FROM "catalogs_subjectgrade" WHERE "catalog_per_subject_id" = 2',
+            'SELECT * FROM "profiles_label" WHERE "text" = \'a\'',
+            'SELECT * FROM "profiles_label" WHERE "text" = \'a\'',
+            'SELECT * FROM "profiles_label" WHERE "text" = \'b\'',
+        ]
+        self.assertEqual(get_duplicated_queries(queries), [('SELECT * FROM "profiles_label" WHERE "text" = \'a\'', 2)])
+        self.assertEqual(get_duplicated_queries(queries, ignore_params=True), [
+            ('SELECT * FROM "profiles_label" WHERE "text" = ?', 3),
+            ('SELECT * FROM "catalogs_subjectgrade" WHERE "catalog_per_subject_id" = ?', 2),
+        ])
+
+    def test_get_requests_report(self):
+        records = [
+            RequestRecord('test_1', 'GET', '/api/v1/subjects/', 'subjects:subject-list', UserProfile.UserRoles.PRINCIPAL, 3, 20),
+            RequestRecord('test_2', 'GET', '/api/v1/subjects/', 'subjects:subject-list', UserProfile.UserRoles.PRINCIPAL, 5, 10),
+            RequestRecord('test_3', 'POST', '/api/v1/subjects/', 'subjects:subject-list', UserProfile.UserRoles.ADMINISTRATOR, 4, 30),
+            RequestRecord('test_4', 'GET', '/api/v1/unknown/', None, None, 1, 1),
+        ]
+        self.assertEqual(get_requests_report(records, 2), [
+            'Most queries in a request:',
+            '       5 GET subjects:subject-list (SCHOOL_PRINCIPAL, test_2)',
+            '       4 POST subjects:subject-list (ADMINISTRATOR, test_3)',
+            'Longest requests (ms):',
+            '      30 POST subjects:subject-list (ADMINISTRATOR, test_3)',
+            '      20 GET subjects:subject-list (SCHOOL_PRINCIPAL, test_1)',
+        ])
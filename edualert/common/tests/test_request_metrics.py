@@ -0,0 +1,118 @@
+import itertools
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.common import request_metrics
+from edualert.common.log_shipping import REQUEST_LOG_SHIPPING_METRICS_KEY
+from edualert.common.request_metrics import get_bucket_name
+from edualert.profiles.factories import UserProfileFactory
+from edualert.profiles.models import UserProfile
+from edualert.schools.factories import RegisteredSchoolUnitFactory
+from edualert.subjects.factories import SubjectFactory
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True, REQUEST_METRICS_SAMPLE_RATE=1, REQUEST_METRICS_SLOW_REQUEST_MS=60 * 1000,
+                   REQUEST_METRICS_TOKEN='secret')
+class RequestMetricsTestCase(CommonAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.principal = UserProfileFactory(user_role=UserProfile.UserRoles.PRINCIPAL)
+        cls.school_unit = RegisteredSchoolUnitFactory(school_principal=cls.principal)
+        for _ in range(3):
+            SubjectFactory()
+        cls.url = reverse('subjects:subject-list')
+        cls.metrics_url = reverse('common:metrics')
+
+    def setUp(self):
+        cache.clear()
+        # The endpoints registered by the previous tests are missing from the cleared index
+        request_metrics._registered_endpoints.clear()
+
+    def get_metrics(self):
+        response = self.client.get(self.metrics_url, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return dict(line.rsplit(' ', 1) for line in response.content.decode().splitlines() if not line.startswith('#'))
+
+    @override_settings(REQUEST_METRICS_TOKEN='')
+    def test_metrics_no_token_configured(self):
+        response = self.client.get(self.metrics_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_metrics_disabled(self):
+        response = self.client.get(self.metrics_url, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_metrics_wrong_token(self):
+        response = self.client.get(self.metrics_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.get(self.metrics_url, HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_metrics_success(self):
+        self.client.login(username=self.principal.username, password='passwd')
+        response_sizes = 0
+        for _ in range(2):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response_sizes += len(response.content)
+        self.client.logout()
+
+        metrics = self.get_metrics()
+        labels = '{method="GET",url_name="subjects:subject-list"}'
+        self.assertEqual(metrics['edualert_http_requests_sample_rate'], '1')
+        self.assertEqual(metrics['edualert_http_requests_total' + labels], '2')
+        self.assertEqual(metrics['edualert_http_slow_requests_total' + labels], '0')
+        self.assertEqual(metrics['edualert_http_response_size_bytes_total' + labels], str(response_sizes))
+        self.assertGreater(int(metrics['edualert_http_db_queries_total' + labels]), 0)
+        self.assertGreater(float(metrics['edualert_http_db_duration_seconds_total' + labels]), 0)
+        self.assertGreater(float(metrics['edualert_http_serializer_duration_seconds_total' + labels]), 0)
+        self.assertGreater(float(metrics['edualert_http_request_duration_seconds_sum' + labels]), 0)
+        self.assertEqual(metrics['edualert_http_request_duration_seconds_bucket{method="GET",url_name="subjects:subject-list",le="+Inf"}'], '2')
+        self.assertEqual(metrics['edualert_http_request_duration_seconds_count' + labels], '2')
+
+        # The metrics requests are recorded too
+        self.assertEqual(self.get_metrics()['edualert_http_requests_total{method="GET",url_name="common:metrics"}'], '1')
+
+        # The sum is part of the histogram, not a family of its own
+        lines = self.client.get(self.metrics_url, HTTP_AUTHORIZATION='Bearer secret').content.decode().splitlines()
+        histogram_start = lines.index('# TYPE edualert_http_request_duration_seconds histogram')
+        histogram_lines = list(itertools.takewhile(lambda line: not line.startswith('#'), lines[histogram_start + 1:]))
+        self.assertIn('edualert_http_request_duration_seconds_sum' + labels, [line.rsplit(' ', 1)[0] for line in histogram_lines])
+        self.assertEqual(len([line for line in lines if line.startswith('# TYPE edualert_http_request_duration_seconds')]), 1)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0, REQUEST_METRICS_SLOW_REQUEST_MS=0)
+    @patch('edualert.common.middleware.logging')
+    def test_metrics_slow_requests(self, logging_mock):
+        self.client.get(reverse('common:health-check'))
+        logging_mock.warning.assert_called_once()
+        self.assertEqual(logging_mock.warning.call_args[0][2], reverse('common:health-check'))
+
+        metrics = self.get_metrics()
+        labels = '{method="GET",url_name="common:health-check"}'
+        # Not sampled, but counted as slow
+        self.assertEqual(metrics['edualert_http_requests_total' + labels], '0')
+        self.assertEqual(metrics['edualert_http_slow_requests_total' + labels], '1')
+
+    def test_metrics_request_log_shipping(self):
+        self.assertNotIn('edualert_request_log_lag_seconds', self.get_metrics())
+
+        cache.set(REQUEST_LOG_SHIPPING_METRICS_KEY, {'stream_length': 3, 'spool_batches': 2, 'spool_bytes': 100, 'lag_seconds': 7.5,
+                                                     'last_run_timestamp': 1600000000})
+        metrics = self.get_metrics()
+        self.assertEqual(metrics['edualert_request_log_stream_length'], '3')
+        self.assertEqual(metrics['edualert_request_log_spool_batches'], '2')
+        self.assertEqual(metrics['edualert_request_log_lag_seconds'], '7.5')
+
+    def test_get_bucket_name(self):
+        self.assertEqual(get_bucket_name(0.01), 'bucket_0.025')
+        self.assertEqual(get_bucket_name(0.1), 'bucket_0.1')
+        self.assertEqual(get_bucket_name(3), 'bucket_5')
+        self.assertEqual(get_bucket_name(11), 'bucket_inf')
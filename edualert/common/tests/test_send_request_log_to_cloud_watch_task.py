@@ -1,17 +1,150 @@
+import gzip
 import json
 import logging
+import os
+import tempfile
 from contextlib import ExitStack
 from datetime import datetime
 from unittest.mock import patch, Mock, call
 
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
 from django.test import SimpleTestCase, override_settings
-
-from edualert.common.tasks import send_request_log_to_cloud_watch_task, _provide_log_group, _provide_log_stream, \
-    _dispatch_batch
-
-
-@override_settings(CACHES={'default': {'BACKEND': 'django_redis.cache.RedisCache'}})
+from redis.exceptions import ResponseError
+
+from edualert.common.log_shipping import RequestLogSpool, MemorySink, BatchRejectedError, ship_spooled_batches, \
+    delete_old_request_log_archives, _provide_log_group, _provide_log_stream, _dispatch_batch, REQUEST_LOG_SHIPPING_METRICS_KEY, \
+    REQUEST_LOG_SHIPPING_LOCK_KEY
+from edualert.common.request_log import append_request_logs, REQUEST_LOG_STREAM
+from edualert.common.tasks import send_request_log_to_cloud_watch_task
+from edualert.common.utils import get_private_storage
+
+
+class StubStreamRedis:
+    """
+    In memory stand-in for the Redis stream commands used by the request log (a single consumer group).
+    """
+
+    def __init__(self):
+        self.streams = {}
+        self.groups = {}
+        self.last_id = 0
+
+    def pipeline(self, transaction=True):
+        return StubPipeline(self)
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.last_id += 1
+        entry_id = '{}-0'.format(self.last_id).encode()
+        stream = self.streams.setdefault(name, [])
+        stream.append((entry_id, {key: value.encode() if isinstance(value, str) else value for key, value in fields.items()}))
+        if maxlen is not None:
+            del stream[:-maxlen]
+        return entry_id
+
+    def xgroup_create(self, name, groupname, id='$', mkstream=False):
+        if (name, groupname) in self.groups:
+            raise ResponseError('BUSYGROUP Consumer Group name already exists')
+        self.streams.setdefault(name, [])
+        # the group's last delivered ID and its pending IDs
+        self.groups[(name, groupname)] = {'last_delivered_id': b'0-0', 'pending': []}
+
+    def xreadgroup(self, groupname, consumername, streams, count=None, block=None, noack=False):
+        (name, stream_id), = streams.items()
+        group = self.groups[(name, groupname)]
+        entries = dict(self.streams[name])
+        if stream_id == '>':
+            new_ids = [entry_id for entry_id in entries if self._key(entry_id) > self._key(group['last_delivered_id'])][:count]
+            if new_ids:
+                group['last_delivered_id'] = new_ids[-1]
+                group['pending'].extend(new_ids)
+            result = [(entry_id, entries[entry_id]) for entry_id in new_ids]
+        else:
+            pending_ids = [entry_id for entry_id in group['pending'] if self._key(entry_id) > self._key(stream_id)][:count]
+            result = [(entry_id, entries.get(entry_id)) for entry_id in pending_ids]
+        return [[name, result]] if result else []
+
+    def xack(self, name, groupname, *ids):
+        pending = self.groups[(name, groupname)]['pending']
+        pending[:] = [entry_id for entry_id in pending if entry_id not in ids]
+
+    def xlen(self, name):
+        return len(self.streams.get(name, []))
+
+    def xdel(self, name, *ids):
+        self.streams[name] = [entry for entry in self.streams[name] if entry[0] not in ids]
+
+    @staticmethod
+    def _key(entry_id):
+        if isinstance(entry_id, bytes):
+            entry_id = entry_id.decode()
+        return tuple(int(part) for part in entry_id.split('-')) if '-' in entry_id else (int(entry_id), 0)
+
+
+class StubPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class StubCloudWatchLogsClient:
+    """
+    In memory stand-in for the Cloud Watch Logs API used by the task.
+    """
+
+    def __init__(self):
+        self.log_groups = []
+        self.log_streams = []
+        self.events = []
+        self.fail = False
+
+    def describe_log_groups(self, logGroupNamePrefix):
+        return {'logGroups': [log_group for log_group in self.log_groups if log_group['logGroupName'].startswith(logGroupNamePrefix)]}
+
+    def create_log_group(self, logGroupName):
+        self.log_groups.append({'logGroupName': logGroupName, 'creationTime': len(self.log_groups)})
+
+    def describe_log_streams(self, logGroupName, logStreamNamePrefix):
+        log_streams = [log_stream for log_stream in self.log_streams if log_stream['logStreamName'].startswith(logStreamNamePrefix)]
+        if self.events:
+            log_streams = [{**log_stream, 'uploadSequenceToken': str(len(self.events))} for log_stream in log_streams]
+        return {'logStreams': log_streams}
+
+    def create_log_stream(self, logGroupName, logStreamName):
+        self.log_streams.append({'logStreamName': logStreamName, 'creationTime': len(self.log_streams)})
+
+    def put_log_events(self, logGroupName, logStreamName, logEvents, sequenceToken=None):
+        if self.fail:
+            raise Exception('Service unavailable')
+        if sequenceToken != (str(len(self.events)) if self.events else None):
+            raise Exception('Invalid sequence token')
+        self.events.extend(logEvents)
+        return {'nextSequenceToken': str(len(self.events))}
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django_redis.cache.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/1'}})
 class SendRequestLogToCloudWatchTestCase(SimpleTestCase):
+    @staticmethod
+    def get_spool_settings(exit_stack):
+        return {
+            'REQUEST_LOG_SPOOL_ROOT': exit_stack.enter_context(tempfile.TemporaryDirectory()),
+            'PRIVATE_FILE_STORAGE_OPTIONS': {'location': exit_stack.enter_context(tempfile.TemporaryDirectory())},
+        }
+
     @override_settings(REQUEST_LOG={'LOG_GROUP_NAME': 'dummy-group-name', 'REGION_NAME': 'dummy-region'})
     def test_cache(self):
         client = type('DummyClient', (object,), {})
@@ -43,29 +176,33 @@ class SendRequestLogToCloudWatchTestCase(SimpleTestCase):
                 'message': json.dumps(cache_obj)
             }
 
+        def create_redis(cache_objects):
+            redis = StubStreamRedis()
+            for cache_obj in cache_objects:
+                redis.xadd(REQUEST_LOG_STREAM, {b'log': json.dumps(cache_obj).encode()})
+            return redis
+
         def setup_default_context(exit_stack):
-            exit_stack.enter_context(patch('edualert.common.tasks.cache', new=cache_mock))
-            exit_stack.enter_context(patch('edualert.common.tasks.boto3.client', new=new_client_mock))
-            exit_stack.enter_context(patch('edualert.common.tasks._provide_log_group', new=lambda _c, _l: log_group))
-            exit_stack.enter_context(patch('edualert.common.tasks._provide_log_stream', new=lambda _c, _l: log_stream))
-            exit_stack.enter_context(patch('edualert.common.tasks._dispatch_batch', new=_dispatch_batch_mock))
-
-        # when there are no cache keys, make sure we don't call `_dispatch_batch_mock`
-        cache_mock = type('DummyCache', (object,), {})
-        cache_mock.iter_keys = Mock(return_value=[])
+            exit_stack.enter_context(patch('edualert.common.tasks.get_redis_connection', new=Mock(return_value=redis)))
+            exit_stack.enter_context(patch('edualert.common.log_shipping.boto3.client', new=new_client_mock))
+            exit_stack.enter_context(patch('edualert.common.log_shipping._provide_log_group', new=lambda _c, _l: log_group))
+            exit_stack.enter_context(patch('edualert.common.log_shipping._provide_log_stream', new=lambda _c, _l: log_stream))
+            exit_stack.enter_context(patch('edualert.common.log_shipping._dispatch_batch', new=_dispatch_batch_mock))
+            exit_stack.enter_context(override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                                                       **self.get_spool_settings(exit_stack)))
+
+        # when there are no logs, make sure we don't call `_dispatch_batch_mock`
+        redis = create_redis([])
         _dispatch_batch_mock = Mock()
         with ExitStack() as stack:
             setup_default_context(stack)
             send_request_log_to_cloud_watch_task()
             _dispatch_batch_mock.assert_not_called()
 
-        # when there are cache keys less than `MAX_BATCH_SIZE` make sure we call `_dispatch_batch_mock` once
+        # when there are less logs than `MAX_BATCH_SIZE` make sure we call `_dispatch_batch_mock` once
         cache_objects = [create_cache_obj()]
-        cache_mock = type('DummyCache', (object,), {})
-        cache_mock.get = Mock(side_effect=[json.dumps(c) for c in cache_objects])
-        cache_mock.set = Mock()
-        cache_mock.iter_keys = Mock(return_value=['cache_key_01'])
-        _dispatch_batch_mock = Mock()
+        redis = create_redis(cache_objects)
+        _dispatch_batch_mock = Mock(return_value=(None, True))
         with ExitStack() as stack:
             setup_default_context(stack)
             # override `MAX_BATCH_SIZE`
@@ -74,14 +211,11 @@ class SendRequestLogToCloudWatchTestCase(SimpleTestCase):
             _dispatch_batch_mock.assert_called_once_with(client, log_group, log_stream, None, [
                 create_batch_obj(cache_objects[0])])
 
-        # when there are more cache keys than `MAX_BATCH_SIZE` make sure we call `_dispatch_batch_mock` multiple times
+        # when there are more logs than `MAX_BATCH_SIZE` make sure we call `_dispatch_batch_mock` multiple times
         log_stream = {'uploadSequenceToken': 'sequence_1'}
         cache_objects = [create_cache_obj(), create_cache_obj(timestamp_ms=1), create_cache_obj(timestamp_ms=2)]
-        cache_mock = type('DummyCache', (object,), {})
-        cache_mock.get = Mock(side_effect=[json.dumps(c) for c in cache_objects])
-        cache_mock.set = Mock()
-        cache_mock.iter_keys = Mock(return_value=['cache_key_01', 'cache_key_02', 'cache_key_03'])
-        _dispatch_batch_mock = Mock(return_value='sequence_2')
+        redis = create_redis(cache_objects)
+        _dispatch_batch_mock = Mock(return_value=('sequence_2', True))
         with ExitStack() as stack:
             setup_default_context(stack)
             # override `MAX_BATCH_SIZE`
@@ -100,7 +234,7 @@ class SendRequestLogToCloudWatchTestCase(SimpleTestCase):
         self.assertEqual(106, default_cache_obj_size)
         log_event_extra_bytes = 26
 
-        # before a group of keys would exceed `MAX_BATCH_SIZE_BYTES`, make a call to `_dispatch_batch_mock` and then
+        # before a group of logs would exceed `MAX_BATCH_SIZE_BYTES`, make a call to `_dispatch_batch_mock` and then
         # continue iteration
         log_stream = {'uploadSequenceToken': 'sequence_1'}
         missing_bytes = 128 - (default_cache_obj_size + log_event_extra_bytes)
@@ -109,11 +243,8 @@ class SendRequestLogToCloudWatchTestCase(SimpleTestCase):
             create_cache_obj(timestamp_ms=1, request_body='a' * missing_bytes),
             create_cache_obj(timestamp_ms=2, request_body='a' * missing_bytes)
         ]
-        cache_mock = type('DummyCache', (object,), {})
-        cache_mock.get = Mock(side_effect=[json.dumps(c) for c in cache_objects])
-        cache_mock.set = Mock()
-        cache_mock.iter_keys = Mock(return_value=['cache_key_01', 'cache_key_02', 'cache_key_03'])
-        _dispatch_batch_mock = Mock(return_value='sequence_2')
+        redis = create_redis(cache_objects)
+        _dispatch_batch_mock = Mock(return_value=('sequence_2', True))
         with ExitStack() as stack:
             setup_default_context(stack)
             # override `MAX_BATCH_SIZE_BYTES`
@@ -135,11 +266,8 @@ class SendRequestLogToCloudWatchTestCase(SimpleTestCase):
             create_cache_obj(timestamp_ms=1, request_body='0123456789_0123456789_0123456789_0123456789'),
             create_cache_obj(timestamp_ms=2, request_body='a' * missing_bytes)
         ]
-        cache_mock = type('DummyCache', (object,), {})
-        cache_mock.get = Mock(side_effect=[json.dumps(c) for c in cache_objects])
-        cache_mock.set = Mock()
-        cache_mock.iter_keys = Mock(return_value=['cache_key_01', 'cache_key_02', 'cache_key_03'])
-        _dispatch_batch_mock = Mock(return_value='sequence_2')
+        redis = create_redis(cache_objects)
+        _dispatch_batch_mock = Mock(return_value=('sequence_2', True))
         with ExitStack() as stack:
             setup_default_context(stack)
             # override `MAX_BATCH_SIZE_BYTES`
@@ -155,6 +283,35 @@ class SendRequestLogToCloudWatchTestCase(SimpleTestCase):
                 call(client, log_group, log_stream, 'sequence_2', [create_batch_obj(cache_objects[2])]),
             ])
 
+        # the JSON request bodies of the big logs are truncated as text
+        cache_objects = [create_cache_obj(request_body={'a': '0123456789_0123456789_0123456789'})]
+        redis = create_redis(cache_objects)
+        _dispatch_batch_mock = Mock(return_value=('sequence_2', True))
+        with ExitStack() as stack:
+            setup_default_context(stack)
+            stack.enter_context(override_settings(REQUEST_LOG=new_settings(max_batch_size_bytes=150)))
+            send_request_log_to_cloud_watch_task()
+            _dispatch_batch_mock.assert_called_once_with(client, log_group, log_stream, 'sequence_1', [create_batch_obj({
+                **cache_objects[0],
+                'request_body': '{"a": "01234567',
+            })])
+            self.assertEqual(redis.xlen(REQUEST_LOG_STREAM), 0)
+
+        # a log which can't be read is dropped, instead of blocking the next ones on every run
+        logging.disable(logging.NOTSET)
+        cache_objects = [create_cache_obj(timestamp_ms=1)]
+        redis = create_redis([])
+        redis.xadd(REQUEST_LOG_STREAM, {b'log': b'{"timestamp_ms": '})
+        redis.xadd(REQUEST_LOG_STREAM, {b'log': json.dumps(cache_objects[0]).encode()})
+        _dispatch_batch_mock = Mock(return_value=('sequence_2', True))
+        with ExitStack() as stack:
+            setup_default_context(stack)
+            with self.assertLogs(level='ERROR') as logs:
+                send_request_log_to_cloud_watch_task()
+            self.assertIn('Dropped the request log', logs.output[0])
+            _dispatch_batch_mock.assert_called_once_with(client, log_group, log_stream, 'sequence_1', [create_batch_obj(cache_objects[0])])
+            self.assertEqual(redis.xlen(REQUEST_LOG_STREAM), 0)
+
     def test_cache_error_msg(self):
         logging.disable(logging.NOTSET)  # allow logging
 
@@ -163,21 +320,163 @@ class SendRequestLogToCloudWatchTestCase(SimpleTestCase):
             with self.assertLogs(level='ERROR') as logs:
                 send_request_log_to_cloud_watch_task()
             self.assertEqual(logs.output, [
-                'ERROR:root:Expected \'default\' cache to be django-redis and have a function `iter_keys`.'])
+                'ERROR:root:Expected \'default\' cache to be django-redis.'])
+
+    @override_settings(REQUEST_LOG={'LOG_GROUP_NAME': 'requests', 'REGION_NAME': 'dummy-region', 'MAX_BATCH_SIZE': 2,
+                                    'MAX_STREAM_LENGTH': 4})
+    @patch('edualert.common.log_shipping.timezone.now', new=lambda: datetime(2020, 1, 1))
+    def test_send_request_log_to_stub(self):
+        redis = StubStreamRedis()
+        client = StubCloudWatchLogsClient()
+        logs = [json.dumps({'timestamp_ms': index, 'user_id': 1, 'method': 'POST', 'path': '/', 'status_code': 200,
+                            'request_body': None}) for index in range(5)]
+        # The oldest log is dropped, to keep the stream's length
+        append_request_logs(redis, logs)
+        self.assertEqual(len(redis.streams[REQUEST_LOG_STREAM]), 4)
 
-        # Check we get expected error when the cache object is missing a specific function
-        with patch('edualert.common.tasks.cache', new=type(object)):
-            with self.assertLogs(level='ERROR') as logs:
+        with ExitStack() as stack:
+            stack.enter_context(patch('edualert.common.tasks.get_redis_connection', new=Mock(return_value=redis)))
+            stack.enter_context(patch('edualert.common.log_shipping.boto3.client', new=Mock(return_value=client)))
+            stack.enter_context(override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                                                  **self.get_spool_settings(stack)))
+            spool = RequestLogSpool(settings.REQUEST_LOG_SPOOL_ROOT)
+
+            # The failed batches stay in the spool, and are sent by the next run
+            client.fail = True
+            send_request_log_to_cloud_watch_task()
+            self.assertEqual(client.events, [])
+            self.assertEqual(redis.streams[REQUEST_LOG_STREAM], [])
+            self.assertEqual(len(spool.get_batch_paths()), 2)
+            self.assertEqual(cache.get(REQUEST_LOG_SHIPPING_METRICS_KEY)['spool_batches'], 2)
+
+            client.fail = False
+            send_request_log_to_cloud_watch_task()
+            self.assertEqual(client.events, [{'timestamp': index, 'message': logs[index]} for index in range(1, 5)])
+            self.assertEqual(spool.get_batch_paths(), [])
+            self.assertEqual(redis.groups[(REQUEST_LOG_STREAM, 'cloud_watch')]['pending'], [])
+            metrics = cache.get(REQUEST_LOG_SHIPPING_METRICS_KEY)
+            self.assertEqual((metrics['spool_batches'], metrics['lag_seconds'], metrics['stream_length']), (0, 0, 0))
+
+            # Only the new logs are sent
+            append_request_logs(redis, logs[:1])
+            send_request_log_to_cloud_watch_task()
+            self.assertEqual(client.events[-1], {'timestamp': 0, 'message': logs[0]})
+            self.assertEqual(len(client.events), 5)
+
+            # The sent logs are archived, one file per batch, in the folder of the day
+            archive_root = os.path.join(settings.PRIVATE_FILE_STORAGE_OPTIONS['location'], settings.REQUEST_LOG_ARCHIVE_LOCATION)
+            self.assertEqual(os.listdir(archive_root), ['2020-01-01'])
+            archived_messages = []
+            for archive_name in sorted(os.listdir(os.path.join(archive_root, '2020-01-01'))):
+                with gzip.open(os.path.join(archive_root, '2020-01-01', archive_name), 'rt') as file:
+                    archived_messages.extend(json.loads(line)['message'] for line in file)
+            self.assertEqual(archived_messages, logs[1:] + logs[:1])
+
+        self.assertEqual([log_group['logGroupName'] for log_group in client.log_groups], ['requests'])
+        self.assertEqual([log_stream['logStreamName'] for log_stream in client.log_streams], ['1-2020'])
+
+    @override_settings(REQUEST_LOG={'LOG_GROUP_NAME': 'requests', 'REGION_NAME': 'dummy-region',
+                                    'SINK': 'edualert.common.log_shipping.MemorySink'})
+    def test_send_request_log_while_shipping(self):
+        logging.disable(logging.NOTSET)  # allow logging
+        MemorySink.batches = []
+        redis = StubStreamRedis()
+        append_request_logs(redis, [json.dumps({'timestamp_ms': 0, 'user_id': 1, 'method': 'POST', 'path': '/', 'status_code': 200,
+                                                'request_body': None})])
+
+        with ExitStack() as stack:
+            stack.enter_context(patch('edualert.common.tasks.get_redis_connection', new=Mock(return_value=redis)))
+            stack.enter_context(override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                                                  **self.get_spool_settings(stack)))
+
+            # Another run is shipping the logs
+            cache.add(REQUEST_LOG_SHIPPING_LOCK_KEY, True)
+            with self.assertLogs(level='WARNING'):
                 send_request_log_to_cloud_watch_task()
-            self.assertEqual(logs.output, [
-                'ERROR:root:Expected \'default\' cache to be django-redis and have a function `iter_keys`.'])
+            self.assertEqual(redis.xlen(REQUEST_LOG_STREAM), 1)
+            self.assertEqual(MemorySink.batches, [])
 
-        # Check we get expected error when the cache object has the attribute we are looking for but it's not callable
-        with patch('edualert.common.tasks.cache', new=type('DummyCache', (object,), {'iter_keys': '<not callable>'})):
+            cache.delete(REQUEST_LOG_SHIPPING_LOCK_KEY)
+            send_request_log_to_cloud_watch_task()
+            self.assertEqual(redis.xlen(REQUEST_LOG_STREAM), 0)
+            self.assertEqual(len(MemorySink.batches), 1)
+            # Released after the run
+            self.assertIsNone(cache.get(REQUEST_LOG_SHIPPING_LOCK_KEY))
+
+    def test_ship_spooled_batches_concurrently(self):
+        MemorySink.batches = []
+        with tempfile.TemporaryDirectory() as spool_root:
+            spool = RequestLogSpool(spool_root)
+            for index in range(10):
+                spool.append([{'timestamp': index, 'message': str(index)}])
+            self.assertEqual(spool.get_metrics()['spool_batches'], 10)
+
+            self.assertEqual(ship_spooled_batches(spool, MemorySink({})), 10)
+            self.assertEqual(sorted(batch[0]['timestamp'] for batch in MemorySink.batches), list(range(10)))
+            self.assertEqual(spool.get_batch_paths(), [])
+
+    @override_settings(REQUEST_LOG={'MAX_UPLOAD_ATTEMPTS': 2})
+    def test_ship_spooled_batches_quarantine(self):
+        logging.disable(logging.NOTSET)  # allow logging
+        uploaded_batches = []
+
+        class StubSink:
+            max_concurrency = 1
+            is_available = False
+
+            def upload(self, batch):
+                if batch[0]['message'] == 'invalid':
+                    raise BatchRejectedError()
+                if self.is_available:
+                    uploaded_batches.append(batch)
+                return self.is_available
+
+        sink = StubSink()
+        with tempfile.TemporaryDirectory() as spool_root:
+            spool = RequestLogSpool(spool_root)
+            for message in ['first', 'second']:
+                spool.append([{'timestamp': 0, 'message': message}])
+            first_path, second_path = spool.get_batch_paths()
+
+            # The failed batch is retried by the next run, and holds back the next ones
+            self.assertEqual(ship_spooled_batches(spool, sink), 0)
+            self.assertEqual(spool.get_batch_paths(), [first_path, second_path])
+
+            # Until it failed too many times
             with self.assertLogs(level='ERROR') as logs:
-                send_request_log_to_cloud_watch_task()
-            self.assertEqual(logs.output, [
-                'ERROR:root:Expected \'default\' cache to be django-redis and have a function `iter_keys`.'])
+                self.assertEqual(ship_spooled_batches(spool, sink), 0)
+            self.assertIn('after 2 failed uploads', logs.output[0])
+            self.assertEqual(spool.get_batch_paths(), [second_path])
+            self.assertEqual(os.listdir(spool.quarantine_root), [os.path.basename(first_path)])
+
+            # The rejected batches are quarantined right away, and the next ones are uploaded
+            spool.append([{'timestamp': 0, 'message': 'invalid'}])
+            spool.append([{'timestamp': 0, 'message': 'third'}])
+            sink.is_available = True
+            with self.assertLogs(level='ERROR') as logs:
+                self.assertEqual(ship_spooled_batches(spool, sink), 2)
+            self.assertIn('which was rejected', logs.output[0])
+            self.assertEqual([batch[0]['message'] for batch in uploaded_batches], ['second', 'third'])
+            self.assertEqual(spool.get_batch_paths(), [])
+            self.assertEqual(os.listdir(spool_root), ['quarantine'])
+            self.assertEqual(spool.get_metrics()['quarantined_batches'], 2)
+
+    @override_settings(REQUEST_LOG_ARCHIVE_DAYS=2)
+    @patch('edualert.common.log_shipping.timezone.now', new=lambda: datetime(2020, 1, 10))
+    def test_delete_old_request_log_archives(self):
+        with tempfile.TemporaryDirectory() as private_files_root, \
+                override_settings(PRIVATE_FILE_STORAGE_OPTIONS={'location': private_files_root}):
+            storage = get_private_storage()
+            # Nothing was archived yet
+            delete_old_request_log_archives(storage)
+
+            for day in ['2020-01-07', '2020-01-08', '2020-01-09']:
+                for index in range(2):
+                    storage.save('{}/{}/{}.jsonl.gz'.format(settings.REQUEST_LOG_ARCHIVE_LOCATION, day, index), ContentFile(b''))
+
+            delete_old_request_log_archives(storage)
+            for day, files_count in [('2020-01-07', 0), ('2020-01-08', 2), ('2020-01-09', 2)]:
+                self.assertEqual(len(storage.listdir('{}/{}'.format(settings.REQUEST_LOG_ARCHIVE_LOCATION, day))[1]), files_count)
 
     def test_settings_error_msg(self):
         logging.disable(logging.NOTSET)  # allow logging
@@ -248,7 +547,7 @@ class SendRequestLogToCloudWatchTestCase(SimpleTestCase):
         client.describe_log_groups.assert_called_once_with(logGroupNamePrefix=log_group_name)
         self.assertEqual(log_group_02, result)
 
-    @patch('edualert.common.tasks.timezone.now', new=lambda: datetime(2020, 1, 1))
+    @patch('edualert.common.log_shipping.timezone.now', new=lambda: datetime(2020, 1, 1))
     def test__provide_log_stream(self):
         log_stream_name = '1-2020'
         log_group = {'logGroupName': 'DummyLogGroup'}
@@ -300,17 +599,17 @@ class SendRequestLogToCloudWatchTestCase(SimpleTestCase):
         result = _dispatch_batch(client, log_group, log_stream, sequence_token, batch)
         client.put_log_events.assert_called_once_with(logGroupName=log_group['logGroupName'],
                                                       logStreamName=log_stream['logStreamName'], logEvents=batch)
-        self.assertEqual('dummySequence', result)
+        self.assertEqual(('dummySequence', True), result)
 
         # when `sequence_token` is NOT None it should be passed to `put_log_events`
         sequence_token = 'dummy-sequence'
         batch = []
         client.put_log_events = Mock(return_value={'nextSequenceToken': 'dummySequence'})
-        _dispatch_batch(client, log_group, log_stream, sequence_token, batch)
+        result = _dispatch_batch(client, log_group, log_stream, sequence_token, batch)
         client.put_log_events.assert_called_once_with(logGroupName=log_group['logGroupName'],
                                                       logStreamName=log_stream['logStreamName'],
                                                       logEvents=batch, sequenceToken=sequence_token)
-        self.assertEqual('dummySequence', result)
+        self.assertEqual(('dummySequence', True), result)
 
         # batches should be ordered by `timestamp`
         sequence_token = None
@@ -319,20 +618,25 @@ class SendRequestLogToCloudWatchTestCase(SimpleTestCase):
         batch = [log_01, log_02]
         sorted_batch = [log_02, log_01]
         client.put_log_events = Mock(return_value={'nextSequenceToken': 'dummySequence'})
-        _dispatch_batch(client, log_group, log_stream, sequence_token, batch)
+        result = _dispatch_batch(client, log_group, log_stream, sequence_token, batch)
         client.put_log_events.assert_called_once_with(logGroupName=log_group['logGroupName'],
                                                       logStreamName=log_stream['logStreamName'], logEvents=sorted_batch)
-        self.assertEqual('dummySequence', result)
+        self.assertEqual(('dummySequence', True), result)
 
         # when an exception is thrown, log the exception and the batch and return the sequence token
         sequence_token = None
         batch = [{'timestamp': 0}]
         client.put_log_events = Mock(side_effect=Exception('Dummy exception'))
         with self.assertLogs(level='ERROR') as logs:
-            _dispatch_batch(client, log_group, log_stream, sequence_token, batch)
+            result = _dispatch_batch(client, log_group, log_stream, sequence_token, batch)
         self.assertEqual(1, len(logs.output))
-        self.assertTrue(logs.output[0].startswith("ERROR:root:Failed to send log events batch to Cloud Watch\n"
-                                                  "Batch: [{'timestamp': 0}]"))
+        # The batch stays in the spool, so it isn't logged
+        self.assertTrue(logs.output[0].startswith("ERROR:root:Failed to send log events batch to Cloud Watch\nTraceback"))
         client.put_log_events.assert_called_once_with(logGroupName=log_group['logGroupName'],
                                                       logStreamName=log_stream['logStreamName'], logEvents=batch)
-        self.assertEqual('dummySequence', result)
+        self.assertEqual((None, False), result)
+
+        # when the batch is invalid, it's rejected
+        client.put_log_events = Mock(side_effect=ClientError({'Error': {'Code': 'InvalidParameterException'}}, 'PutLogEvents'))
+        with self.assertLogs(level='ERROR'), self.assertRaises(BatchRejectedError):
+            _dispatch_batch(client, log_group, log_stream, sequence_token, batch)
@@ -4,4 +4,6 @@ from . import views
 app_name = 'catalogs'
 urlpatterns = [
     path('health-check/', views.health_check, name='health-check'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('import-jobs/<int:id>/', views.ImportJobDetail.as_view(), name='import-job-detail'),
 ]
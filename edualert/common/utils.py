@@ -1,8 +1,13 @@
+import re
+import time
 import unicodedata
+from collections import namedtuple, Counter
 from copy import deepcopy
 
 import pytz
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import get_storage_class
 from django.utils import timezone
 
 
@@ -25,6 +30,11 @@ def datetime(year=None, month=None, day=None, hour=None, minute=None, second=Non
     ).strftime(datetime_format)
 
 
+def get_private_storage():
+    # The files which aren't public (e.g. the school catalog archives), shared by the app & celery containers
+    return get_storage_class(settings.PRIVATE_FILE_STORAGE)(**settings.PRIVATE_FILE_STORAGE_OPTIONS)
+
+
 def check_date_range_overlap(start1, end1, start2, end2):
     """
     Checks if two range of dates have any overlap (if there is at least a common day)
@@ -75,3 +85,61 @@ def strip_diacritics(s):
     # Code point categories are listed here:
     # https://www.unicode.org/versions/Unicode13.0.0/ch04.pdf
     return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+
+
+_SQL_LITERALS_REGEX = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def get_duplicated_queries(queries, ignore_params=False):
+    """
+    Returns the (SQL, count) pairs of the queries which were run more than once, most repeated first.
+    With `ignore_params`, the queries which only differ by their literal values (e.g. the N+1 queries) are counted together.
+    """
+    if ignore_params:
+        queries = [_SQL_LITERALS_REGEX.sub('?', sql) for sql in queries]
+    return [(sql, count) for sql, count in Counter(queries).most_common() if count > 1]
+
+
+def increment_cache_counter(key, value=1):
+    """
+    Increments a counter of the shared cache (which never expires), creating it if it doesn't exist.
+    """
+    if not cache.add(key, value, timeout=None):
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            # The key was evicted in the meantime
+            cache.set(key, value, timeout=None)
+
+
+class VersionedLocalCache:
+    """
+    Keeps a value in the process memory. The value's version is stored in the shared cache, so any process can
+    invalidate it; the version is only checked after the timeout (in seconds, read from the given setting) expires,
+    and the value is loaded again only if the version changed. A timeout of 0 disables the caching.
+    """
+    Entry = namedtuple('Entry', ['value', 'version', 'expires_at'])
+
+    def __init__(self, version_key, timeout_setting):
+        self.version_key = version_key
+        self.timeout_setting = timeout_setting
+        self.entry = None
+
+    def get(self, load):
+        timeout = getattr(settings, self.timeout_setting)
+        if not timeout:
+            return load()
+
+        entry = self.entry
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry.value
+
+        version = cache.get(self.version_key, 0)
+        if entry is None or entry.version != version:
+            entry = self.Entry(load(), version, None)
+        self.entry = entry._replace(expires_at=time.monotonic() + timeout)
+        return entry.value
+
+    def invalidate(self):
+        self.entry = None
+        increment_cache_counter(self.version_key)
@@ -1 +1,3 @@
 from .health_check import health_check
+from .import_jobs import ImportJobDetail
+from .metrics import metrics
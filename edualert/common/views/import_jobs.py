@@ -0,0 +1,14 @@
+from rest_framework import generics
+
+from edualert.common.models import ImportJob
+from edualert.common.permissions import IsAdministratorOrSchoolEmployee
+from edualert.common.serializers import ImportJobSerializer
+
+
+class ImportJobDetail(generics.RetrieveAPIView):
+    permission_classes = (IsAdministratorOrSchoolEmployee,)
+    serializer_class = ImportJobSerializer
+    lookup_field = 'id'
+
+    def get_queryset(self):
+        return ImportJob.objects.filter(created_by=self.request.user.user_profile)
@@ -0,0 +1,17 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, Http404
+
+from edualert.common.request_metrics import render_prometheus_metrics
+
+
+def metrics(request):
+    if not settings.REQUEST_METRICS_ENABLED or not settings.REQUEST_METRICS_TOKEN:
+        raise Http404
+
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if not hmac.compare_digest(authorization, 'Bearer {}'.format(settings.REQUEST_METRICS_TOKEN)):
+        return HttpResponse(status=401)
+
+    return HttpResponse(render_prometheus_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
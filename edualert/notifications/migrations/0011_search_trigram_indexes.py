@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from edualert.common.lookups import CreateSearchIndexes
+
+create_search_indexes = CreateSearchIndexes([
+    ('notifications_notification', 'title'),
+    ('notifications_notification', 'from_user_full_name'),
+    ('notifications_targetuserthrough', 'user_profile_full_name'),
+])
+
+
+class Migration(migrations.Migration):
+    # The search indexes are built concurrently, which can't be done inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('common', '0003_immutable_unaccent'),
+        ('notifications', '0010_auto_20201028_1405'),
+    ]
+
+    operations = [
+        migrations.RunPython(code=create_search_indexes, reverse_code=create_search_indexes.reverse),
+    ]
@@ -3,6 +3,7 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from edualert.common.asgi import POLLING_THREAD_POOL
 from edualert.common.pagination import CommonPagination
 from edualert.common.permissions import IsParentOrStudent
 from edualert.common.search_and_filters import CommonSearchFilter
@@ -13,6 +14,7 @@ from edualert.notifications.views.sent_messages import get_date_filter
 
 class MyReceivedMessageList(generics.ListAPIView):
     permission_classes = (IsParentOrStudent,)
+    asgi_thread_pool = POLLING_THREAD_POOL
     pagination_class = CommonPagination
     search_fields = ['notification__title', 'notification__from_user_full_name']
     filter_backends = [CommonSearchFilter]
@@ -5,10 +5,11 @@ import logging
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import DatabaseError
+from django.db import DatabaseError, transaction
 from django.utils import timezone
 from django.utils.translation import gettext as _, pgettext
 
+from edualert.common.constants import IMPORT_JOB_CHUNK_SIZE
 from edualert.common.validators import PhoneNumberValidator, PersonalIdNumberValidator, EmailValidator
 from edualert.profiles.models import UserProfile
 from edualert.profiles.serializers import BaseUserProfileDetailSerializer, BIRTH_DATE_IN_THE_PAST_ERROR, \
@@ -25,14 +26,17 @@ class UserProfileImporter:
     number_of_users = 0
     request_user_profile = None
     language = 'en'
+    progress_callback = None
 
-    def __init__(self, file, request_user_profile, language):
+    def __init__(self, file, request_user_profile, language, progress_callback=None):
         self.report = {'errors': {}}
         self.file = file
         self.request_user_profile = request_user_profile
         self.school_unit = self.request_user_profile.school_unit
         self.language = language
         self.number_of_users = 0
+        # Called with the number of processed rows, after every chunk of rows
+        self.progress_callback = progress_callback
 
     def import_users_and_get_report(self):
         users = self._fetch_from_csv()
@@ -118,20 +122,68 @@ class UserProfileImporter:
         return english_translation.get(value)
 
     def _save(self, user_data):
+        # Validate all the rows first, so the usernames can be checked with a single query
+        validated_users = []
         for index, user_dict in enumerate(user_data):
             self.number_of_users += 1
-            user_dict = self._validate_and_clean_user(user_dict)
+            validated_users.append((index + 1, self._validate_and_clean_user(user_dict)))
+
+        existing_usernames = self._get_existing_usernames(
+            [user_dict['username'] for row_number, user_dict in validated_users if user_dict.get('username')]
+        )
+
+        users_to_create = []
+        for row_number, user_dict in validated_users:
             errors = user_dict.pop('errors', None)
+            username = user_dict.get('username')
+            if username and username in existing_usernames:
+                error_key = 'phone_number' if user_dict.get('use_phone_as_username') else 'email'
+                errors[self._handle_header_translation(error_key, reverse=True).capitalize()] = USERNAME_UNIQUE_ERROR
+
             if errors:
-                self._add_row_to_report(index + 1, errors)
+                self._add_row_to_report(row_number, errors)
             else:
-                try:
+                # Later rows from the same file can't use this username anymore
+                existing_usernames.add(username)
+                users_to_create.append((row_number, user_dict))
+
+        for index in range(0, len(users_to_create), IMPORT_JOB_CHUNK_SIZE):
+            batch = users_to_create[index:index + IMPORT_JOB_CHUNK_SIZE]
+            self._create_users(batch)
+
+            if self.progress_callback:
+                self.progress_callback(batch[-1][0])
+
+    @staticmethod
+    def _get_existing_usernames(usernames):
+        if not usernames:
+            return set()
+
+        return set(
+            User.objects.filter(username__in=usernames).values_list('username', flat=True)
+                .union(UserProfile.objects.filter(username__in=usernames).values_list('username', flat=True))
+        )
+
+    def _create_users(self, users_to_create):
+        try:
+            with transaction.atomic():
+                users = User.objects.bulk_create([User(username=user_dict['username']) for row_number, user_dict in users_to_create])
+                UserProfile.objects.bulk_create([
+                    UserProfile(user_id=user.id, **user_dict) for user, (row_number, user_dict) in zip(users, users_to_create)
+                ])
+            return
+        except DatabaseError as e:
+            logger.error(e)
+
+        # Fall back to creating the users one by one, so only the faulty rows are reported
+        for row_number, user_dict in users_to_create:
+            try:
+                with transaction.atomic():
                     user = User.objects.create(username=user_dict['username'])
-                    user_dict['user_id'] = user.id
-                    UserProfile.objects.create(**user_dict)
-                except DatabaseError as e:
-                    logger.error(e)
-                    self._add_row_to_report(index + 1, {'general_errors': _('An error occurred while creating the user.')})
+                    UserProfile.objects.create(user_id=user.id, **user_dict)
+            except DatabaseError as e:
+                logger.error(e)
+                self._add_row_to_report(row_number, {'general_errors': _('An error occurred while creating the user.')})
 
     def _validate_and_clean_user(self, user):
         # Translate header rows
@@ -198,11 +250,6 @@ class UserProfileImporter:
             accepted_fields += ['school_unit', ]
             user['school_unit'] = self.school_unit
 
-        if username and (UserProfile.objects.filter(username=username).exists() or
-                         User.objects.filter(username=username).exists()):
-            error_key = 'phone_number' if use_phone_as_username else 'email'
-            errors[error_key] = USERNAME_UNIQUE_ERROR
-
         user['username'] = username
         accepted_fields += ['username']
 
@@ -0,0 +1,97 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from edualert.profiles.models import UserProfile
+
+# Users whose last online time was recorded in the current interval
+LAST_ONLINE_THROTTLE_KEY = 'last_online_throttle_{}'
+# Each recorded last online time is kept in its own numbered slot, until it's flushed to the database
+LAST_ONLINE_SLOT_KEY = 'last_online_slot_{}'
+LAST_ONLINE_WRITTEN_SLOTS_KEY = 'last_online_written_slots'
+LAST_ONLINE_FLUSHED_SLOTS_KEY = 'last_online_flushed_slots'
+# The slots which were claimed, but were still empty when flushed, by slot -> time they were first found empty
+LAST_ONLINE_PENDING_SLOTS_KEY = 'last_online_pending_slots'
+# The slots which weren't flushed (e.g. the flush task was down) are dropped after this
+LAST_ONLINE_SLOT_TIMEOUT = 60 * 60 * 24
+# A slot is written right after it's claimed, so one which is still empty after this was abandoned (e.g. the process died)
+LAST_ONLINE_PENDING_SLOT_TIMEOUT = 5 * 60
+
+FLUSH_BATCH_SIZE = 500
+
+
+def record_last_online(user):
+    """
+    Buffers the user's last online time in the cache, at most once per LAST_ONLINE_UPDATE_INTERVAL.
+    The buffered times are saved by `flush_last_online`, so the readers of `UserProfile.last_online`
+    see them with a delay of at most LAST_ONLINE_UPDATE_INTERVAL + the flush task's period.
+    """
+    if not cache.add(LAST_ONLINE_THROTTLE_KEY.format(user.id), 1, timeout=settings.LAST_ONLINE_UPDATE_INTERVAL):
+        return
+
+    user_profile = getattr(user, 'user_profile', None)
+    if user_profile is None:
+        return
+
+    if cache.add(LAST_ONLINE_WRITTEN_SLOTS_KEY, 0, timeout=None):
+        # The slots are numbered again from the start (the first time, or after the counter was evicted)
+        cache.delete_many([LAST_ONLINE_FLUSHED_SLOTS_KEY, LAST_ONLINE_PENDING_SLOTS_KEY])
+    slot = cache.incr(LAST_ONLINE_WRITTEN_SLOTS_KEY)
+    cache.set(LAST_ONLINE_SLOT_KEY.format(slot), (user_profile.id, timezone.now()), timeout=LAST_ONLINE_SLOT_TIMEOUT)
+
+
+def flush_last_online():
+    """
+    Saves the buffered last online times to the database, and returns the number of updated users.
+    A slot which is claimed, but not yet written while flushing, is read again by the next flushes,
+    until LAST_ONLINE_PENDING_SLOT_TIMEOUT passes.
+    """
+    written_slots = cache.get(LAST_ONLINE_WRITTEN_SLOTS_KEY, 0)
+    flushed_slots = cache.get(LAST_ONLINE_FLUSHED_SLOTS_KEY, 0)
+    pending_slots = cache.get(LAST_ONLINE_PENDING_SLOTS_KEY, {})
+    slots = list(pending_slots) + list(range(flushed_slots + 1, written_slots + 1))
+    if not slots:
+        return 0
+
+    keys = [LAST_ONLINE_SLOT_KEY.format(slot) for slot in slots]
+    read_keys = []
+    last_online_by_profile = {}
+    for index in range(0, len(keys), FLUSH_BATCH_SIZE):
+        values = cache.get_many(keys[index:index + FLUSH_BATCH_SIZE])
+        for profile_id, last_online in values.values():
+            last_online_by_profile[profile_id] = max(last_online, last_online_by_profile.get(profile_id, last_online))
+        read_keys.extend(values.keys())
+
+    # The slots which were claimed, but not written yet, are read again by the next flushes
+    now = time.time()
+    read_keys_set = set(read_keys)
+    pending_slots = {
+        slot: pending_slots.get(slot, now) for slot, key in zip(slots, keys)
+        if key not in read_keys_set and now - pending_slots.get(slot, now) < LAST_ONLINE_PENDING_SLOT_TIMEOUT
+    }
+    cache.set_many({LAST_ONLINE_FLUSHED_SLOTS_KEY: written_slots, LAST_ONLINE_PENDING_SLOTS_KEY: pending_slots}, timeout=None)
+    cache.delete_many(read_keys)
+
+    update_last_online(last_online_by_profile)
+    return len(last_online_by_profile)
+
+
+def update_last_online(last_online_by_profile):
+    """
+    Updates the last online time of the given profiles, with one UPDATE ... FROM (VALUES ...) per batch.
+    The profiles are updated in the order of their IDs, so concurrent flushes can't deadlock, and a time
+    never replaces a more recent one.
+    """
+    items = sorted(last_online_by_profile.items())
+    for index in range(0, len(items), FLUSH_BATCH_SIZE):
+        batch = items[index:index + FLUSH_BATCH_SIZE]
+        sql = 'UPDATE {table} AS profile SET last_online = batch.last_online ' \
+              'FROM (VALUES {values}) AS batch (id, last_online) ' \
+              'WHERE profile.id = batch.id AND (profile.last_online IS NULL OR profile.last_online < batch.last_online)' \
+            .format(table=UserProfile._meta.db_table, values=', '.join(['(%s, %s::timestamptz)'] * len(batch)))
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [value for item in batch for value in item])
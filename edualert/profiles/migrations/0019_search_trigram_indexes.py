@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from edualert.common.lookups import CreateSearchIndexes
+
+create_search_indexes = CreateSearchIndexes([
+    ('profiles_userprofile', 'full_name'),
+    ('profiles_label', 'text'),
+])
+
+
+class Migration(migrations.Migration):
+    # The search indexes are built concurrently, which can't be done inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('common', '0003_immutable_unaccent'),
+        ('profiles', '0018_auto_20201027_1345'),
+    ]
+
+    operations = [
+        migrations.RunPython(code=create_search_indexes, reverse_code=create_search_indexes.reverse),
+    ]
@@ -11,9 +11,11 @@ from rest_framework import serializers
 
 from edualert.academic_calendars.utils import get_current_academic_calendar
 from edualert.common.fields import PrimaryKeyRelatedField
+from edualert.catalogs.conditional_responses import invalidate_catalogs
 from edualert.catalogs.models import SubjectGrade, SubjectAbsence, ExaminationGrade, StudentCatalogPerSubject
 from edualert.common.validators import PhoneNumberValidator, PersonalIdNumberValidator, PasswordValidator
 from edualert.profiles.models import UserProfile, Label
+from edualert.statistics.response_cache import invalidate_school_unit_study_classes
 from edualert.study_classes.models import TeacherClassThrough
 from edualert.study_classes.serializers import StudyClassNameSerializer, TeacherClassThroughAssignedStudyClassSerializer, \
     TeacherClassThroughPartiallyUpdateSerializer
@@ -212,6 +214,8 @@ class BaseUserProfileDetailSerializer(UserProfileBaseSerializer):
             instance.user.save()
 
         instance = super().update(instance, validated_data)
+        if instance.user_role == UserProfile.UserRoles.STUDENT:
+            invalidate_catalogs(student_ids=[instance.id])
 
         if new_teachers:
             instances_to_update = []
@@ -227,6 +231,8 @@ class BaseUserProfileDetailSerializer(UserProfileBaseSerializer):
                                                         subject_id=teacher_class_through_instance.subject_id) \
                     .update(teacher=teacher)
             TeacherClassThrough.objects.bulk_update(instances_to_update, ['teacher', 'is_class_master'])
+            invalidate_catalogs(study_class_ids=[item.study_class_id for item in instances_to_update])
+            invalidate_school_unit_study_classes(instance.school_unit_id)
 
         return instance
 
@@ -585,6 +591,8 @@ class DeactivateUserSerializer(serializers.ModelSerializer):
                         .update(teacher=teacher)
 
                 TeacherClassThrough.objects.bulk_update(instances_to_update, ['teacher', 'is_class_master'])
+                invalidate_catalogs(study_class_ids=[item.study_class_id for item in instances_to_update])
+                invalidate_school_unit_study_classes(instance.school_unit_id)
                 if new_class_master and class_master_study_class:
                     class_master_study_class.class_master = new_class_master
                     class_master_study_class.save()
@@ -593,6 +601,8 @@ class DeactivateUserSerializer(serializers.ModelSerializer):
 
         instance.is_active = False
         instance.save()
+        if instance.user_role == UserProfile.UserRoles.STUDENT:
+            invalidate_catalogs(student_ids=[instance.id])
         instance.user.is_active = False
         instance.user.save()
 
@@ -93,3 +93,9 @@ def send_reset_password_message(user_profile_id, link):
             else '+4' + profile.phone_number
         text_message = RESET_PASSWORD_BODY_SMS.format(link)
         send_sms([(phone_number, text_message)])
+
+
+@shared_task
+def flush_last_online_task():
+    from edualert.profiles.last_online import flush_last_online
+    flush_last_online()
@@ -0,0 +1,101 @@
+import datetime
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.profiles.factories import UserProfileFactory
+from edualert.profiles.last_online import flush_last_online, update_last_online, LAST_ONLINE_WRITTEN_SLOTS_KEY, LAST_ONLINE_SLOT_KEY
+from edualert.profiles.models import UserProfile
+from edualert.profiles.tasks import flush_last_online_task
+
+
+@override_settings(LAST_ONLINE_UPDATE_INTERVAL=60)
+class LastOnlineTestCase(CommonAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = UserProfileFactory(user_role=UserProfile.UserRoles.ADMINISTRATOR)
+        cls.other_admin = UserProfileFactory(user_role=UserProfile.UserRoles.ADMINISTRATOR)
+        cls.url = reverse('users:my-account')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_last_online_is_buffered(self):
+        self.client.login(username=self.admin.username, password='passwd')
+        for _ in range(3):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Not saved on every request, and only recorded once in the throttling interval
+        self.admin.refresh_from_db()
+        self.assertIsNone(self.admin.last_online)
+        self.assertEqual(cache.get(LAST_ONLINE_WRITTEN_SLOTS_KEY), 1)
+
+        self.client.login(username=self.other_admin.username, password='passwd')
+        self.client.get(self.url)
+
+        flush_last_online_task()
+        self.refresh_objects_from_db([self.admin, self.other_admin])
+        self.assertIsNotNone(self.admin.last_online)
+        self.assertIsNotNone(self.other_admin.last_online)
+        self.assertLessEqual(self.admin.last_online, self.other_admin.last_online)
+
+        # Nothing left to flush
+        self.assertEqual(flush_last_online(), 0)
+
+    def test_last_online_after_counter_eviction(self):
+        self.client.login(username=self.admin.username, password='passwd')
+        self.client.get(self.url)
+        self.assertEqual(flush_last_online(), 1)
+
+        cache.delete(LAST_ONLINE_WRITTEN_SLOTS_KEY)
+        self.client.login(username=self.other_admin.username, password='passwd')
+        self.client.get(self.url)
+        self.assertEqual(flush_last_online(), 1)
+
+        self.other_admin.refresh_from_db()
+        self.assertIsNotNone(self.other_admin.last_online)
+
+    def test_last_online_slot_written_after_flush(self):
+        # A slot claimed by a request, which writes it only after the flush
+        cache.set(LAST_ONLINE_WRITTEN_SLOTS_KEY, 1, timeout=None)
+        self.assertEqual(flush_last_online(), 0)
+
+        now = timezone.now()
+        cache.set(LAST_ONLINE_SLOT_KEY.format(1), (self.admin.id, now))
+        self.assertEqual(flush_last_online(), 1)
+        self.admin.refresh_from_db()
+        self.assertEqual(self.admin.last_online, now)
+
+        # Nothing left to flush
+        self.assertEqual(flush_last_online(), 0)
+
+    @patch('edualert.profiles.last_online.LAST_ONLINE_PENDING_SLOT_TIMEOUT', 0)
+    def test_last_online_abandoned_slot_is_dropped(self):
+        cache.set(LAST_ONLINE_WRITTEN_SLOTS_KEY, 1, timeout=None)
+        self.assertEqual(flush_last_online(), 0)
+
+        # The slot isn't read again
+        cache.set(LAST_ONLINE_SLOT_KEY.format(1), (self.admin.id, timezone.now()))
+        self.assertEqual(flush_last_online(), 0)
+        self.admin.refresh_from_db()
+        self.assertIsNone(self.admin.last_online)
+
+    def test_update_last_online_keeps_most_recent(self):
+        now = timezone.now()
+        self.admin.last_online = now
+        self.admin.save()
+
+        update_last_online({
+            self.admin.id: now - datetime.timedelta(minutes=5),
+            self.other_admin.id: now - datetime.timedelta(minutes=5),
+        })
+
+        self.refresh_objects_from_db([self.admin, self.other_admin])
+        self.assertEqual(self.admin.last_online, now)
+        self.assertEqual(self.other_admin.last_online, now - datetime.timedelta(minutes=5))
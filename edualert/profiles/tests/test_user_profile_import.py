@@ -274,6 +274,36 @@ class UserProfileImportTestCase(CommonAPITestCase):
         username = self.admin_data['Phone number'] if use_phone_as_username == 'yes' else self.admin_data['Email address']
         self.assertTrue(UserProfile.objects.filter(username=username).exists())
 
+    def test_user_profile_import_username_used_twice_in_file(self):
+        self.client.login(username=self.admin.username, password='passwd')
+
+        file = self.create_file(self.file_name)
+        writer = csv.DictWriter(file, fieldnames=self.admin_data.keys())
+        writer.writeheader()
+        writer.writerow(self.admin_data)
+        writer.writerow(self.admin_data)
+
+        response = self.get_response(file)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['report'], '1 out of 2 users saved successfully.')
+        self.assertEqual(response.data['errors'], {2: {'Phone number': 'This username is already associated with another account.'}})
+        self.assertEqual(UserProfile.objects.filter(username=self.admin_data['Phone number']).count(), 1)
+
+    def test_user_profile_import_username_already_exists(self):
+        self.client.login(username=self.admin.username, password='passwd')
+        UserProfileFactory(user_role=UserProfile.UserRoles.ADMINISTRATOR, username=self.admin_data['Phone number'])
+        self.admin_data['Email address'] = 'invalid'
+
+        file = self.create_file(self.file_name)
+        writer = csv.DictWriter(file, fieldnames=self.admin_data.keys())
+        writer.writeheader()
+        writer.writerow(self.admin_data)
+
+        response = self.get_response(file)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(response.data['errors'][1].keys(), ['Email address', 'Phone number'])
+        self.assertEqual(response.data['errors'][1]['Phone number'], 'This username is already associated with another account.')
+
     @data(
         (UserProfile.UserRoles.ADMINISTRATOR, ['student_data', 'parent_data', 'teacher_data']),
         (UserProfile.UserRoles.PRINCIPAL, ['admin_data', 'principal_data'])
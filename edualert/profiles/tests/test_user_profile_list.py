@@ -183,3 +183,24 @@ class UserProfileListTestCase(CommonAPITestCase):
         self.assertEqual(results[0]['id'], self.teacher1.id)
         self.assertEqual(results[1]['id'], self.student1.id)
         self.assertEqual(results[2]['id'], self.parent1.id)
+
+    def test_user_profile_list_cursor_pagination(self):
+        self.client.login(username=self.principal1.username, password='passwd')
+        expected_ids = [profile['id'] for profile in self.client.get(self.url).data['results']]
+
+        ids = []
+        response = self.client.get(self.url, {'cursor': '', 'page_size': 2})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertCountEqual(response.data.keys(), ['next', 'results'])
+            for profile in response.data['results']:
+                self.assertCountEqual(profile.keys(), self.expected_fields)
+            ids.extend(profile['id'] for profile in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(ids, expected_ids)
+
+        response = self.client.get(self.url, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -11,7 +11,8 @@ from rest_framework.response import Response
 from edualert.academic_calendars.utils import get_current_academic_calendar
 from edualert.catalogs.models import SubjectGrade, SubjectAbsence, ExaminationGrade
 from edualert.common.constants import PUT, POST, GET, DELETE, HEAD, OPTIONS
-from edualert.common.pagination import CommonPagination
+from edualert.common.models import ImportJob
+from edualert.common.pagination import CommonKeysetPagination
 from edualert.common.permissions import IsAdministratorOrPrincipal
 from edualert.common.search_and_filters import CommonSearchFilter
 from edualert.notifications.tasks import format_and_send_notification_task
@@ -22,12 +23,13 @@ from edualert.profiles.permissions import UserDetailPermissionClass
 from edualert.profiles.serializers import UserProfileListSerializer, BaseUserProfileDetailSerializer, \
     SchoolPrincipalSerializer, SchoolTeacherSerializer, ParentSerializer, StudentSerializer, \
     StudentWithRiskAlertsSerializer, DeactivateUserSerializer
-from edualert.common.serializers import CsvUploadSerializer
+from edualert.common.serializers import CsvUploadSerializer, ImportJobSerializer
+from edualert.common.tasks import process_import_job_task
 
 
 class UserProfileList(generics.ListCreateAPIView):
     permission_classes = (IsAdministratorOrPrincipal,)
-    pagination_class = CommonPagination
+    pagination_class = CommonKeysetPagination
     search_fields = ['full_name', ]
     filterset_fields = ['user_role', 'is_active']
     filter_backends = [DjangoFilterBackend, CommonSearchFilter]
@@ -201,6 +203,17 @@ class ImportProfiles(views.APIView):
 
         language = get_language_from_request(request)
 
+        if request.query_params.get('async') == 'true':
+            # Large files are imported in the background; the client polls the returned job for the report
+            import_job = ImportJob.objects.create(
+                created_by=request.user.user_profile,
+                import_type=ImportJob.ImportTypes.USERS,
+                language=language,
+                file_content=file.getvalue()
+            )
+            process_import_job_task.delay(import_job.id)
+            return Response(ImportJobSerializer(import_job).data, status=status.HTTP_202_ACCEPTED)
+
         importer = UserProfileImporter(file=file, request_user_profile=request.user.user_profile, language=language)
         return Response(
             data=importer.import_users_and_get_report()
@@ -8,5 +8,7 @@ class CategoryLevels(TextChoices):
     HIGHSCHOOL = 'HIGHSCHOOL', _("Highschool")
 
 
+TECHNOLOGICAL_CATEGORY_NAME = 'Liceu - Filieră Tehnologică'
+
 BEHAVIOR_GRADE_EXCEPTIONS_PROFILES = ['Pedagogic', 'Militar', 'Teologic']
 PROFILES_WITH_CORE_SUBJECTS = ['Artistic', 'Sportiv']
@@ -0,0 +1,25 @@
+# Generated by Django 3.0.4 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+def set_is_technological(apps, schema_editor):
+    RegisteredSchoolUnit = apps.get_model('schools', 'registeredschoolunit')
+
+    RegisteredSchoolUnit.objects.filter(categories__name='Liceu - Filieră Tehnologică').update(is_technological=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schools', '0008_remove_schoolunitcategory_subjects'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registeredschoolunit',
+            name='is_technological',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(code=set_is_technological, reverse_code=migrations.RunPython.noop),
+    ]
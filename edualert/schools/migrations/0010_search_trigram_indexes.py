@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from edualert.common.lookups import CreateSearchIndexes
+
+create_search_indexes = CreateSearchIndexes([
+    ('schools_registeredschoolunit', 'name'),
+    ('schools_schoolunit', 'name'),
+])
+
+
+class Migration(migrations.Migration):
+    # The search indexes are built concurrently, which can't be done inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('common', '0003_immutable_unaccent'),
+        ('schools', '0009_registeredschoolunit_is_technological'),
+    ]
+
+    operations = [
+        migrations.RunPython(code=create_search_indexes, reverse_code=create_search_indexes.reverse),
+    ]
@@ -1,7 +1,9 @@
 from django.db import models
+from django.db.models.signals import m2m_changed
 from django_extensions.db.models import TimeStampedModel
 
 from edualert.schools.models import SchoolUnitCategory, SchoolUnitProfile
+from edualert.schools.signals import registered_school_unit_categories_changed
 
 
 class SchoolUnit(models.Model):
@@ -30,8 +32,13 @@ class RegisteredSchoolUnit(TimeStampedModel):
     school_principal = models.OneToOneField("profiles.UserProfile", related_name="registered_school_unit", on_delete=models.PROTECT)
     students_at_risk_count = models.PositiveSmallIntegerField(default=0)
     last_change_in_catalog = models.DateTimeField(null=True, blank=True)
+    # Denormalized from the categories, kept up to date by the categories signals
+    is_technological = models.BooleanField(default=False)
 
     objects = models.Manager()
 
     def __str__(self):
         return f"RegisteredSchoolUnit {self.id} {self.name}"
+
+
+m2m_changed.connect(registered_school_unit_categories_changed, sender=RegisteredSchoolUnit.categories.through)
@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models.signals import post_save
 
 from edualert.schools import constants
+from edualert.schools.signals import school_unit_category_post_save
 
 
 class SchoolUnitCategory(models.Model):
@@ -16,3 +18,6 @@ class SchoolUnitCategory(models.Model):
 
     class Meta:
         verbose_name_plural = "School unit categories"
+
+
+post_save.connect(school_unit_category_post_save, sender=SchoolUnitCategory)
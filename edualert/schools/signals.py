@@ -0,0 +1,33 @@
+from edualert.schools.constants import TECHNOLOGICAL_CATEGORY_NAME
+
+
+def registered_school_unit_categories_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ['post_add', 'post_remove', 'post_clear']:
+        return
+
+    if not reverse:
+        update_technological_flag(instance.__class__, [instance.id])
+        instance.is_technological = instance.__class__.objects.filter(id=instance.id, is_technological=True).exists()
+    elif pk_set is not None:
+        update_technological_flag(model, pk_set)
+    else:
+        # The category was removed from all its school units, so only the technological ones can change
+        update_technological_flag(model, model.objects.filter(is_technological=True).values_list('id', flat=True))
+
+
+def school_unit_category_post_save(sender, instance, created, **kwargs):
+    if not created:
+        # The category might have been renamed
+        school_units = instance.registered_school_units
+        update_technological_flag(school_units.model, school_units.values_list('id', flat=True))
+
+
+def update_technological_flag(registered_school_unit_model, school_unit_ids):
+    school_unit_ids = list(school_unit_ids)
+    technological_ids = list(registered_school_unit_model.objects.filter(
+        id__in=school_unit_ids,
+        categories__name=TECHNOLOGICAL_CATEGORY_NAME
+    ).values_list('id', flat=True))
+
+    registered_school_unit_model.objects.filter(id__in=technological_ids).update(is_technological=True)
+    registered_school_unit_model.objects.filter(id__in=school_unit_ids).exclude(id__in=technological_ids).update(is_technological=False)
@@ -0,0 +1,64 @@
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.schools.constants import TECHNOLOGICAL_CATEGORY_NAME
+from edualert.schools.factories import RegisteredSchoolUnitFactory, SchoolUnitCategoryFactory
+
+
+class RegisteredSchoolUnitIsTechnologicalTestCase(CommonAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.technological_category = SchoolUnitCategoryFactory(name=TECHNOLOGICAL_CATEGORY_NAME)
+        cls.other_category = SchoolUnitCategoryFactory()
+
+    def test_is_technological_categories_changed(self):
+        school_unit = RegisteredSchoolUnitFactory()
+        self.assertFalse(school_unit.is_technological)
+
+        school_unit.categories.add(self.other_category, self.technological_category)
+        self.assertTrue(school_unit.is_technological)
+        school_unit.refresh_from_db()
+        self.assertTrue(school_unit.is_technological)
+
+        school_unit.categories.remove(self.technological_category)
+        self.assertFalse(school_unit.is_technological)
+        school_unit.refresh_from_db()
+        self.assertFalse(school_unit.is_technological)
+
+        school_unit.categories.set([self.technological_category])
+        school_unit.refresh_from_db()
+        self.assertTrue(school_unit.is_technological)
+
+        school_unit.categories.clear()
+        school_unit.refresh_from_db()
+        self.assertFalse(school_unit.is_technological)
+
+    def test_is_technological_school_units_changed_from_category(self):
+        school_unit1 = RegisteredSchoolUnitFactory()
+        school_unit2 = RegisteredSchoolUnitFactory()
+        school_unit3 = RegisteredSchoolUnitFactory()
+
+        self.technological_category.registered_school_units.add(school_unit1, school_unit2)
+        self.refresh_objects_from_db([school_unit1, school_unit2, school_unit3])
+        self.assertTrue(school_unit1.is_technological)
+        self.assertTrue(school_unit2.is_technological)
+        self.assertFalse(school_unit3.is_technological)
+
+        self.technological_category.registered_school_units.remove(school_unit1)
+        self.refresh_objects_from_db([school_unit1, school_unit2])
+        self.assertFalse(school_unit1.is_technological)
+        self.assertTrue(school_unit2.is_technological)
+
+        self.technological_category.registered_school_units.clear()
+        school_unit2.refresh_from_db()
+        self.assertFalse(school_unit2.is_technological)
+
+    def test_is_technological_category_renamed(self):
+        school_unit = RegisteredSchoolUnitFactory()
+        school_unit.categories.add(self.other_category)
+
+        self.technological_category.name = 'Liceu'
+        self.technological_category.save()
+        self.other_category.name = TECHNOLOGICAL_CATEGORY_NAME
+        self.other_category.save()
+
+        school_unit.refresh_from_db()
+        self.assertTrue(school_unit.is_technological)
@@ -25,6 +25,8 @@ CACHES = {
 REQUEST_LOG = {
     'REGION_NAME': 'eu-central-1',
     'LOG_GROUP_NAME': 'api_requests_log_group',
+    # The oldest logs are dropped when the stream grows over this (e.g. while Cloud Watch is unreachable)
+    'MAX_STREAM_LENGTH': env.int('REQUEST_LOG_MAX_STREAM_LENGTH', 1_000_000),
 }
 MIDDLEWARE += ('edualert.common.middleware.RequestActivityTrackerMiddleware',)
 
@@ -35,6 +37,19 @@ DATABASES = {
     'default': env.db_url_config(env(DATABASE_URL_KEY))
 }
 DATABASES['default']['CONN_MAX_AGE'] = 500
+if env.str('DATABASE_URL_REPORTING', ''):
+    DATABASES['reporting'] = env.db_url_config(env('DATABASE_URL_REPORTING'))
+    DATABASES['reporting']['CONN_MAX_AGE'] = 500
+REPORTING_DATABASE_ENABLED = 'reporting' in DATABASES
+
+# The task role gives access to the bucket
+PRIVATE_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+PRIVATE_FILE_STORAGE_OPTIONS = {
+    'bucket_name': env('PRIVATE_FILES_BUCKET_NAME'),
+    'region_name': 'eu-central-1',
+    'default_acl': 'private',
+    'file_overwrite': True,
+}
 
 # EMAILS
 # ------------------------------------------------------------------------------
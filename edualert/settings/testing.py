@@ -14,6 +14,19 @@ logging.disable(logging.CRITICAL)
 # ------------------------------------------------------------------------------
 ENVIRONMENT = 'TESTING'
 
+# TEST RUNNER
+# ------------------------------------------------------------------------------
+TEST_RUNNER = 'edualert.common.test_runner.CommonTestRunner'
+# The number of endpoints reported for the most queries & the longest requests at the end of the test run (0 disables the report)
+TEST_REQUESTS_REPORT_SIZE = env.int('TEST_REQUESTS_REPORT_SIZE', 10)
+
+# DATABASES
+# ------------------------------------------------------------------------------
+# Emulates the reporting replica with a second connection to the test database; the router is only enabled
+# by the tests which declare `databases = {'default', 'reporting'}`
+DATABASES['reporting'] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+REPORTING_DATABASE_ENABLED = False
+
 # PASSWORD HASHING
 # ------------------------------------------------------------------------------
 # MD5 is fast, perfect for testing.
@@ -27,6 +40,14 @@ CELERY_TASK_ALWAYS_EAGER = True
 CELERY_ALWAYS_EAGER = True
 CELERY_EAGER_PROPAGATES = True
 
+# STATISTICS CACHE
+# ------------------------------------------------------------------------------
+# Most of the tests change the statistics directly, without running the tasks which invalidate the cache
+STATISTICS_CACHE_ENABLED = False
+# The calendars are created and changed by the tests directly as well
+ACADEMIC_CALENDAR_CACHE_TIMEOUT = 0
+CURRICULUM_CACHE_TIMEOUT = 0
+
 # EMAILS
 # ------------------------------------------------------------------------------
 EMAIL_BACKEND = 'django.core.mail.backends.dummy.EmailBackend'
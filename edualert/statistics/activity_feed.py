@@ -0,0 +1,222 @@
+from django.utils import timezone
+from django.utils.translation import gettext as _, gettext_noop
+
+from edualert.catalogs.models import ExaminationGrade, SubjectAbsence, SubjectGrade
+from edualert.catalogs.utils import get_avg_limit_for_subject, get_behavior_grade_limit
+from edualert.profiles.models import UserProfile
+from edualert.statistics.models import StudentActivity
+
+ABSENCE_AUTHORIZATION = 'ABSENCE_AUTHORIZATION'
+NEW_AUTHORIZED_ABSENCE = 'NEW_AUTHORIZED_ABSENCE'
+NEW_UNAUTHORIZED_ABSENCE = 'NEW_UNAUTHORIZED_ABSENCE'
+NEW_GRADE = 'NEW_GRADE'
+SECOND_EXAMINATION_AVERAGE = 'SECOND_EXAMINATION_AVERAGE'
+DIFFERENCE_AVERAGE = 'DIFFERENCE_AVERAGE'
+
+ACTIVITY_DAYS = 15
+ACTIVITY_DELAY_HOURS = 2
+
+
+def get_student_activities(student):
+    """
+    Returns the student's activities which were created in the last 15 days (and not in the last 2 hours, so they can still be corrected),
+    sorted by date (most recent first).
+    """
+    now = timezone.now()
+    after_limit = now - timezone.timedelta(days=ACTIVITY_DAYS)
+    before_limit = now - timezone.timedelta(hours=ACTIVITY_DELAY_HOURS)
+
+    activities = StudentActivity.objects.select_related('catalog_per_subject') \
+        .filter(student=student, created__gte=after_limit, created__lte=before_limit) \
+        .order_by('-date', 'source_type', '-created', 'id')
+
+    return [data for data in (render_activity(activity) for activity in activities) if data is not None]
+
+
+def render_activity(activity):
+    event_params = list(activity.event_params)
+    grade_value = activity.grade_value
+    if activity.average_field:
+        grade_value = getattr(activity.catalog_per_subject, activity.average_field)
+        if grade_value is None:
+            return None
+        event_params.insert(0, get_printable_average(grade_value))
+
+    data = {
+        'date': activity.date.strftime('%d-%m-%Y'),
+        'subject_name': activity.subject_name,
+        'event_type': activity.event_type,
+        'event': _(activity.event).format(*event_params),
+    }
+    if activity.source_type != StudentActivity.SourceTypes.ABSENCE:
+        data['grade_limit'] = activity.grade_limit
+        data['grade_value'] = grade_value
+
+    return data
+
+
+def update_absence_activities(absences):
+    activities = []
+    for absence in absences:
+        activity = StudentActivity(
+            student_id=absence.student_id,
+            catalog_per_subject_id=absence.catalog_per_subject_id,
+            subject_absence=absence,
+            source_type=StudentActivity.SourceTypes.ABSENCE,
+            created=absence.created,
+            subject_name=absence.subject_name
+        )
+        if absence.modified > absence.created + timezone.timedelta(seconds=1) and absence.is_founded:
+            activity.date = absence.modified.date()
+            activity.event_type = ABSENCE_AUTHORIZATION
+            activity.event = gettext_noop('Authorized absence from {}')
+            activity.event_params = [absence.taken_at.strftime('%d-%m')]
+        else:
+            activity.date = absence.taken_at
+            activity.event_type = NEW_AUTHORIZED_ABSENCE if absence.is_founded else NEW_UNAUTHORIZED_ABSENCE
+            activity.event = gettext_noop('Authorized absence') if absence.is_founded else gettext_noop('Unauthorized absence')
+        activities.append(activity)
+
+    replace_activities(activities, 'subject_absence_id', [absence.id for absence in absences])
+
+
+def update_grade_activities(grades):
+    behavior_grade_limits = get_behavior_grade_limits(grades)
+    activities = []
+    for grade in grades:
+        grade_limit = behavior_grade_limits[grade.student_id] if grade.catalog_per_subject.is_coordination_subject else 5
+
+        activities.append(StudentActivity(
+            student_id=grade.student_id,
+            catalog_per_subject_id=grade.catalog_per_subject_id,
+            subject_grade=grade,
+            source_type=StudentActivity.SourceTypes.GRADE,
+            created=grade.created,
+            date=grade.taken_at,
+            subject_name=grade.subject_name,
+            event_type=NEW_GRADE,
+            event=gettext_noop('Grade {}') if grade.grade_type == SubjectGrade.GradeTypes.REGULAR else gettext_noop('Thesis grade {}'),
+            event_params=[grade.grade],
+            grade_limit=grade_limit,
+            grade_value=grade.grade
+        ))
+
+    replace_activities(activities, 'subject_grade_id', [grade.id for grade in grades])
+
+
+def get_behavior_grade_limits(grades):
+    """
+    Returns the behavior grade limits of the students with coordination subject grades, by student ID (with a single query,
+    instead of following each grade to its student's school unit & academic profile).
+    """
+    student_ids = {grade.student_id for grade in grades if grade.catalog_per_subject.is_coordination_subject}
+    if not student_ids:
+        return {}
+
+    return {
+        student.id: get_behavior_grade_limit(student.school_unit.academic_profile if student.school_unit else None)
+        for student in UserProfile.objects.filter(id__in=student_ids).select_related('school_unit__academic_profile')
+    }
+
+
+def update_examination_activities(catalog_ids):
+    """
+    Recreates the examination averages activities of the given catalogs. An average appears in the feed once both its
+    examination grades exist (and as long as the catalog has that average).
+    """
+    activities = []
+    exam_groups = {}
+    catalogs_map = {}
+    for exam_grade in ExaminationGrade.objects.filter(catalog_per_subject_id__in=catalog_ids) \
+            .select_related('catalog_per_subject__study_class__school_unit__academic_profile',
+                            'catalog_per_subject__study_class__academic_program__core_subject'):
+        catalog = exam_grade.catalog_per_subject
+        exam_groups.setdefault(catalog.id, []).append(exam_grade)
+        catalogs_map[catalog.id] = catalog
+
+    for catalog_id, grades in exam_groups.items():
+        catalog = catalogs_map[catalog_id]
+        group_by_semester = {
+            0: {
+                ExaminationGrade.GradeTypes.SECOND_EXAMINATION: [],
+                ExaminationGrade.GradeTypes.DIFFERENCE: []
+            },
+            1: [],
+            2: []
+        }
+        for grade in grades:
+            if grade.semester is not None:
+                group_by_semester[grade.semester].append(grade)
+            else:
+                group_by_semester[0][grade.grade_type].append(grade)
+
+        grade_limit = get_avg_limit_for_subject(catalog.study_class, catalog.is_coordination_subject, catalog.subject_id)
+        class_grade = catalog.study_class.class_grade
+        groups = [
+            (group_by_semester[0][ExaminationGrade.GradeTypes.SECOND_EXAMINATION], SECOND_EXAMINATION_AVERAGE,
+             'avg_after_2nd_examination', gettext_noop('Second examination average {}'), []),
+            (group_by_semester[0][ExaminationGrade.GradeTypes.DIFFERENCE], DIFFERENCE_AVERAGE,
+             'avg_annual', gettext_noop('Difference average {} for class {}'), [class_grade]),
+            (group_by_semester[1], DIFFERENCE_AVERAGE,
+             'avg_sem1', gettext_noop('Difference average {} for class {}, semester 1'), [class_grade]),
+            (group_by_semester[2], DIFFERENCE_AVERAGE,
+             'avg_sem2', gettext_noop('Difference average {} for class {}, semester 2'), [class_grade]),
+        ]
+        for group, event_type, average_field, event, event_params in groups:
+            if len(group) != 2:
+                continue
+            activities.append(StudentActivity(
+                student_id=catalog.student_id,
+                catalog_per_subject=catalog,
+                source_type=StudentActivity.SourceTypes.EXAMINATION_AVERAGE,
+                created=max(grade.created for grade in group),
+                date=max(grade.taken_at for grade in group),
+                subject_name=catalog.subject_name,
+                event_type=event_type,
+                event=event,
+                event_params=event_params,
+                average_field=average_field,
+                grade_limit=grade_limit
+            ))
+
+    StudentActivity.objects.filter(catalog_per_subject_id__in=catalog_ids,
+                                   source_type=StudentActivity.SourceTypes.EXAMINATION_AVERAGE).delete()
+    StudentActivity.objects.bulk_create(activities)
+
+
+def create_student_activities(absences=(), grades=()):
+    """
+    To be called after absences or grades were created with bulk_create (which doesn't send the post_save signals).
+    """
+    if absences:
+        update_absence_activities(absences)
+    if grades:
+        update_grade_activities(grades)
+
+
+def rebuild_student_activities():
+    """
+    Recreates the activities of the absences and grades created in the last 15 days.
+    """
+    after_limit = timezone.now() - timezone.timedelta(days=ACTIVITY_DAYS)
+    update_absence_activities(list(SubjectAbsence.objects.filter(created__gte=after_limit)))
+    update_grade_activities(list(SubjectGrade.objects.filter(created__gte=after_limit)
+                                 .select_related('catalog_per_subject')))
+    update_examination_activities(list(ExaminationGrade.objects.filter(created__gte=after_limit)
+                                       .values_list('catalog_per_subject_id', flat=True).distinct()))
+
+
+def replace_activities(activities, source_field, source_ids):
+    StudentActivity.objects.filter(**{'{}__in'.format(source_field): source_ids}).delete()
+    StudentActivity.objects.bulk_create(activities)
+
+
+def delete_old_activities():
+    StudentActivity.objects.filter(created__lt=timezone.now() - timezone.timedelta(days=ACTIVITY_DAYS)).delete()
+
+
+def get_printable_average(avg):
+    if avg == int(avg):
+        return '{:.0f}'.format(avg)
+
+    return '{:.1f}'.format(avg)
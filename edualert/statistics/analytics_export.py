@@ -0,0 +1,247 @@
+import hashlib
+import json
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db.models import Count
+from django.utils import timezone
+
+from edualert.catalogs.models import StudentCatalogPerYear, StudentCatalogPerSubject, SubjectAbsence
+
+# Rows fetched at once from the server side cursors, and written as a row group of the partition file
+ANALYTICS_EXPORT_CHUNK_SIZE = 2000
+MANIFEST_FILE_NAME = 'manifest.json'
+
+# Each dataset column is described as (column name, queryset lookup, column type)
+CATALOG_PER_YEAR_COLUMNS = [
+    ('academic_year', 'academic_year', 'integer'),
+    ('district', 'study_class__school_unit__district', 'string'),
+    ('school_unit_id', 'study_class__school_unit_id', 'integer'),
+    ('study_class_id', 'study_class_id', 'integer'),
+    ('class_grade', 'study_class__class_grade_arabic', 'integer'),
+    ('id', 'id', 'integer'),
+    ('student_id', 'student_id', 'integer'),
+    ('avg_sem1', 'avg_sem1', 'decimal'),
+    ('avg_sem2', 'avg_sem2', 'decimal'),
+    ('avg_annual', 'avg_annual', 'decimal'),
+    ('avg_final', 'avg_final', 'decimal'),
+    ('abs_count_sem1', 'abs_count_sem1', 'integer'),
+    ('abs_count_sem2', 'abs_count_sem2', 'integer'),
+    ('abs_count_annual', 'abs_count_annual', 'integer'),
+    ('founded_abs_count_sem1', 'founded_abs_count_sem1', 'integer'),
+    ('founded_abs_count_sem2', 'founded_abs_count_sem2', 'integer'),
+    ('founded_abs_count_annual', 'founded_abs_count_annual', 'integer'),
+    ('unfounded_abs_count_sem1', 'unfounded_abs_count_sem1', 'integer'),
+    ('unfounded_abs_count_sem2', 'unfounded_abs_count_sem2', 'integer'),
+    ('unfounded_abs_count_annual', 'unfounded_abs_count_annual', 'integer'),
+    ('second_examinations_count', 'second_examinations_count', 'integer'),
+    ('behavior_grade_sem1', 'behavior_grade_sem1', 'integer'),
+    ('behavior_grade_sem2', 'behavior_grade_sem2', 'integer'),
+    ('behavior_grade_annual', 'behavior_grade_annual', 'decimal'),
+]
+CATALOG_PER_SUBJECT_COLUMNS = [
+    ('academic_year', 'academic_year', 'integer'),
+    ('district', 'study_class__school_unit__district', 'string'),
+    ('school_unit_id', 'study_class__school_unit_id', 'integer'),
+    ('study_class_id', 'study_class_id', 'integer'),
+    ('class_grade', 'study_class__class_grade_arabic', 'integer'),
+    ('id', 'id', 'integer'),
+    ('student_id', 'student_id', 'integer'),
+    ('subject_id', 'subject_id', 'integer'),
+    ('subject_name', 'subject_name', 'string'),
+    ('is_coordination_subject', 'is_coordination_subject', 'boolean'),
+    ('avg_sem1', 'avg_sem1', 'integer'),
+    ('avg_sem2', 'avg_sem2', 'integer'),
+    ('avg_annual', 'avg_annual', 'decimal'),
+    ('avg_after_2nd_examination', 'avg_after_2nd_examination', 'decimal'),
+    ('avg_final', 'avg_final', 'decimal'),
+    ('abs_count_annual', 'abs_count_annual', 'integer'),
+    ('founded_abs_count_annual', 'founded_abs_count_annual', 'integer'),
+    ('unfounded_abs_count_annual', 'unfounded_abs_count_annual', 'integer'),
+    ('is_at_risk', 'is_at_risk', 'boolean'),
+    ('is_exempted', 'is_exempted', 'boolean'),
+    ('is_enrolled', 'is_enrolled', 'boolean'),
+]
+ABSENCES_COLUMNS = [
+    ('academic_year', 'academic_year', 'integer'),
+    ('district', 'catalog_per_subject__study_class__school_unit__district', 'string'),
+    ('school_unit_id', 'catalog_per_subject__study_class__school_unit_id', 'integer'),
+    ('study_class_id', 'catalog_per_subject__study_class_id', 'integer'),
+    ('subject_name', 'subject_name', 'string'),
+    ('semester', 'semester', 'integer'),
+    ('is_founded', 'is_founded', 'boolean'),
+    ('count', 'count', 'integer'),
+]
+
+
+def get_analytics_datasets():
+    """
+    Returns the exported datasets, as name -> (columns, queryset). The querysets are ordered by partition, and then
+    by a unique key, so the content (and the digest) of a partition only changes along with its data.
+    """
+    absences_lookups = [lookup for name, lookup, column_type in ABSENCES_COLUMNS if name != 'count']
+    absences = SubjectAbsence.objects \
+        .values(*absences_lookups) \
+        .annotate(count=Count('id')) \
+        .order_by(*absences_lookups)
+
+    return {
+        'catalogs_per_year': (CATALOG_PER_YEAR_COLUMNS, StudentCatalogPerYear.objects.order_by(*_get_partition_lookups(CATALOG_PER_YEAR_COLUMNS), 'id')),
+        'catalogs_per_subject': (CATALOG_PER_SUBJECT_COLUMNS, StudentCatalogPerSubject.objects.order_by(*_get_partition_lookups(CATALOG_PER_SUBJECT_COLUMNS), 'id')),
+        'absences': (ABSENCES_COLUMNS, absences),
+    }
+
+
+def _get_partition_lookups(columns):
+    # The datasets are partitioned by their first two columns, the academic year & the district
+    return [lookup for name, lookup, column_type in columns[:2]]
+
+
+def export_analytics_data(storage, incremental=True):
+    """
+    Dump the catalog statistics into Parquet files partitioned by academic year and district, in the given storage
+    (under `settings.ANALYTICS_EXPORT_LOCATION`), together with a manifest describing the typed columns and the
+    partitions of every dataset.
+    In incremental mode, the partitions whose content didn't change since the last export are left untouched.
+    """
+    previous_manifest = _read_manifest(storage) if incremental else {}
+    manifest = {
+        'generated_at': timezone.now().isoformat(),
+        'format': 'parquet',
+        'partitioned_by': ['academic_year', 'district'],
+        'datasets': {}
+    }
+
+    for dataset_name, (columns, queryset) in get_analytics_datasets().items():
+        previous_partitions = previous_manifest.get('datasets', {}).get(dataset_name, {}).get('partitions', {})
+        manifest['datasets'][dataset_name] = {
+            'columns': [{'name': name, 'type': column_type} for name, lookup, column_type in columns],
+            'partitions': _export_dataset(storage, dataset_name, columns, queryset, previous_partitions)
+        }
+
+    # Written last, so it never points to partitions which aren't saved yet
+    _save(storage, _get_export_name(MANIFEST_FILE_NAME), ContentFile(json.dumps(manifest, indent=2, ensure_ascii=False).encode('utf-8')))
+    return manifest
+
+
+def _get_parquet_schema(columns):
+    # Only imported by the export, so the processes which just import the tasks don't load it
+    import pyarrow
+
+    # All the exported decimals are averages & grades, with 4 digits and 2 decimals
+    parquet_types = {
+        'integer': pyarrow.int64(),
+        'string': pyarrow.string(),
+        'boolean': pyarrow.bool_(),
+        'decimal': pyarrow.decimal128(4, 2),
+    }
+    return pyarrow.schema([(name, parquet_types[column_type]) for name, lookup, column_type in columns])
+
+
+def _export_dataset(storage, dataset_name, columns, queryset, previous_partitions):
+    lookups = [lookup for name, lookup, column_type in columns]
+    # The rows come ordered by partition, so only one partition file is open at a time
+    rows = queryset.values_list(*lookups).iterator(chunk_size=ANALYTICS_EXPORT_CHUNK_SIZE)
+    schema = _get_parquet_schema(columns)
+
+    partitions = {}
+    partition_writer = None
+    for row in rows:
+        partition = _get_partition_path(dataset_name, row[0], row[1])
+        if partition_writer is None or partition_writer.partition != partition:
+            if partition_writer:
+                partitions[partition_writer.partition] = partition_writer.close(previous_partitions)
+            partition_writer = _PartitionWriter(storage, partition, schema)
+        partition_writer.write(row)
+
+    if partition_writer:
+        partitions[partition_writer.partition] = partition_writer.close(previous_partitions)
+
+    # Remove the partitions which don't have data anymore
+    for partition in previous_partitions.keys() - partitions.keys():
+        storage.delete(_get_export_name(partition))
+
+    return partitions
+
+
+def _get_partition_path(dataset_name, academic_year, district):
+    district = (district or 'unknown').replace('/', '-')
+    return f'{dataset_name}/academic_year={academic_year}/district={district}/part.parquet'
+
+
+def _get_export_name(path):
+    return f'{settings.ANALYTICS_EXPORT_LOCATION}/{path}'
+
+
+class _PartitionWriter:
+    """
+    Writes the rows of a partition into a local temporary Parquet file, one row group per chunk of rows, and saves it
+    into the storage once complete, unless its content didn't change since the previous export.
+    """
+
+    def __init__(self, storage, partition, schema):
+        import pyarrow.parquet
+
+        self.storage = storage
+        self.partition = partition
+        self.schema = schema
+        self.rows = []
+        self.rows_count = 0
+        self.digest = hashlib.sha1()
+
+        self.temp_file = tempfile.TemporaryFile()
+        self.parquet_writer = pyarrow.parquet.ParquetWriter(self.temp_file, schema)
+
+    def write(self, row):
+        # The digest is computed from the values, since the Parquet files also contain metadata
+        self.digest.update(repr(row).encode('utf-8'))
+        self.rows.append(row)
+        self.rows_count += 1
+        if len(self.rows) == ANALYTICS_EXPORT_CHUNK_SIZE:
+            self._write_row_group()
+
+    def close(self, previous_partitions):
+        if self.rows:
+            self._write_row_group()
+        self.parquet_writer.close()
+
+        try:
+            digest = self.digest.hexdigest()
+            name = _get_export_name(self.partition)
+            previous_partition = previous_partitions.get(self.partition)
+            if previous_partition and previous_partition['sha1'] == digest and self.storage.exists(name):
+                return previous_partition
+
+            self.temp_file.seek(0)
+            _save(self.storage, name, File(self.temp_file))
+            return {
+                'rows_count': self.rows_count,
+                'sha1': digest,
+                'updated_at': timezone.now().isoformat()
+            }
+        finally:
+            self.temp_file.close()
+
+    def _write_row_group(self):
+        import pyarrow
+
+        columns = [pyarrow.array([row[index] for row in self.rows], type=field.type) for index, field in enumerate(self.schema)]
+        self.parquet_writer.write_table(pyarrow.Table.from_arrays(columns, schema=self.schema))
+        self.rows = []
+
+
+def _read_manifest(storage):
+    try:
+        with storage.open(_get_export_name(MANIFEST_FILE_NAME)) as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(storage, name, content):
+    # Replaces the file; the local storage would save it under another name otherwise
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, content)
@@ -0,0 +1,44 @@
+# Generated by Django 3.0.4 on 2026-10-19 13:56
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0019_search_trigram_indexes'),
+        ('catalogs', '0014_auto_20200612_0855'),
+        ('statistics', '0005_auto_20200618_0854'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_type', models.PositiveSmallIntegerField(choices=[(1, 'Absence'), (2, 'Grade'), (3, 'Examination average')])),
+                ('created', models.DateTimeField(help_text='When the absence / grade (or the last of the examination grades) was created.')),
+                ('date', models.DateField()),
+                ('subject_name', models.CharField(max_length=100)),
+                ('event_type', models.CharField(max_length=64)),
+                ('event', models.CharField(help_text='Untranslated message, formatted with the event params.', max_length=128)),
+                ('event_params', django.contrib.postgres.fields.jsonb.JSONField(default=list)),
+                ('average_field', models.CharField(blank=True, help_text='Only for examination averages: the catalog average appended to the event params.', max_length=32, null=True)),
+                ('grade_limit', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('grade_value', models.PositiveSmallIntegerField(blank=True, help_text='Only for grades.', null=True)),
+                ('catalog_per_subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', related_query_name='activity', to='catalogs.StudentCatalogPerSubject')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', related_query_name='activity', to='profiles.UserProfile')),
+                ('subject_absence', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='catalogs.SubjectAbsence')),
+                ('subject_grade', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='catalogs.SubjectGrade')),
+            ],
+            options={
+                'verbose_name_plural': 'student activities',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='studentactivity',
+            index=models.Index(fields=['student', 'created'], name='statistics__student_07e42e_idx'),
+        ),
+    ]
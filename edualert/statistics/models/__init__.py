@@ -1,2 +1,3 @@
 from .school_units import SchoolUnitEnrollmentStats, SchoolUnitStats
 from .students import StudentAtRiskCounts
+from .student_activity import StudentActivity
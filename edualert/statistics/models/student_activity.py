@@ -0,0 +1,52 @@
+from django.contrib.postgres.fields import JSONField
+from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.utils.translation import gettext_lazy as _
+
+from edualert.statistics.signals import subject_absence_post_save, subject_grade_post_save, examination_grade_changed
+
+
+class StudentActivity(models.Model):
+    """
+    An entry of a student's activity feed, stored when the grade / absence / examination grade is written,
+    so the feed can be read with a single range scan on (student, created).
+    """
+    student = models.ForeignKey("profiles.UserProfile", on_delete=models.CASCADE, related_name="activities", related_query_name="activity")
+    catalog_per_subject = models.ForeignKey("catalogs.StudentCatalogPerSubject", on_delete=models.CASCADE,
+                                            related_name="activities", related_query_name="activity")
+    subject_absence = models.OneToOneField("catalogs.SubjectAbsence", on_delete=models.CASCADE, null=True, blank=True, related_name="activity")
+    subject_grade = models.OneToOneField("catalogs.SubjectGrade", on_delete=models.CASCADE, null=True, blank=True, related_name="activity")
+
+    class SourceTypes(models.IntegerChoices):
+        ABSENCE = 1, _('Absence')
+        GRADE = 2, _('Grade')
+        EXAMINATION_AVERAGE = 3, _('Examination average')
+
+    source_type = models.PositiveSmallIntegerField(choices=SourceTypes.choices)
+    created = models.DateTimeField(help_text=_("When the absence / grade (or the last of the examination grades) was created."))
+    date = models.DateField()
+    subject_name = models.CharField(max_length=100)
+    event_type = models.CharField(max_length=64)
+    event = models.CharField(max_length=128, help_text=_("Untranslated message, formatted with the event params."))
+    event_params = JSONField(default=list)
+    average_field = models.CharField(max_length=32, null=True, blank=True,
+                                     help_text=_("Only for examination averages: the catalog average appended to the event params."))
+    grade_limit = models.PositiveSmallIntegerField(null=True, blank=True)
+    grade_value = models.PositiveSmallIntegerField(null=True, blank=True, help_text=_("Only for grades."))
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return f'StudentActivity {self.id}'
+
+    class Meta:
+        verbose_name_plural = 'student activities'
+        indexes = [
+            models.Index(fields=['student', 'created'])
+        ]
+
+
+post_save.connect(subject_absence_post_save, sender='catalogs.SubjectAbsence')
+post_save.connect(subject_grade_post_save, sender='catalogs.SubjectGrade')
+post_save.connect(examination_grade_changed, sender='catalogs.ExaminationGrade')
+post_delete.connect(examination_grade_changed, sender='catalogs.ExaminationGrade')
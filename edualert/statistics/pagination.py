@@ -1,5 +1,5 @@
-from edualert.common.pagination import CommonPagination
+from edualert.common.pagination import CommonKeysetPagination
 
 
-class StatisticsPagination(CommonPagination):
+class StatisticsPagination(CommonKeysetPagination):
     page_size = 10
@@ -0,0 +1,122 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.response import Response
+
+from edualert.common.reporting_database import primary_database_reads
+from edualert.common.utils import increment_cache_counter
+
+COUNTRY_SCOPE = 'country'
+SCHOOL_UNIT_SCOPE = 'school_unit'
+# Included in all the keys, so every cached statistic can be dropped at once
+GLOBAL_NAMESPACE = 'global'
+
+NAMESPACE_VERSION_KEY = 'statistics_cache_version_{}'
+HITS_COUNTER_KEY = 'statistics_cache_hits_{}'
+MISSES_COUNTER_KEY = 'statistics_cache_misses_{}'
+
+
+def get_school_unit_namespace(school_unit_id):
+    return f'{SCHOOL_UNIT_SCOPE}_{school_unit_id}'
+
+
+def get_statistics_cache_key(endpoint, role, namespace, query_params, extra=None):
+    """
+    Build the cache key of a statistics response. The key contains the current versions of the namespaces
+    the response depends on, so bumping one of them makes all the previously cached responses unreachable.
+    """
+    versions = cache.get_many([NAMESPACE_VERSION_KEY.format(GLOBAL_NAMESPACE), NAMESPACE_VERSION_KEY.format(namespace)])
+    global_version = versions.get(NAMESPACE_VERSION_KEY.format(GLOBAL_NAMESPACE), 0)
+    namespace_version = versions.get(NAMESPACE_VERSION_KEY.format(namespace), 0)
+    params_hash = hashlib.md5(query_params.urlencode().encode('utf-8')).hexdigest()
+
+    # The statistics are ordered depending on the current semester, so the responses can't outlive the day
+    return f'statistics_{endpoint}_{role}_{namespace}_{extra or ""}_' \
+           f'{global_version}_{namespace_version}_{timezone.now().date()}_{params_hash}'
+
+
+def invalidate_school_unit_statistics(school_unit_id):
+    """
+    To be called after the statistics of a school unit were recalculated.
+    The country statistics are invalidated as well, since they include the school unit's.
+    """
+    increment_cache_counter(NAMESPACE_VERSION_KEY.format(get_school_unit_namespace(school_unit_id)))
+    increment_cache_counter(NAMESPACE_VERSION_KEY.format(COUNTRY_SCOPE))
+
+
+def invalidate_school_unit_study_classes(school_unit_id):
+    """
+    To be called after study classes were added to a school unit, or their teachers changed,
+    since the teachers' statistics only include the study classes they teach.
+    """
+    increment_cache_counter(NAMESPACE_VERSION_KEY.format(get_school_unit_namespace(school_unit_id)))
+
+
+def invalidate_country_statistics():
+    increment_cache_counter(NAMESPACE_VERSION_KEY.format(COUNTRY_SCOPE))
+
+
+def invalidate_all_statistics():
+    increment_cache_counter(NAMESPACE_VERSION_KEY.format(GLOBAL_NAMESPACE))
+
+
+def get_statistics_cache_metrics(endpoints):
+    """
+    Returns the cache hits and misses counted for each of the given endpoints.
+    """
+    counters = cache.get_many([HITS_COUNTER_KEY.format(endpoint) for endpoint in endpoints] +
+                              [MISSES_COUNTER_KEY.format(endpoint) for endpoint in endpoints])
+    return {
+        endpoint: {
+            'hits': counters.get(HITS_COUNTER_KEY.format(endpoint), 0),
+            'misses': counters.get(MISSES_COUNTER_KEY.format(endpoint), 0)
+        } for endpoint in endpoints
+    }
+
+
+class CachedStatisticsMixin:
+    """
+    Serves the response data of a statistics view from the cache, until the statistics it is based on
+    are recalculated. The responses are cached per endpoint, user role, scope and query params.
+    The cached responses are computed from the primary database, since the reporting replica might not have
+    the recalculated statistics yet, and a stale response would be served until the next recalculation.
+    """
+    statistics_cache_scope = SCHOOL_UNIT_SCOPE
+
+    def get_statistics_cache_key(self):
+        profile = self.request.user.user_profile
+        if self.statistics_cache_scope == COUNTRY_SCOPE:
+            namespace = COUNTRY_SCOPE
+        else:
+            namespace = get_school_unit_namespace(profile.school_unit_id)
+
+        return get_statistics_cache_key(
+            self.__class__.__name__, profile.user_role, namespace, self.request.query_params,
+            extra=self.get_statistics_cache_key_extra()
+        )
+
+    def get_statistics_cache_key_extra(self):
+        """
+        Override this when the response also depends on the user who made the request.
+        """
+        return None
+
+    def get(self, request, *args, **kwargs):
+        if not settings.STATISTICS_CACHE_ENABLED:
+            return super().get(request, *args, **kwargs)
+
+        endpoint = self.__class__.__name__
+        key = self.get_statistics_cache_key()
+        data = cache.get(key)
+        if data is not None:
+            increment_cache_counter(HITS_COUNTER_KEY.format(endpoint))
+            return Response(data)
+
+        increment_cache_counter(MISSES_COUNTER_KEY.format(endpoint))
+        with primary_database_reads():
+            response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=settings.STATISTICS_CACHE_TIMEOUT)
+        return response
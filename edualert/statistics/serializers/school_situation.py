@@ -6,7 +6,7 @@ from edualert.academic_calendars.utils import get_current_academic_calendar
 from edualert.catalogs.models import StudentCatalogPerYear, StudentCatalogPerSubject
 from edualert.catalogs.serializers import StudentCatalogPerSubjectWithTeacherSerializer
 from edualert.catalogs.utils import has_technological_category, get_avg_limit_for_subject, get_behavior_grade_limit, \
-    get_working_weeks_count, get_weekly_hours_count
+    get_working_weeks_count, get_weekly_hours_count, get_weekly_hours_counts
 from edualert.profiles.models import UserProfile
 from edualert.profiles.serializers import UserProfileBaseSerializer, LabelSerializer
 from edualert.study_classes.models import StudyClass
@@ -68,16 +68,23 @@ class SchoolSituationSerializer(serializers.ModelSerializer):
             return None
 
         is_technological_school = has_technological_category(study_class.school_unit)
+        catalogs = list(
+            obj.student_catalogs_per_subject.filter(academic_year=study_class.academic_year, is_enrolled=True)
+                .select_related('teacher', 'study_class__school_unit__academic_profile', 'study_class__academic_program')
+                .prefetch_related('grades', 'absences', 'examination_grades')
+                .order_by('-is_coordination_subject', Lower('subject_name'))
+        )
+        weekly_hours_counts = get_weekly_hours_counts(study_class, [catalog.subject_id for catalog in catalogs
+                                                                    if catalog.study_class_id == study_class.id])
+
         self.context.update({
             'working_weeks_count_sem1': get_working_weeks_count(self.get_calendar(), 1, study_class, is_technological_school),
-            'working_weeks_count_sem2': get_working_weeks_count(self.get_calendar(), 2, study_class, is_technological_school)
+            'working_weeks_count_sem2': get_working_weeks_count(self.get_calendar(), 2, study_class, is_technological_school),
+            'weekly_hours_counts': {(study_class.id, subject_id): count for subject_id, count in weekly_hours_counts.items()}
         })
 
         return StudentCatalogPerSubjectWithTeacherSerializer(
-            instance=obj.student_catalogs_per_subject.filter(academic_year=study_class.academic_year, is_enrolled=True)
-                .select_related('teacher', 'study_class__school_unit__academic_profile', 'study_class__academic_program')
-                .prefetch_related('grades', 'absences', 'examination_grades')
-                .order_by('-is_coordination_subject', Lower('subject_name')),
+            instance=catalogs,
             many=True,
             context=self.context
         ).data
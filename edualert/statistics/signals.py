@@ -0,0 +1,13 @@
+def subject_absence_post_save(sender, instance, **kwargs):
+    from edualert.statistics.activity_feed import update_absence_activities
+    update_absence_activities([instance])
+
+
+def subject_grade_post_save(sender, instance, **kwargs):
+    from edualert.statistics.activity_feed import update_grade_activities
+    update_grade_activities([instance])
+
+
+def examination_grade_changed(sender, instance, **kwargs):
+    from edualert.statistics.activity_feed import update_examination_activities
+    update_examination_activities([instance.catalog_per_subject_id])
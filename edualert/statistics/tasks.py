@@ -18,9 +18,13 @@ from openpyxl.styles.numbers import FORMAT_TEXT
 from edualert.academic_calendars.utils import get_current_academic_calendar
 from edualert.catalogs.models import StudentCatalogPerSubject
 from edualert.common.constants import WEEKDAYS_MAP
+from edualert.common.reporting_database import reads_from_reporting_database
+from edualert.common.utils import get_private_storage
 from edualert.notifications.utils.emails import send_mail_with_attachments
 from edualert.schools.models import RegisteredSchoolUnit
+from edualert.statistics.analytics_export import export_analytics_data
 from edualert.statistics.models import StudentAtRiskCounts, SchoolUnitEnrollmentStats
+from edualert.statistics.response_cache import invalidate_country_statistics
 from edualert.study_classes.models import StudyClass
 
 
@@ -153,6 +157,7 @@ def create_school_unit_enrollment_stats_task():
                 'weekday': WEEKDAYS_MAP[datetime.datetime(today.year, today.month, day).weekday()]
             } for day in range(1, days_in_month + 1)]
         )
+        invalidate_country_statistics()
 
 
 @shared_task
@@ -165,6 +170,7 @@ def update_school_unit_enrollment_stats_task():
         if daily_stat['day'] == today.day:
             stats.daily_statistics[index]['count'] += 1
             stats.save()
+            invalidate_country_statistics()
             break
 
 
@@ -188,6 +194,7 @@ def _get_month_name(month_number):
 
 
 @shared_task
+@reads_from_reporting_database
 def send_monthly_school_unit_absence_report_task():
     today = timezone.now().date()
     reported_date = today - relativedelta(months=1)
@@ -435,3 +442,15 @@ def _write_report_xslx(filename, reported_date, current_date, classes):
     worksheet.column_dimensions['A'].width = len(str(worksheet['A1'].value))
 
     workbook.save(filename)
+
+
+@shared_task
+@reads_from_reporting_database
+def export_analytics_data_task(incremental=True):
+    export_analytics_data(get_private_storage(), incremental=incremental)
+
+
+@shared_task
+def delete_old_student_activities_task():
+    from edualert.statistics.activity_feed import delete_old_activities
+    delete_old_activities()
@@ -0,0 +1,107 @@
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+
+import pyarrow.parquet
+from django.test import TestCase, override_settings
+
+from edualert.catalogs.factories import StudentCatalogPerSubjectFactory, StudentCatalogPerYearFactory, SubjectAbsenceFactory
+from edualert.catalogs.models import StudentCatalogPerYear
+from edualert.schools.factories import RegisteredSchoolUnitFactory
+from edualert.statistics.analytics_export import get_analytics_datasets
+from edualert.statistics.tasks import export_analytics_data_task
+from edualert.study_classes.factories import StudyClassFactory
+
+
+class ExportAnalyticsDataTaskTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_unit1 = RegisteredSchoolUnitFactory(district='Cluj')
+        cls.school_unit2 = RegisteredSchoolUnitFactory(district='Iasi')
+        cls.study_class1 = StudyClassFactory(school_unit=cls.school_unit1, academic_year=2019)
+        cls.study_class2 = StudyClassFactory(school_unit=cls.school_unit1, academic_year=2020, class_letter='B')
+        cls.study_class3 = StudyClassFactory(school_unit=cls.school_unit2, academic_year=2020)
+
+        cls.catalog_per_year1 = StudentCatalogPerYearFactory(study_class=cls.study_class1, avg_final=8.5)
+        cls.catalog_per_year2 = StudentCatalogPerYearFactory(study_class=cls.study_class2, avg_final=9)
+        cls.catalog_per_year3 = StudentCatalogPerYearFactory(study_class=cls.study_class3)
+        cls.catalog_per_subject = StudentCatalogPerSubjectFactory(study_class=cls.study_class2, student=cls.catalog_per_year2.student)
+        for is_founded in [True, False, False]:
+            SubjectAbsenceFactory(catalog_per_subject=cls.catalog_per_subject, student=cls.catalog_per_subject.student,
+                                  semester=1, is_founded=is_founded)
+
+    def setUp(self):
+        private_files_root = tempfile.mkdtemp()
+        self.export_root = os.path.join(private_files_root, 'analytics_export')
+        settings_override = override_settings(PRIVATE_FILE_STORAGE_OPTIONS={'location': private_files_root})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, private_files_root)
+
+    def read_manifest(self):
+        with open(os.path.join(self.export_root, 'manifest.json')) as manifest_file:
+            return json.load(manifest_file)
+
+    def read_partition(self, partition):
+        columns = pyarrow.parquet.read_table(os.path.join(self.export_root, partition)).to_pydict()
+        return [dict(zip(columns.keys(), values)) for values in zip(*columns.values())]
+
+    def test_export_analytics_data_partitions(self):
+        export_analytics_data_task()
+
+        manifest = self.read_manifest()
+        self.assertCountEqual(manifest['datasets'].keys(), ['catalogs_per_year', 'catalogs_per_subject', 'absences'])
+        self.assertEqual(manifest['format'], 'parquet')
+        self.assertIn({'name': 'avg_final', 'type': 'decimal'}, manifest['datasets']['catalogs_per_year']['columns'])
+
+        partitions = manifest['datasets']['catalogs_per_year']['partitions']
+        self.assertCountEqual(partitions.keys(), [
+            'catalogs_per_year/academic_year=2019/district=Cluj/part.parquet',
+            'catalogs_per_year/academic_year=2020/district=Cluj/part.parquet',
+            'catalogs_per_year/academic_year=2020/district=Iasi/part.parquet',
+        ])
+        rows = self.read_partition('catalogs_per_year/academic_year=2019/district=Cluj/part.parquet')
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], self.catalog_per_year1.id)
+        self.assertEqual(rows[0]['school_unit_id'], self.school_unit1.id)
+        self.assertEqual(rows[0]['district'], 'Cluj')
+        self.assertEqual(rows[0]['avg_final'], Decimal('8.50'))
+        self.assertIsNone(rows[0]['avg_sem1'])
+
+        rows = self.read_partition('absences/academic_year=2020/district=Cluj/part.parquet')
+        self.assertCountEqual([(row['is_founded'], row['count']) for row in rows], [(True, 1), (False, 2)])
+
+    def test_export_analytics_data_incremental(self):
+        export_analytics_data_task()
+        unchanged_partition = 'catalogs_per_year/academic_year=2020/district=Iasi/part.parquet'
+        changed_partition = 'catalogs_per_year/academic_year=2020/district=Cluj/part.parquet'
+        unchanged_mtime = os.path.getmtime(os.path.join(self.export_root, unchanged_partition))
+        old_manifest = self.read_manifest()
+
+        self.catalog_per_year2.avg_final = 5
+        self.catalog_per_year2.save()
+        StudentCatalogPerYear.objects.filter(id=self.catalog_per_year1.id).delete()
+        export_analytics_data_task()
+
+        manifest = self.read_manifest()
+        partitions = manifest['datasets']['catalogs_per_year']['partitions']
+        self.assertEqual(partitions[unchanged_partition], old_manifest['datasets']['catalogs_per_year']['partitions'][unchanged_partition])
+        self.assertEqual(os.path.getmtime(os.path.join(self.export_root, unchanged_partition)), unchanged_mtime)
+        self.assertNotEqual(partitions[changed_partition]['sha1'], old_manifest['datasets']['catalogs_per_year']['partitions'][changed_partition]['sha1'])
+        self.assertEqual(self.read_partition(changed_partition)[0]['avg_final'], Decimal('5.00'))
+
+        # Partitions without data are removed
+        self.assertNotIn('catalogs_per_year/academic_year=2019/district=Cluj/part.parquet', partitions)
+        self.assertFalse(os.path.exists(os.path.join(self.export_root, 'catalogs_per_year/academic_year=2019/district=Cluj/part.parquet')))
+
+    def test_analytics_datasets_order(self):
+        # The rows are ordered by partition and then by a unique key, so the partitions' digests only change with their data
+        datasets = get_analytics_datasets()
+        for dataset_name in ['catalogs_per_year', 'catalogs_per_subject']:
+            self.assertEqual(datasets[dataset_name][1].query.order_by, ('academic_year', 'study_class__school_unit__district', 'id'))
+        self.assertEqual(datasets['absences'][1].query.order_by, (
+            'academic_year', 'catalog_per_subject__study_class__school_unit__district', 'catalog_per_subject__study_class__school_unit_id',
+            'catalog_per_subject__study_class_id', 'subject_name', 'semester', 'is_founded'
+        ))
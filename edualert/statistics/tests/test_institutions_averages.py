@@ -72,3 +72,22 @@ class InstitutionAveragesTestCase(CommonAPITestCase):
         self.assertEqual(response.data['results'][0]['avg_annual'], 3)
         self.assertEqual(response.data['results'][1]['avg_annual'], 2)
         self.assertEqual(response.data['results'][2]['avg_annual'], 1)
+
+    @patch('django.utils.timezone.now', return_value=datetime.datetime(2019, 12, 10).replace(tzinfo=utc))
+    def test_institutions_averages_cursor_pagination(self, mocked_method):
+        self.client.login(username=self.admin.username, password='passwd')
+        SchoolUnitStatsFactory(school_unit_name='a', avg_sem1=None)
+        SchoolUnitStatsFactory(school_unit_name='b', avg_sem1=7)
+        SchoolUnitStatsFactory(school_unit_name='c', avg_sem1=9)
+
+        # The units without averages are last in both pagination modes
+        response = self.client.get(self.url)
+        self.assertEqual([result['school_unit_name'] for result in response.data['results']], ['c', 'b', 'a'])
+
+        names = []
+        response = self.client.get(self.url, {'cursor': '', 'page_size': 1})
+        while response.data['next']:
+            names.extend(result['school_unit_name'] for result in response.data['results'])
+            response = self.client.get(response.data['next'])
+        names.extend(result['school_unit_name'] for result in response.data['results'])
+        self.assertEqual(names, ['c', 'b', 'a'])
@@ -3,8 +3,8 @@ from django.urls import reverse
 from rest_framework import status
 
 from edualert.academic_calendars.factories import AcademicYearCalendarFactory
-from edualert.catalogs.factories import StudentCatalogPerSubjectFactory, StudentCatalogPerYearFactory
-from edualert.common.api_tests import CommonAPITestCase
+from edualert.catalogs.factories import StudentCatalogPerSubjectFactory, StudentCatalogPerYearFactory, SubjectAbsenceFactory
+from edualert.common.api_tests import CommonAPITestCase, RequestBudget
 from edualert.profiles.factories import UserProfileFactory
 from edualert.profiles.models import UserProfile
 from edualert.schools.factories import RegisteredSchoolUnitFactory, SchoolUnitProfileFactory
@@ -14,6 +14,10 @@ from edualert.subjects.factories import ProgramSubjectThroughFactory
 
 @ddt
 class OwnSchoolSituationTestCase(CommonAPITestCase):
+    request_budgets = {
+        'statistics:own-school-situation': RequestBudget(queries=18)
+    }
+
     @classmethod
     def setUpTestData(cls):
         cls.calendar = AcademicYearCalendarFactory()
@@ -117,3 +121,24 @@ class OwnSchoolSituationTestCase(CommonAPITestCase):
         self.assertEqual(response.data['catalogs_per_subjects'][0]['third_of_hours_count_sem1'], 15)
         self.assertEqual(response.data['catalogs_per_subjects'][0]['third_of_hours_count_sem2'], 15)
         self.assertEqual(response.data['catalogs_per_subjects'][0]['third_of_hours_count_annual'], 30)
+
+    def test_own_school_situation_conditional_response(self):
+        self.client.login(username=self.student.username, password='passwd')
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='W/{}'.format(etag))
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # The teachers are part of the response
+        self.study_class.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        SubjectAbsenceFactory(student=self.student, catalog_per_subject=self.student_catalog_per_subject)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
@@ -257,3 +257,32 @@ class PupilsStatisticsTestCase(CommonAPITestCase):
         for catalog_data, catalog in zip(response.data['results'], StudentCatalogPerYear.objects
                 .filter(id__in=[self.catalog2.id, self.catalog3.id, self.catalog4.id]).order_by(order_by)):
             self.assertEqual(catalog_data['id'], catalog.id)
+
+    @data(
+        'avg_sem1', '-avg_sem1', 'student_name', '-unfounded_abs_count_annual'
+    )
+    def test_pupils_statistics_cursor_pagination(self, ordering):
+        StudentCatalogPerYearFactory(
+            student=UserProfileFactory(user_role=UserProfile.UserRoles.STUDENT, full_name='Student e', school_unit=self.school_unit),
+            study_class=self.study_class, avg_sem1=None
+        )
+        StudentCatalogPerYearFactory(
+            student=UserProfileFactory(user_role=UserProfile.UserRoles.STUDENT, full_name='Student c', school_unit=self.school_unit),
+            study_class=self.study_class, avg_sem1=3, unfounded_abs_count_annual=3
+        )
+
+        for profile in [self.admin, self.principal]:
+            self.client.login(username=profile.username, password='passwd')
+            response = self.client.get(self.url, {'ordering': ordering, 'page_size': 100})
+            expected_ids = [catalog['id'] for catalog in response.data['results']]
+
+            ids = []
+            response = self.client.get(self.url, {'ordering': ordering, 'cursor': '', 'page_size': 2, 'count': 'estimated'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertCountEqual(response.data.keys(), ['count', 'next', 'results'])
+            while response.data['next']:
+                ids.extend(catalog['id'] for catalog in response.data['results'])
+                response = self.client.get(response.data['next'])
+            ids.extend(catalog['id'] for catalog in response.data['results'])
+
+            self.assertEqual(ids, expected_ids)
@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from edualert.academic_calendars.factories import AcademicYearCalendarFactory
+from edualert.academic_programs.factories import AcademicProgramFactory
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.profiles.factories import UserProfileFactory
+from edualert.profiles.models import UserProfile
+from edualert.schools.factories import RegisteredSchoolUnitFactory
+from edualert.statistics.factories import SchoolUnitStatsFactory
+from edualert.statistics.response_cache import invalidate_school_unit_statistics, invalidate_all_statistics, \
+    get_statistics_cache_metrics
+from edualert.study_classes.factories import StudyClassFactory, TeacherClassThroughFactory
+from edualert.subjects.factories import SubjectFactory
+
+
+@override_settings(STATISTICS_CACHE_ENABLED=True)
+class StatisticsResponseCacheTestCase(CommonAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.calendar = AcademicYearCalendarFactory()
+        cls.admin = UserProfileFactory(user_role=UserProfile.UserRoles.ADMINISTRATOR)
+        cls.principal = UserProfileFactory(user_role=UserProfile.UserRoles.PRINCIPAL)
+        cls.school_unit = RegisteredSchoolUnitFactory(school_principal=cls.principal)
+        cls.other_school_unit = RegisteredSchoolUnitFactory()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_statistics_cache_country_scope(self):
+        self.client.login(username=self.admin.username, password='passwd')
+        url = reverse('statistics:institution-averages')
+        stats = SchoolUnitStatsFactory(school_unit=self.school_unit, avg_sem1=5, avg_annual=5)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+
+        # The statistics changed, but the cache wasn't invalidated yet
+        SchoolUnitStatsFactory(school_unit=self.other_school_unit)
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 1)
+
+        # Different query params are cached separately
+        response = self.client.get(url, {'page': 1})
+        self.assertEqual(len(response.data['results']), 2)
+
+        invalidate_school_unit_statistics(stats.school_unit_id)
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 2)
+
+        self.assertEqual(get_statistics_cache_metrics(['SchoolUnitsAverages']), {
+            'SchoolUnitsAverages': {'hits': 1, 'misses': 3}
+        })
+
+    def test_statistics_cache_school_unit_scope(self):
+        self.client.login(username=self.principal.username, password='passwd')
+        url = reverse('statistics:program-averages')
+        AcademicProgramFactory(school_unit=self.school_unit, academic_year=self.calendar.academic_year)
+
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 1)
+
+        AcademicProgramFactory(school_unit=self.school_unit, academic_year=self.calendar.academic_year)
+        # Only the recalculation of the school unit's own statistics invalidates its responses
+        invalidate_school_unit_statistics(self.other_school_unit.id)
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 1)
+
+        invalidate_school_unit_statistics(self.school_unit.id)
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 2)
+
+        AcademicProgramFactory(school_unit=self.school_unit, academic_year=self.calendar.academic_year)
+        invalidate_all_statistics()
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_statistics_cache_per_teacher(self):
+        url = reverse('statistics:study-classes-at-risk')
+        teacher1 = UserProfileFactory(user_role=UserProfile.UserRoles.TEACHER, school_unit=self.school_unit)
+        teacher2 = UserProfileFactory(user_role=UserProfile.UserRoles.TEACHER, school_unit=self.school_unit)
+        study_class = StudyClassFactory(school_unit=self.school_unit, students_at_risk_count=1)
+        TeacherClassThroughFactory(teacher=teacher1, study_class=study_class)
+
+        self.client.login(username=teacher1.username, password='passwd')
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 1)
+
+        self.client.login(username=teacher2.username, password='passwd')
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 0)
+
+    def test_statistics_cache_per_teacher_assignment_changed(self):
+        url = reverse('statistics:study-classes-at-risk')
+        teacher1 = UserProfileFactory(user_role=UserProfile.UserRoles.TEACHER, school_unit=self.school_unit)
+        teacher2 = UserProfileFactory(user_role=UserProfile.UserRoles.TEACHER, school_unit=self.school_unit)
+        subject = SubjectFactory()
+        teacher2.taught_subjects.add(subject)
+        study_class = StudyClassFactory(school_unit=self.school_unit, class_master=teacher1, students_at_risk_count=1)
+        teacher_class_through = TeacherClassThroughFactory(teacher=teacher1, study_class=study_class, subject=subject)
+
+        self.client.login(username=teacher2.username, password='passwd')
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 0)
+
+        # The principal assigns the second teacher to the study class
+        self.client.login(username=self.principal.username, password='passwd')
+        response = self.client.patch(reverse('study_classes:study-class-detail', kwargs={'id': study_class.id}), {
+            'updated_teachers': [{'id': teacher_class_through.id, 'teacher': teacher2.id}],
+            'new_students': [],
+            'deleted_students': []
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.login(username=teacher2.username, password='passwd')
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 1)
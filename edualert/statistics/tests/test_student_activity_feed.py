@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+from django.utils import timezone
+from pytz import utc
+
+from edualert.catalogs.factories import StudentCatalogPerSubjectFactory, SubjectGradeFactory, SubjectAbsenceFactory, ExaminationGradeFactory
+from edualert.catalogs.models import SubjectGrade, ExaminationGrade
+from edualert.catalogs.utils import get_behavior_grade_limit
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.profiles.factories import UserProfileFactory
+from edualert.profiles.models import UserProfile
+from edualert.schools.factories import RegisteredSchoolUnitFactory
+from edualert.statistics.activity_feed import get_student_activities, create_student_activities
+from edualert.statistics.models import StudentActivity
+from edualert.statistics.tasks import delete_old_student_activities_task
+from edualert.study_classes.factories import StudyClassFactory
+
+
+class StudentActivityFeedTestCase(CommonAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school_unit = RegisteredSchoolUnitFactory()
+        cls.study_class = StudyClassFactory(school_unit=cls.school_unit)
+        cls.student = UserProfileFactory(user_role=UserProfile.UserRoles.STUDENT, school_unit=cls.school_unit, student_in_class=cls.study_class)
+        cls.catalog = StudentCatalogPerSubjectFactory(student=cls.student, study_class=cls.study_class)
+
+    def setUp(self):
+        self.yesterday = (timezone.now() - timezone.timedelta(days=1)).replace(tzinfo=utc)
+
+    def test_student_activity_feed_written_with_the_grades_and_absences(self):
+        with patch('django.utils.timezone.now', return_value=self.yesterday):
+            grade = SubjectGradeFactory(student=self.student, catalog_per_subject=self.catalog, taken_at=self.yesterday.date(), grade=7)
+            absence = SubjectAbsenceFactory(student=self.student, catalog_per_subject=self.catalog, taken_at=self.yesterday.date())
+            grades = SubjectGrade.objects.bulk_create([
+                SubjectGrade(student=self.student, catalog_per_subject=self.catalog, subject_name=self.catalog.subject_name, academic_year=2020,
+                             semester=1, taken_at=self.yesterday.date(), grade=9, grade_type=SubjectGrade.GradeTypes.THESIS)
+            ])
+            create_student_activities(grades=grades)
+
+        self.assertEqual(StudentActivity.objects.filter(student=self.student).count(), 3)
+        with self.assertNumQueries(1):
+            activities = get_student_activities(self.student)
+        self.assertEqual([activity['event'] for activity in activities], ['Unauthorized absence', 'Grade 7', 'Thesis grade 9'])
+
+        grade.grade = 8
+        grade.save()
+        absence.delete()
+        self.assertCountEqual([activity['event'] for activity in get_student_activities(self.student)], ['Grade 8', 'Thesis grade 9'])
+
+    def test_student_activity_feed_behavior_grades(self):
+        grades = []
+        for _ in range(3):
+            student = UserProfileFactory(user_role=UserProfile.UserRoles.STUDENT, school_unit=self.school_unit, student_in_class=self.study_class)
+            catalog = StudentCatalogPerSubjectFactory(student=student, study_class=self.study_class, is_coordination_subject=True)
+            grades.append(SubjectGrade(student=student, catalog_per_subject=catalog, subject_name=catalog.subject_name, academic_year=2020,
+                                       semester=1, taken_at=self.yesterday.date(), grade=10))
+        grades = SubjectGrade.objects.bulk_create(grades)
+        grades = list(SubjectGrade.objects.filter(id__in=[grade.id for grade in grades]).select_related('catalog_per_subject'))
+
+        # The behavior grade limits are resolved with a single query, whatever the number of students
+        with self.assertNumQueries(3):
+            create_student_activities(grades=grades)
+
+        expected_limit = get_behavior_grade_limit(self.school_unit.academic_profile)
+        self.assertEqual(list(StudentActivity.objects.filter(subject_grade__in=grades).values_list('grade_limit', flat=True).distinct()), [expected_limit])
+
+    def test_student_activity_feed_examination_averages(self):
+        with patch('django.utils.timezone.now', return_value=self.yesterday):
+            ExaminationGradeFactory(student=self.student, catalog_per_subject=self.catalog, taken_at=self.yesterday.date())
+            exam_grade = ExaminationGradeFactory(student=self.student, catalog_per_subject=self.catalog, taken_at=self.yesterday.date(),
+                                                 examination_type=ExaminationGrade.ExaminationTypes.ORAL)
+
+        # The average is shown once it's computed
+        self.assertEqual(get_student_activities(self.student), [])
+        self.catalog.avg_after_2nd_examination = 7.5
+        self.catalog.save()
+        activities = get_student_activities(self.student)
+        self.assertEqual(len(activities), 1)
+        self.assertEqual(activities[0]['event'], 'Second examination average 7.5')
+
+        exam_grade.delete()
+        self.assertEqual(get_student_activities(self.student), [])
+
+    def test_delete_old_student_activities_task(self):
+        with patch('django.utils.timezone.now', return_value=timezone.now() - timezone.timedelta(days=20)):
+            SubjectGradeFactory(student=self.student, catalog_per_subject=self.catalog)
+        with patch('django.utils.timezone.now', return_value=self.yesterday):
+            recent_grade = SubjectGradeFactory(student=self.student, catalog_per_subject=self.catalog)
+
+        delete_old_student_activities_task()
+        self.assertCountEqual(StudentActivity.objects.values_list('subject_grade_id', flat=True), [recent_grade.id])
@@ -6,12 +6,14 @@ from rest_framework import generics
 from edualert.academic_calendars.utils import get_current_academic_calendar
 from edualert.academic_programs.models import AcademicProgram
 from edualert.common.permissions import IsPrincipal
+from edualert.common.reporting_database import ReportingDatabaseMixin
 from edualert.statistics.pagination import StatisticsPagination
+from edualert.statistics.response_cache import CachedStatisticsMixin
 from edualert.statistics.serializers import AcademicProgramsAverageSerializer, AcademicProgramsAbsencesSerializer, \
     AcademicProgramsRiskSerializer
 
 
-class AcademicProgramsAverages(generics.ListAPIView):
+class AcademicProgramsAverages(ReportingDatabaseMixin, CachedStatisticsMixin, generics.ListAPIView):
     permission_classes = (IsPrincipal,)
     pagination_class = StatisticsPagination
     serializer_class = AcademicProgramsAverageSerializer
@@ -32,7 +34,7 @@ class AcademicProgramsAverages(generics.ListAPIView):
         )
 
 
-class AcademicProgramsAbsences(generics.ListAPIView):
+class AcademicProgramsAbsences(ReportingDatabaseMixin, CachedStatisticsMixin, generics.ListAPIView):
     permission_classes = (IsPrincipal,)
     pagination_class = StatisticsPagination
     serializer_class = AcademicProgramsAbsencesSerializer
@@ -53,7 +55,7 @@ class AcademicProgramsAbsences(generics.ListAPIView):
         )
 
 
-class AcademicProgramsAtRisk(generics.ListAPIView):
+class AcademicProgramsAtRisk(ReportingDatabaseMixin, CachedStatisticsMixin, generics.ListAPIView):
     permission_classes = (IsPrincipal,)
     pagination_class = StatisticsPagination
     serializer_class = AcademicProgramsRiskSerializer
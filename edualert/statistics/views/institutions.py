@@ -11,14 +11,17 @@ from rest_framework.views import APIView
 
 from edualert.academic_calendars.utils import get_current_academic_calendar
 from edualert.common.permissions import IsAdministrator
+from edualert.common.reporting_database import ReportingDatabaseMixin
 from edualert.schools.models import RegisteredSchoolUnit
 from edualert.statistics.models import SchoolUnitStats, SchoolUnitEnrollmentStats
 from edualert.statistics.pagination import StatisticsPagination
+from edualert.statistics.response_cache import CachedStatisticsMixin, COUNTRY_SCOPE
 from edualert.statistics.serializers import SchoolUnitStatsAverageSerializer, SchoolUnitStatsAbsencesSerializer, \
     RegisteredSchoolUnitLastChangeInCatalogSerializer, RegisteredSchoolUnitRiskSerializer
 
 
-class SchoolUnitsAverages(generics.ListAPIView):
+class SchoolUnitsAverages(ReportingDatabaseMixin, CachedStatisticsMixin, generics.ListAPIView):
+    statistics_cache_scope = COUNTRY_SCOPE
     permission_classes = (IsAdministrator,)
     pagination_class = StatisticsPagination
     serializer_class = SchoolUnitStatsAverageSerializer
@@ -38,7 +41,8 @@ class SchoolUnitsAverages(generics.ListAPIView):
         )
 
 
-class SchoolUnitsAbsences(generics.ListAPIView):
+class SchoolUnitsAbsences(ReportingDatabaseMixin, CachedStatisticsMixin, generics.ListAPIView):
+    statistics_cache_scope = COUNTRY_SCOPE
     permission_classes = (IsAdministrator,)
     pagination_class = StatisticsPagination
     serializer_class = SchoolUnitStatsAbsencesSerializer
@@ -58,7 +62,7 @@ class SchoolUnitsAbsences(generics.ListAPIView):
         )
 
 
-class InactiveSchoolUnits(generics.ListAPIView):
+class InactiveSchoolUnits(ReportingDatabaseMixin, generics.ListAPIView):
     permission_classes = (IsAdministrator,)
     pagination_class = StatisticsPagination
     serializer_class = RegisteredSchoolUnitLastChangeInCatalogSerializer
@@ -72,7 +76,8 @@ class InactiveSchoolUnits(generics.ListAPIView):
         )
 
 
-class SchoolUnitsAtRisk(generics.ListAPIView):
+class SchoolUnitsAtRisk(ReportingDatabaseMixin, CachedStatisticsMixin, generics.ListAPIView):
+    statistics_cache_scope = COUNTRY_SCOPE
     permission_classes = (IsAdministrator,)
     pagination_class = StatisticsPagination
     serializer_class = RegisteredSchoolUnitRiskSerializer
@@ -86,7 +91,8 @@ class SchoolUnitsAtRisk(generics.ListAPIView):
         )
 
 
-class InstitutionsEnrollmentStats(APIView):
+class InstitutionsEnrollmentStats(ReportingDatabaseMixin, CachedStatisticsMixin, APIView):
+    statistics_cache_scope = COUNTRY_SCOPE
     permission_classes = (IsAdministrator,)
 
     def get(self, request, *args, **kwargs):
@@ -8,12 +8,13 @@ from rest_framework.generics import get_object_or_404
 
 from edualert.academic_calendars.utils import get_current_academic_calendar
 from edualert.common.permissions import IsPrincipal, IsTeacher
+from edualert.common.reporting_database import ReportingDatabaseMixin
 from edualert.profiles.models import UserProfile
 from edualert.statistics.pagination import StatisticsPagination
 from edualert.statistics.serializers import UserProfileLastChangeInCatalogSerializer, ParentLastOnlineSerializer
 
 
-class InactiveTeachers(generics.ListAPIView):
+class InactiveTeachers(ReportingDatabaseMixin, generics.ListAPIView):
     permission_classes = (IsPrincipal,)
     pagination_class = StatisticsPagination
     serializer_class = UserProfileLastChangeInCatalogSerializer
@@ -29,7 +30,7 @@ class InactiveTeachers(generics.ListAPIView):
         )
 
 
-class InactiveParents(generics.ListAPIView):
+class InactiveParents(ReportingDatabaseMixin, generics.ListAPIView):
     permission_classes = (IsTeacher,)
     pagination_class = StatisticsPagination
     serializer_class = ParentLastOnlineSerializer
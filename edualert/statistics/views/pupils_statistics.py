@@ -11,10 +11,11 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from edualert.academic_calendars.utils import get_current_academic_calendar, get_second_semester_end_events
+from edualert.academic_calendars.utils import get_current_academic_calendar, get_calendar_index
 from edualert.catalogs.models import StudentCatalogPerYear
 from edualert.catalogs.utils import get_behavior_grade_limit
 from edualert.common.permissions import IsAdministratorOrSchoolEmployee, IsTeacher, IsPrincipal
+from edualert.common.reporting_database import ReportingDatabaseMixin
 from edualert.common.search_and_filters import CommonOrderingFilter
 from edualert.profiles.models import UserProfile
 from edualert.statistics.models import StudentAtRiskCounts
@@ -24,7 +25,7 @@ from edualert.statistics.serializers import PupilStatisticsForORSSerializer, Pup
     SchoolStudentAtRiskSerializer, StudentAtRiskSerializer
 
 
-class PupilsStatistics(generics.ListAPIView):
+class PupilsStatistics(ReportingDatabaseMixin, generics.ListAPIView):
     permission_classes = (IsAdministratorOrSchoolEmployee,)
     pagination_class = StatisticsPagination
     ordering_fields = [
@@ -59,11 +60,11 @@ class PupilsStatistics(generics.ListAPIView):
         search_filter = Q()
         if search:
             if profile.user_role == UserProfile.UserRoles.ADMINISTRATOR:
-                search_filter = Q(student__labels__text__unaccent__icontains=search) | \
-                                Q(study_class__school_unit__name__unaccent__icontains=search)
+                search_filter = Q(student__labels__text__immutable_unaccent__icontains=search) | \
+                                Q(study_class__school_unit__name__immutable_unaccent__icontains=search)
             else:
-                search_filter = Q(student__labels__text__unaccent__icontains=search) | \
-                                Q(student__full_name__unaccent__icontains=search)
+                search_filter = Q(student__labels__text__immutable_unaccent__icontains=search) | \
+                                Q(student__full_name__immutable_unaccent__icontains=search)
 
         return search_filter
 
@@ -110,7 +111,7 @@ class PupilsStatistics(generics.ListAPIView):
         return queryset
 
 
-class OwnStudentsStatisticsBaseClass(generics.ListAPIView):
+class OwnStudentsStatisticsBaseClass(ReportingDatabaseMixin, generics.ListAPIView):
     permission_classes = (IsTeacher,)
     pagination_class = StatisticsPagination
 
@@ -165,7 +166,7 @@ class OwnStudentsBehaviorGrades(OwnStudentsStatisticsBaseClass):
         return 'behavior_grade_sem1' if timezone.now().date() < current_calendar.second_semester.ends_at else 'behavior_grade_annual'
 
 
-class SchoolStudentsAtRisk(generics.ListAPIView):
+class SchoolStudentsAtRisk(ReportingDatabaseMixin, generics.ListAPIView):
     permission_classes = (IsPrincipal,)
     pagination_class = StatisticsPagination
     serializer_class = SchoolStudentAtRiskSerializer
@@ -195,12 +196,11 @@ class SchoolStudentsAtRisk(generics.ListAPIView):
             .order_by(order_by1, order_by2, Lower('student__full_name'))
 
 
-class SchoolStudentsAtRiskExport(APIView):
+class SchoolStudentsAtRiskExport(ReportingDatabaseMixin, APIView):
     permission_classes = (IsPrincipal,)
 
     def get(self, request, *args, **kwargs):
         from edualert.catalogs.utils import has_technological_category
-        from edualert.catalogs.utils import get_current_semester
         from edualert.catalogs.models import StudentCatalogPerSubject
         from django.http import HttpResponse
 
@@ -214,7 +214,7 @@ class SchoolStudentsAtRiskExport(APIView):
         if not current_calendar:
             return response
 
-        second_semester_end_events = get_second_semester_end_events(current_calendar)
+        calendar_index = get_calendar_index(current_calendar)
         is_technological_school = has_technological_category(profile.school_unit)
 
         current_row = 1
@@ -243,8 +243,7 @@ class SchoolStudentsAtRiskExport(APIView):
             student = student_catalog.student  # type: UserProfile
             study_class = student_catalog.study_class
 
-            current_semester = get_current_semester(now.date(), current_calendar, second_semester_end_events,
-                                                    study_class.class_grade_arabic, is_technological_school)
+            current_semester = calendar_index.get_semester(now.date(), study_class.class_grade_arabic, is_technological_school)
 
             math = StudentCatalogPerSubject.objects.filter(
                 student_id=student.id, academic_year=current_calendar.academic_year, subject_name='Matematică').first()
@@ -307,7 +306,7 @@ class SchoolStudentsAtRiskExport(APIView):
         return response
 
 
-class OwnStudentsAtRisk(generics.ListAPIView):
+class OwnStudentsAtRisk(ReportingDatabaseMixin, generics.ListAPIView):
     permission_classes = (IsTeacher,)
     pagination_class = StatisticsPagination
     serializer_class = StudentAtRiskSerializer
@@ -338,7 +337,7 @@ class OwnStudentsAtRisk(generics.ListAPIView):
             .order_by(order_by1, order_by2, Lower('student__full_name'))
 
 
-class StudentsRiskEvolution(APIView):
+class StudentsRiskEvolution(ReportingDatabaseMixin, APIView):
     permission_classes = (IsAdministratorOrSchoolEmployee,)
 
     def get(self, request, *args, **kwargs):
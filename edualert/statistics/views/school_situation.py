@@ -9,18 +9,24 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
 from edualert.academic_calendars.utils import get_current_academic_calendar
+from edualert.catalogs.conditional_responses import ConditionalCatalogResponseMixin, get_student_catalog_version_keys
 from edualert.catalogs.models import StudentCatalogPerSubject, StudentCatalogPerYear
 from edualert.catalogs.utils import has_technological_category, get_working_weeks_count
+from edualert.common.asgi import POLLING_THREAD_POOL
 from edualert.common.constants import WEEKDAYS_MAP
 from edualert.common.permissions import IsParent, IsStudent
 from edualert.profiles.models import UserProfile
 from edualert.statistics.serializers import SchoolSituationSerializer, StudentStatisticsSerializer, StudentSubjectsAtRiskSerializer
 
 
-class OwnChildSchoolSituation(generics.RetrieveAPIView):
+class OwnChildSchoolSituation(ConditionalCatalogResponseMixin, generics.RetrieveAPIView):
     permission_classes = (IsParent,)
     serializer_class = SchoolSituationSerializer
 
+    def get_catalog_version_keys(self):
+        return get_student_catalog_version_keys(self.get_object())
+
+    @lru_cache(maxsize=None)
     def get_object(self):
         parent = self.request.user.user_profile
         return get_object_or_404(
@@ -32,10 +38,14 @@ class OwnChildSchoolSituation(generics.RetrieveAPIView):
         )
 
 
-class OwnSchoolSituation(generics.RetrieveAPIView):
+class OwnSchoolSituation(ConditionalCatalogResponseMixin, generics.RetrieveAPIView):
     permission_classes = (IsStudent,)
+    asgi_thread_pool = POLLING_THREAD_POOL
     serializer_class = SchoolSituationSerializer
 
+    def get_catalog_version_keys(self):
+        return get_student_catalog_version_keys(self.request.user.user_profile)
+
     def get_object(self):
         return self.request.user.user_profile
 
@@ -61,6 +71,7 @@ class OwnChildStatistics(generics.RetrieveAPIView):
 
 class OwnStatistics(generics.RetrieveAPIView):
     permission_classes = (IsStudent,)
+    asgi_thread_pool = POLLING_THREAD_POOL
     serializer_class = StudentStatisticsSerializer
 
     def get_object(self):
@@ -4,14 +4,16 @@ from rest_framework import generics
 
 from edualert.academic_calendars.utils import get_current_academic_calendar
 from edualert.common.permissions import IsPrincipal, IsTeacherOrPrincipal
+from edualert.common.reporting_database import ReportingDatabaseMixin
 from edualert.profiles.models import UserProfile
 from edualert.statistics.pagination import StatisticsPagination
+from edualert.statistics.response_cache import CachedStatisticsMixin
 from edualert.statistics.serializers import StudyClassesAveragesSerializer, StudyClassesAbsencesSerializer, \
     StudyClassesRiskSerializer
 from edualert.study_classes.models import StudyClass
 
 
-class StudyClassesAverages(generics.ListAPIView):
+class StudyClassesAverages(ReportingDatabaseMixin, CachedStatisticsMixin, generics.ListAPIView):
     permission_classes = (IsPrincipal,)
     pagination_class = StatisticsPagination
     serializer_class = StudyClassesAveragesSerializer
@@ -33,7 +35,7 @@ class StudyClassesAverages(generics.ListAPIView):
         )
 
 
-class StudyClassesAbsences(generics.ListAPIView):
+class StudyClassesAbsences(ReportingDatabaseMixin, CachedStatisticsMixin, generics.ListAPIView):
     permission_classes = (IsPrincipal,)
     pagination_class = StatisticsPagination
     serializer_class = StudyClassesAbsencesSerializer
@@ -55,11 +57,16 @@ class StudyClassesAbsences(generics.ListAPIView):
         )
 
 
-class StudyClassesAtRisk(generics.ListAPIView):
+class StudyClassesAtRisk(ReportingDatabaseMixin, CachedStatisticsMixin, generics.ListAPIView):
     permission_classes = (IsTeacherOrPrincipal,)
     pagination_class = StatisticsPagination
     serializer_class = StudyClassesRiskSerializer
 
+    def get_statistics_cache_key_extra(self):
+        # Teachers only see their own study classes
+        profile = self.request.user.user_profile
+        return profile.id if profile.user_role == UserProfile.UserRoles.TEACHER else None
+
     def get_queryset(self):
         current_calendar = get_current_academic_calendar()
         if not current_calendar:
@@ -8,11 +8,13 @@ from methodtools import lru_cache
 from rest_framework import serializers
 
 from edualert.academic_programs.models import AcademicProgram
+from edualert.catalogs.conditional_responses import invalidate_catalogs
 from edualert.catalogs.models import StudentCatalogPerYear, StudentCatalogPerSubject
 from edualert.catalogs.tasks import create_behavior_grades_task
 from edualert.common.fields import PrimaryKeyRelatedField
 from edualert.profiles.models import UserProfile
 from edualert.schools.constants import BEHAVIOR_GRADE_EXCEPTIONS_PROFILES
+from edualert.statistics.response_cache import invalidate_school_unit_study_classes
 from edualert.statistics.tasks import create_students_at_risk_counts_for_study_class_task
 from edualert.study_classes.models import StudyClass, TeacherClassThrough
 from edualert.study_classes.tasks import import_students_data
@@ -286,6 +288,7 @@ class StudyClassCreateUpdateSerializer(StudyClassBaseSerializer):
                                     is_coordination_subject=subject.is_coordination)
             )
         TeacherClassThrough.objects.bulk_create(teacher_class_through_instances)
+        invalidate_school_unit_study_classes(instance.school_unit_id)
 
     @staticmethod
     def add_students_to_class(instance, students, academic_year, teachers_class_through, optional_subjects):
@@ -312,6 +315,7 @@ class StudyClassCreateUpdateSerializer(StudyClassBaseSerializer):
         UserProfile.objects.bulk_update(students, ['student_in_class'])
         StudentCatalogPerYear.objects.bulk_create(catalogs_per_year)
         StudentCatalogPerSubject.objects.bulk_create(catalogs_per_subject)
+        invalidate_catalogs(study_class_ids=[instance.id], student_ids=student_ids)
 
         create_behavior_grades_task.delay(student_ids)
 
@@ -427,6 +431,8 @@ class StudyClassPartiallyUpdateSerializer(StudyClassBaseSerializer):
             StudentCatalogPerSubject.objects.filter(student__in=deleted_students, study_class=instance).delete()
             deleted_students.update(student_in_class=None)
 
+        invalidate_catalogs(study_class_ids=[instance.id])
+        invalidate_school_unit_study_classes(instance.school_unit_id)
         return instance
 
     @staticmethod
@@ -457,6 +463,7 @@ class StudyClassPartiallyUpdateSerializer(StudyClassBaseSerializer):
         UserProfile.objects.bulk_update(students, ['student_in_class'])
         StudentCatalogPerYear.objects.bulk_create(catalogs_per_year)
         StudentCatalogPerSubject.objects.bulk_create(catalogs_per_subject)
+        invalidate_catalogs(study_class_ids=[instance.id], student_ids=student_ids)
 
         create_behavior_grades_task.delay(student_ids)
         import_students_data.delay(student_ids, instance.class_grade_arabic)
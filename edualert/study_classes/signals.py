@@ -1,4 +1,7 @@
 def study_class_post_save(sender, instance, created, **kwargs):
+    from edualert.catalogs.conditional_responses import invalidate_catalogs
+    invalidate_catalogs(study_class_ids=[instance.id])
+
     if created:
         academic_program = instance.academic_program
         if academic_program is not None:
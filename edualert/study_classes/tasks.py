@@ -8,6 +8,9 @@ from edualert.study_classes.utils import get_school_cycle_for_class_grade
 
 @shared_task
 def import_students_data(student_ids, class_grade_arabic):
+    from edualert.catalogs.conditional_responses import invalidate_catalogs
+    from edualert.statistics.activity_feed import create_student_activities, update_examination_activities
+
     current_cycle_grades = [
         grade for grade in get_school_cycle_for_class_grade(class_grade_arabic)
         if grade < class_grade_arabic
@@ -120,6 +123,9 @@ def import_students_data(student_ids, class_grade_arabic):
     SubjectGrade.objects.bulk_create(created_grades)
     SubjectAbsence.objects.bulk_create(created_absences)
     ExaminationGrade.objects.bulk_create(created_examination_grades)
+    create_student_activities(absences=created_absences, grades=created_grades)
+    update_examination_activities(list(set(exam_grade.catalog_per_subject_id for exam_grade in created_examination_grades)))
+    invalidate_catalogs(student_ids=student_ids)
 
 
 def get_catalogs_per_year(student, class_grades):
@@ -13,6 +13,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from edualert.academic_calendars.utils import get_current_academic_calendar
+from edualert.catalogs.conditional_responses import invalidate_catalogs
 from edualert.catalogs.models import StudentCatalogPerYear, StudentCatalogPerSubject
 from edualert.catalogs.utils import update_last_change_in_catalog
 from edualert.common.constants import POST, PUT, PATCH
@@ -523,6 +524,7 @@ class MoveStudent(generics.GenericAPIView):
 
             # Move student's data (from previous & current year) to the new class
             self.move_student_data(student, current_study_class, destination_study_class)
+            invalidate_catalogs(study_class_ids=[current_study_class.id, destination_study_class.id], student_ids=[student.id])
 
             update_last_change_in_catalog(self.request.user.user_profile)
 
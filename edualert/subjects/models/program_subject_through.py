@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+
+from edualert.subjects.signals import program_subject_through_changed
 
 
 class ProgramSubjectThrough(models.Model):
@@ -29,3 +32,7 @@ class ProgramSubjectThrough(models.Model):
             return f"ProgramSubjectThrough {self.id} {self.generic_academic_program.name} - {self.subject_name}"
 
         return f"ProgramSubjectThrough {self.id} {self.academic_program.name} - {self.subject_name}"
+
+
+post_save.connect(program_subject_through_changed, sender=ProgramSubjectThrough)
+post_delete.connect(program_subject_through_changed, sender=ProgramSubjectThrough)
@@ -0,0 +1,3 @@
+def program_subject_through_changed(sender, instance, **kwargs):
+    from edualert.subjects.utils import invalidate_curriculum_cache
+    invalidate_curriculum_cache()
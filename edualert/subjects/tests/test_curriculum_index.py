@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import override_settings
+
+from edualert.academic_programs.factories import AcademicProgramFactory
+from edualert.catalogs.utils import get_weekly_hours_counts
+from edualert.common.api_tests import CommonAPITestCase
+from edualert.study_classes.factories import StudyClassFactory
+from edualert.subjects.factories import SubjectFactory, ProgramSubjectThroughFactory
+from edualert.subjects.models import ProgramSubjectThrough
+from edualert.subjects.utils import get_program_subjects_through, get_program_subject_through, invalidate_curriculum_cache
+
+
+@override_settings(CURRICULUM_CACHE_TIMEOUT=60)
+class CurriculumIndexTestCase(CommonAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.academic_program = AcademicProgramFactory()
+        cls.study_class = StudyClassFactory(academic_program=cls.academic_program, class_grade='IX', class_grade_arabic=9)
+        cls.subject1 = SubjectFactory()
+        cls.subject2 = SubjectFactory()
+        cls.subject3 = SubjectFactory()
+
+        cls.generic_subject_through = ProgramSubjectThroughFactory(generic_academic_program=cls.academic_program.generic_academic_program,
+                                                                   subject=cls.subject1, weekly_hours_count=2)
+        cls.program_subject_through = ProgramSubjectThroughFactory(academic_program=cls.academic_program,
+                                                                   subject=cls.subject2, weekly_hours_count=3)
+        # Other class grade
+        ProgramSubjectThroughFactory(academic_program=cls.academic_program, subject=cls.subject3,
+                                     class_grade='X', class_grade_arabic=10)
+
+    def setUp(self):
+        cache.clear()
+        invalidate_curriculum_cache()
+
+    def test_curriculum_index_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            program_subjects = get_program_subjects_through(self.study_class, [self.subject1.id, self.subject2.id, self.subject3.id])
+        self.assertEqual(program_subjects, {
+            self.subject1.id: self.generic_subject_through,
+            self.subject2.id: self.program_subject_through,
+            self.subject3.id: None
+        })
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_program_subject_through(self.study_class, self.subject2.id), self.program_subject_through)
+            self.assertEqual(get_weekly_hours_counts(self.study_class, [self.subject1.id, self.subject2.id, self.subject3.id]), {
+                self.subject1.id: 2,
+                self.subject2.id: 3,
+                self.subject3.id: 1
+            })
+
+    def test_curriculum_index_invalidation(self):
+        self.assertEqual(get_weekly_hours_counts(self.study_class, [self.subject2.id]), {self.subject2.id: 3})
+
+        self.program_subject_through.weekly_hours_count = 4
+        self.program_subject_through.save()
+        self.assertEqual(get_weekly_hours_counts(self.study_class, [self.subject2.id]), {self.subject2.id: 4})
+
+        ProgramSubjectThrough.objects.filter(id=self.program_subject_through.id).delete()
+        self.assertIsNone(get_program_subject_through(self.study_class, self.subject2.id))
@@ -0,0 +1,84 @@
+from django.db.models import Q
+
+from edualert.common.utils import VersionedLocalCache
+from edualert.subjects.models import ProgramSubjectThrough
+
+CURRICULUM_VERSION_KEY = 'curriculum_version'
+
+_curriculum_cache = VersionedLocalCache(CURRICULUM_VERSION_KEY, 'CURRICULUM_CACHE_TIMEOUT')
+
+
+class CurriculumIndex:
+    """
+    The program subjects, grouped by academic program (or generic academic program), subject and class grade.
+    A program's subjects are loaded together, the first time one of them is needed.
+    """
+
+    def __init__(self):
+        self.programs = {}
+
+    def get_program_subjects_through(self, academic_program_id, generic_academic_program_id, subject_ids, class_grade):
+        program_key = ('academic_program', academic_program_id)
+        generic_program_key = ('generic_academic_program', generic_academic_program_id)
+        if program_key not in self.programs or generic_program_key not in self.programs:
+            self._load(academic_program_id, generic_academic_program_id)
+
+        program_subjects = self.programs[program_key]
+        generic_program_subjects = self.programs[generic_program_key]
+
+        result = {}
+        for subject_id in subject_ids:
+            candidates = [subject_through for subject_through in
+                          [program_subjects.get((subject_id, class_grade)), generic_program_subjects.get((subject_id, class_grade))]
+                          if subject_through]
+            # Same as the lowest id returned by the equivalent query
+            result[subject_id] = min(candidates, key=lambda subject_through: subject_through.id) if candidates else None
+        return result
+
+    def _load(self, academic_program_id, generic_academic_program_id):
+        program_subjects = {}
+        generic_program_subjects = {}
+
+        filters = Q(pk__in=[])
+        if academic_program_id is not None:
+            filters |= Q(academic_program_id=academic_program_id)
+        if generic_academic_program_id is not None:
+            filters |= Q(generic_academic_program_id=generic_academic_program_id)
+
+        # Descending, so the lowest id is kept when a program has the same subject more than once
+        for subject_through in ProgramSubjectThrough.objects.filter(filters).order_by('-id'):
+            key = (subject_through.subject_id, subject_through.class_grade)
+            if academic_program_id is not None and subject_through.academic_program_id == academic_program_id:
+                program_subjects[key] = subject_through
+            if generic_academic_program_id is not None and subject_through.generic_academic_program_id == generic_academic_program_id:
+                generic_program_subjects[key] = subject_through
+
+        self.programs[('academic_program', academic_program_id)] = program_subjects
+        self.programs[('generic_academic_program', generic_academic_program_id)] = generic_program_subjects
+
+
+def get_curriculum_index():
+    return _curriculum_cache.get(CurriculumIndex)
+
+
+def invalidate_curriculum_cache():
+    """
+    To be called after the academic programs or their subjects were changed.
+    """
+    _curriculum_cache.invalidate()
+
+
+def get_program_subjects_through(study_class, subject_ids):
+    """
+    Returns the program subject of the study class for each of the given subjects (None if it doesn't exist).
+    """
+    academic_program = study_class.academic_program
+    return get_curriculum_index().get_program_subjects_through(
+        study_class.academic_program_id,
+        academic_program.generic_academic_program_id if academic_program else None,
+        subject_ids, study_class.class_grade
+    )
+
+
+def get_program_subject_through(study_class, subject_id):
+    return get_program_subjects_through(study_class, [subject_id])[subject_id]
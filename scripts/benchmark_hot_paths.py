@@ -0,0 +1,270 @@
+# this should be run using this command:
+# ./manage.py runscript benchmark_hot_paths --script-args <results_json> <baseline_json> <threshold_percent> <repeats>
+# Benchmarks the catalog, statistics & nightly job hot paths against the database (e.g. the one seeded by
+# generate_dataset), on its largest study class of the current academic year. Every benchmark runs <repeats> times,
+# with an empty cache (& the statistics responses cache disabled) and in a transaction which is rolled back, and
+# records the median duration, the number of queries and the peak memory (traced in an extra run, since tracing slows
+# the code down). The results are written to <results_json>; if <baseline_json> (the results of a previous run) is
+# given, the benchmarks whose duration (by at least 5 ms) or peak memory grew by more than <threshold_percent>, or whose
+# number of queries grew at all, are reported and the script exits with status 1. Pass '' as <baseline_json> to skip
+# the comparison. Since it clears the cache, it only runs with the local memory cache (e.g. the local settings).
+
+import csv
+import datetime
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from edualert.academic_calendars.utils import get_current_academic_calendar
+from edualert.catalogs.models import StudentCatalogPerSubject
+from edualert.catalogs.tasks import update_averages_for_students_task
+from edualert.catalogs.utils import compute_averages
+from edualert.catalogs.utils.importer import CatalogsImporter
+from edualert.catalogs.utils.risk_levels import calculate_students_risk_level
+from edualert.catalogs.utils.student_placements import calculate_student_placements
+from edualert.celery import app
+from edualert.statistics.tasks import send_monthly_school_unit_absence_report_task
+from edualert.study_classes.models import StudyClass, TeacherClassThrough
+
+# The debugging middlewares of the local settings would print (& time) every query
+BENCHMARK_MIDDLEWARE = [middleware for middleware in settings.MIDDLEWARE if middleware != 'edualert.common.middleware.SQLPrintingMiddleware']
+DUMMY_EMAIL_BACKEND = 'django.core.mail.backends.dummy.EmailBackend'
+# The runs start with an empty cache, which is only safe to clear when it's local to the process (in the cloud, the
+# cache's Redis also holds the Celery broker, the request log stream & the buffered last online times)
+LOCAL_MEMORY_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+# The durations of the fastest endpoints vary by a few milliseconds between the runs
+MIN_DURATION_GROWTH_MS = 5
+
+
+class Targets:
+    """
+    The largest study class of the current academic year, its subject with the most grades & the users who read them.
+    """
+
+    def __init__(self):
+        self.calendar = get_current_academic_calendar()
+        self.study_class = StudyClass.objects.filter(academic_year=self.calendar.academic_year) \
+            .annotate(students_count=Count('student_catalog_per_year')) \
+            .order_by('-students_count', 'id') \
+            .select_related('school_unit__school_principal') \
+            .first()
+
+        largest_subject = StudentCatalogPerSubject.objects.filter(study_class=self.study_class, is_coordination_subject=False) \
+            .values('subject_id').annotate(grades_count=Count('grade')).order_by('-grades_count', 'subject_id').first()
+        teacher_class_through = TeacherClassThrough.objects.filter(study_class=self.study_class, subject_id=largest_subject['subject_id']) \
+            .select_related('teacher__user', 'subject').first()
+        self.subject = teacher_class_through.subject
+        self.teacher = teacher_class_through.teacher
+
+        self.catalogs = StudentCatalogPerSubject.objects.filter(study_class=self.study_class, subject=self.subject) \
+            .select_related('study_class').order_by('id')
+        self.student = self.catalogs.select_related('student__user').first().student
+        self.parent = self.student.parents.select_related('user').first()
+        self.principal = self.study_class.school_unit.school_principal
+
+    def describe(self):
+        return {
+            'academic_year': self.calendar.academic_year,
+            'study_class': '{} {} (id {})'.format(self.study_class.class_grade, self.study_class.class_letter, self.study_class.id),
+            'students_count': self.study_class.students_count,
+            'subject': '{} (id {})'.format(self.subject.name, self.subject.id),
+        }
+
+
+def get(profile, url):
+    client = Client(SERVER_NAME='localhost')
+    client.force_login(profile.user)
+
+    def request():
+        response = client.get(url)
+        assert response.status_code == 200, '{} returned {}'.format(url, response.status_code)
+        return response
+
+    return request
+
+
+def get_import_csv(exported_csv):
+    # The export fills the empty cells with '-', which the import doesn't accept
+    rows = list(csv.DictReader(io.StringIO(exported_csv)))
+    file = io.StringIO()
+    writer = csv.DictWriter(file, rows[0].keys())
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({field: '' if value == '-' else value for field, value in row.items()})
+    return file.getvalue()
+
+
+def get_benchmarks(targets):
+    study_class = targets.study_class
+    second_semester_end = timezone.make_aware(datetime.datetime.combine(targets.calendar.second_semester.ends_at, datetime.time(12)))
+
+    def compute_first_semester_averages():
+        compute_averages(list(targets.catalogs), 1, is_async=False)
+
+    def update_averages_for_students():
+        student_ids = list(targets.catalogs.values_list('student_id', flat=True))
+        update_averages_for_students_task(student_ids, study_class.id, study_class.academic_year)
+
+    def calculate_end_of_year_placements():
+        # The placements are only calculated at the end of the semesters
+        with mock.patch('edualert.catalogs.utils.student_placements.timezone.now', return_value=second_semester_end):
+            assert calculate_student_placements()
+
+    def send_monthly_absence_reports():
+        with override_settings(EMAIL_BACKEND=DUMMY_EMAIL_BACKEND, ABSENCES_REPORT_DELIVERY_EMAILS=['benchmark@example.com']):
+            send_monthly_school_unit_absence_report_task()
+
+    export_url = reverse('catalogs:export-subject-catalogs', kwargs={'study_class_id': study_class.id, 'subject_id': targets.subject.id})
+    export = get(targets.teacher, export_url)
+    import_csv = get_import_csv(export().content.decode('utf-8'))
+
+    def import_catalogs():
+        importer = CatalogsImporter(io.StringIO(import_csv), study_class, targets.subject, targets.calendar)
+        # The dataset covers the whole academic year, so the file is imported as at its end
+        importer.today = targets.calendar.second_semester.ends_at
+        report = importer.import_catalogs_and_get_report()
+        assert not report['errors'], report['errors']
+
+    benchmarks = [
+        ('compute_averages', compute_first_semester_averages),
+        ('update_averages_for_students_task', update_averages_for_students),
+        ('calculate_students_risk_level', calculate_students_risk_level),
+        ('calculate_student_placements', calculate_end_of_year_placements),
+        ('send_monthly_school_unit_absence_report_task', send_monthly_absence_reports),
+        ('CatalogsImporter', import_catalogs),
+        ('ExportSubjectCatalogs', export),
+        ('OwnStudyClassCatalogBySubject', get(targets.teacher, reverse('catalogs:own-study-class-catalog-by-subject', kwargs={
+            'study_class_id': study_class.id, 'subject_id': targets.subject.id
+        }))),
+        ('OwnStudyClassPupilList', get(targets.teacher, reverse('catalogs:own-study-class-pupil-list', kwargs={'id': study_class.id}))),
+        ('OwnSchoolSituation', get(targets.student, reverse('statistics:own-school-situation'))),
+        ('OwnStatistics', get(targets.student, reverse('statistics:own-statistics'))),
+        ('OwnActivityHistory', get(targets.student, reverse('statistics:own-activity-history'))),
+        ('PupilsStatistics', get(targets.principal, reverse('statistics:pupils-statistics'))),
+        ('StudyClassesAverages', get(targets.principal, reverse('statistics:study-classes-averages'))),
+    ]
+    if targets.parent:
+        benchmarks.append(('OwnChildSchoolSituation', get(targets.parent, reverse('statistics:own-child-school-situation', kwargs={
+            'id': targets.student.id
+        }))))
+        benchmarks.append(('MyReceivedMessageList', get(targets.parent, reverse('notifications:my-received-message-list'))))
+    return benchmarks
+
+
+def run_rolled_back(function):
+    with transaction.atomic():
+        try:
+            function()
+        finally:
+            transaction.set_rollback(True)
+
+
+class QueryCounter:
+    # Unlike the queries log of the connection, which only keeps the last 9000 queries
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(function, repeats):
+    durations = []
+    queries_count = None
+    for _ in range(repeats):
+        # Every run starts cold, since the rollback doesn't undo what the previous runs cached
+        cache.clear()
+        query_counter = QueryCounter()
+        with connection.execute_wrapper(query_counter):
+            started_at = time.perf_counter()
+            run_rolled_back(function)
+            durations.append((time.perf_counter() - started_at) * 1000)
+        queries_count = query_counter.count
+
+    cache.clear()
+    tracemalloc.start()
+    try:
+        run_rolled_back(function)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_ms': round(statistics.median(durations), 1),
+        'min_ms': round(min(durations), 1),
+        'queries': queries_count,
+        'peak_memory_kb': round(peak_memory / 1024),
+    }
+
+
+def get_regressions(results, baseline, threshold):
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        baseline_result = baseline['benchmarks'].get(name)
+        if not baseline_result:
+            continue
+
+        for metric, allowed_growth in [('median_ms', threshold), ('peak_memory_kb', threshold), ('queries', 0)]:
+            if metric == 'median_ms' and result[metric] - baseline_result[metric] < MIN_DURATION_GROWTH_MS:
+                continue
+            if result[metric] > baseline_result[metric] * (1 + allowed_growth / 100):
+                regressions.append('{}: {} {} -> {}'.format(name, metric, baseline_result[metric], result[metric]))
+    return regressions
+
+
+def run(results_path='benchmark_hot_paths.json', baseline_path='', threshold='20', repeats='5'):
+    if settings.CACHES['default']['BACKEND'] != LOCAL_MEMORY_CACHE_BACKEND:
+        print('The benchmark clears the whole default cache, so it only runs with the {} backend.'.format(LOCAL_MEMORY_CACHE_BACKEND))
+        sys.exit(1)
+
+    repeats = int(repeats)
+    # Run the tasks which the benchmarked code queues in the same process, so they are measured as well
+    app.conf.task_always_eager = True
+
+    # The cached statistics responses would only measure the cache hits
+    with override_settings(DEBUG=False, MIDDLEWARE=BENCHMARK_MIDDLEWARE, STATISTICS_CACHE_ENABLED=False):
+        targets = Targets()
+        results = {
+            'created': timezone.now().isoformat(),
+            'repeats': repeats,
+            'targets': targets.describe(),
+            'benchmarks': {},
+        }
+        print('Benchmarking {study_class} ({students_count} students), {subject}:'.format(**results['targets']))
+
+        for name, function in get_benchmarks(targets):
+            result = measure(function, repeats)
+            results['benchmarks'][name] = result
+            print('  {:<46} {:>10.1f} ms {:>6} queries {:>9} KB'.format(name, result['median_ms'], result['queries'], result['peak_memory_kb']))
+
+    with open(results_path, 'w') as file:
+        json.dump(results, file, indent=2)
+    print('Results written to {}.'.format(results_path))
+
+    if not baseline_path:
+        return
+
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    regressions = get_regressions(results, baseline, float(threshold))
+    if not regressions:
+        print('No regressions over {}% compared to {}.'.format(threshold, baseline_path))
+        return
+
+    print('{} regressions over {}% compared to {}:'.format(len(regressions), threshold, baseline_path))
+    for regression in regressions:
+        print('  ' + regression)
+    sys.exit(1)
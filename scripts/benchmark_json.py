@@ -0,0 +1,67 @@
+# this should be run using this command:
+# ./manage.py runscript benchmark_json --script-args <study_classes_count> <repeats>
+# Renders & parses the responses of the largest catalogs in the database, serialized by the API serializers,
+# with the standard JSON renderer & parser and with the orjson based ones.
+
+import io
+import time
+
+from django.db.models import Count
+from rest_framework.parsers import JSONParser
+
+from edualert.catalogs.models import StudentCatalogPerSubject, StudentCatalogPerYear
+from edualert.catalogs.serializers import StudentCatalogPerSubjectSerializer, StudentCatalogPerYearSerializer
+from edualert.common import renderers
+from edualert.common.renderers import UTF8JSONRenderer, FastJSONRenderer, FastJSONParser
+
+
+def get_payloads(study_classes_count):
+    payloads = []
+    largest = StudentCatalogPerSubject.objects.values('study_class_id', 'subject_id') \
+        .annotate(grades_count=Count('grade')).order_by('-grades_count')[:study_classes_count]
+    for item in largest:
+        catalogs = StudentCatalogPerSubject.objects.filter(study_class_id=item['study_class_id'], subject_id=item['subject_id'],
+                                                           is_enrolled=True) \
+            .select_related('student', 'study_class__school_unit') \
+            .prefetch_related('grades', 'absences', 'examination_grades', 'student__labels')
+        payloads.append(('catalog by subject', StudentCatalogPerSubjectSerializer(catalogs, many=True).data))
+
+        catalogs = StudentCatalogPerYear.objects.filter(study_class_id=item['study_class_id']) \
+            .select_related('student').prefetch_related('student__labels')
+        payloads.append(('pupil list', StudentCatalogPerYearSerializer(catalogs, many=True).data))
+    return payloads
+
+
+def time_calls(function, payloads, repeats):
+    started_at = time.perf_counter()
+    for _ in range(repeats):
+        for payload in payloads:
+            function(payload)
+    return (time.perf_counter() - started_at) * 1000
+
+
+def run(study_classes_count='10', repeats='20'):
+    if renderers.orjson is None:
+        print('orjson is not installed, the fast renderer & parser fall back to the standard library.')
+
+    payloads = get_payloads(int(study_classes_count))
+    repeats = int(repeats)
+    if not payloads:
+        print('There are no catalogs in the database.')
+        return
+
+    for name in sorted({name for name, _ in payloads}):
+        data = [payload for payload_name, payload in payloads if payload_name == name]
+        standard_output = [UTF8JSONRenderer().render(payload) for payload in data]
+        fast_output = [FastJSONRenderer().render(payload) for payload in data]
+        size = sum(len(output) for output in standard_output)
+
+        render_standard = time_calls(UTF8JSONRenderer().render, data, repeats)
+        render_fast = time_calls(FastJSONRenderer().render, data, repeats)
+        parse_standard = time_calls(lambda output: JSONParser().parse(io.BytesIO(output)), standard_output, repeats)
+        parse_fast = time_calls(lambda output: FastJSONParser().parse(io.BytesIO(output)), fast_output, repeats)
+
+        print('{} ({} responses, {:.0f} KB, {} times):'.format(name, len(data), size / 1024, repeats))
+        print('  render {:>10.1f} ms standard {:>10.1f} ms fast ({:.1f}x)'.format(render_standard, render_fast, render_standard / render_fast))
+        print('  parse  {:>10.1f} ms standard {:>10.1f} ms fast ({:.1f}x)'.format(parse_standard, parse_fast, parse_standard / parse_fast))
+        print('  same output: {}'.format(standard_output == fast_output))
@@ -0,0 +1,64 @@
+# this should be run using this command:
+# ./manage.py runscript benchmark_polling --script-args <base_url> <student_access_token> <concurrency> <seconds>
+# Polls the endpoints which students & parents poll after a grading session, from <concurrency> clients at once,
+# and prints the throughput & the latency percentiles. Run it against both servers, on the same host, e.g.:
+#   uwsgi --ini docker-config/app/uwsgi.ini                                     (WSGI)
+#   uvicorn edualert.asgi:application --port 8000 --workers 4 --lifespan off   (ASGI)
+
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.urls import reverse
+
+URL_NAMES = [
+    'notifications:my-received-message-list',
+    'statistics:own-school-situation',
+    'statistics:own-statistics',
+    'statistics:own-activity-history',
+]
+
+
+def poll(urls, access_token, ends_at):
+    latencies = []
+    errors = 0
+    index = 0
+    while time.perf_counter() < ends_at:
+        request = urllib.request.Request(urls[index % len(urls)], headers={'Authorization': 'Bearer {}'.format(access_token)})
+        index += 1
+
+        started_at = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+        except (urllib.error.URLError, OSError):
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    return latencies, errors
+
+
+def get_percentile(sorted_values, percentile):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percentile / 100))]
+
+
+def run(base_url='http://localhost:8000', access_token='', concurrency='50', seconds='30'):
+    urls = [base_url.rstrip('/') + reverse(url_name) for url_name in URL_NAMES]
+    concurrency = int(concurrency)
+    seconds = int(seconds)
+
+    ends_at = time.perf_counter() + seconds
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: poll(urls, access_token, ends_at), range(concurrency)))
+
+    latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+    errors = sum(client_errors for _, client_errors in results)
+    if not latencies:
+        print('No request succeeded ({} errors).'.format(errors))
+        return
+
+    print('{} clients, {} s: {} requests, {} errors'.format(concurrency, seconds, len(latencies), errors))
+    print('  throughput {:>8.1f} requests/s'.format(len(latencies) / seconds))
+    for percentile in [50, 90, 99]:
+        print('  p{:<2}       {:>8.1f} ms'.format(percentile, get_percentile(latencies, percentile)))
@@ -0,0 +1,55 @@
+# this should be run using this command:
+# ./manage.py runscript benchmark_search --script-args <profiles_count>
+# The synthetic profiles are inserted in a transaction, which is rolled back at the end.
+
+import time
+
+from django.db import connection, transaction
+
+from edualert.profiles.models import UserProfile
+
+SEARCHES = ['stefan', 'Dumitrașcu', 'ana pop', 'scu 4242']
+
+INSERT_USERS_SQL = """
+    INSERT INTO auth_user (username, password, is_superuser, first_name, last_name, email, is_staff, is_active, date_joined)
+    SELECT 'benchmark-search-' || i, '', false, '', '', '', false, true, now()
+    FROM generate_series(1, %s) AS i
+"""
+INSERT_PROFILES_SQL = """
+    INSERT INTO profiles_userprofile (created, modified, user_id, user_role, username, is_active, full_name,
+                                      use_phone_as_username, email_notifications_enabled, sms_notifications_enabled,
+                                      push_notifications_enabled, is_at_risk)
+    SELECT now(), now(), id, 'STUDENT', username, true,
+           (ARRAY['Ștefan', 'Ion', 'Maria', 'Ioana', 'Andrei', 'Mihai', 'Elena', 'Cătălina', 'Ana', 'Tudor'])[1 + id % 10] || ' ' ||
+           (ARRAY['Popescu', 'Ionescu', 'Pîrvu', 'Dumitrașcu', 'Țurcanu', 'Stan', 'Georgescu', 'Marinescu'])[1 + (id / 10) % 8] ||
+           ' ' || id,
+           false, true, true, true, false
+    FROM auth_user WHERE username LIKE 'benchmark-search-%%'
+"""
+
+
+def time_query(queryset):
+    started_at = time.perf_counter()
+    count = queryset.count()
+    list(queryset.order_by('id')[:30])
+    return count, (time.perf_counter() - started_at) * 1000
+
+
+def run(profiles_count='1000000'):
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            print('Inserting {} profiles...'.format(profiles_count))
+            cursor.execute(INSERT_USERS_SQL, [int(profiles_count)])
+            cursor.execute(INSERT_PROFILES_SQL)
+            cursor.execute('ANALYZE auth_user, profiles_userprofile')
+
+        for search in SEARCHES:
+            for lookup in ['unaccent', 'immutable_unaccent']:
+                queryset = UserProfile.objects.filter(**{'full_name__{}__icontains'.format(lookup): search})
+                count, duration = time_query(queryset)
+                uses_index = 'profiles_userprofile_full_name_trgm' in queryset.explain()
+                print('{:<12} {:<20} {:>8} rows {:>10.1f} ms {}'.format(
+                    search, lookup, count, duration, '(index scan)' if uses_index else '(sequential scan)'
+                ))
+
+        transaction.set_rollback(True)
@@ -0,0 +1,35 @@
+# this should be run using this command:
+# ./manage.py runscript drain_track_request_logs
+# Moves the request logs which were kept in their own track_request_<uuid> keys (without expiration) before the request
+# log stream into the stream, from which send_request_log_to_cloud_watch_task ships them, and deletes the keys.
+# It has to be run once, after deploying the request log stream.
+
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from edualert.common.request_log import append_request_logs
+
+DRAIN_BATCH_SIZE = 1000
+
+
+def drain(redis, keys):
+    # The logs which were being sent when the keys were replaced were emptied
+    logs = [log for log in cache.get_many(keys).values() if log]
+    append_request_logs(redis, logs)
+    cache.delete_many(keys)
+    return len(logs)
+
+
+def run():
+    redis = get_redis_connection('default')
+    drained_count = 0
+    keys = []
+    for key in cache.iter_keys('track_request_*'):
+        keys.append(key)
+        if len(keys) == DRAIN_BATCH_SIZE:
+            drained_count += drain(redis, keys)
+            keys = []
+    if keys:
+        drained_count += drain(redis, keys)
+
+    print('Moved {} request logs to the request log stream.'.format(drained_count))
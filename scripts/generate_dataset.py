@@ -0,0 +1,431 @@
+# this should be run using this command:
+# ./manage.py runscript generate_dataset --script-args <schools_count> <classes_per_grade> <students_per_class> <seed>
+# Generates a reproducible synthetic dataset for benchmarking: registered school units with their academic programs,
+# study classes, teachers, students & parents, and the catalogs, grades & absences of the whole current academic year
+# (a calendar is created if there is none), as they are at its end. The curriculum must be loaded first
+# (load_initial_data and the load_*_curriculum scripts).
+# The grades & absences are inserted with COPY and the rest with bulk_create, in a transaction per school unit,
+# so the model signals don't run; the activity feed of the last days' grades & absences is filled afterwards.
+# The generated users are named `dataset-<seed>-<school>-<role>-<number>`, with the password `passwd`.
+
+import csv
+import datetime
+import functools
+import io
+import math
+import random
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from edualert.academic_calendars.models import AcademicYearCalendar, SemesterCalendar
+from edualert.academic_calendars.utils import get_current_academic_calendar
+from edualert.academic_programs.models import AcademicProgram, GenericAcademicProgram
+from edualert.catalogs.models import StudentCatalogPerSubject, StudentCatalogPerYear, SubjectGrade, SubjectAbsence
+from edualert.profiles.models import UserProfile
+from edualert.schools.constants import CategoryLevels
+from edualert.schools.models import RegisteredSchoolUnit
+from edualert.statistics.activity_feed import ACTIVITY_DAYS, create_student_activities
+from edualert.statistics.models import SchoolUnitStats, StudentActivity
+from edualert.study_classes.constants import CLASS_GRADE_MAPPING
+from edualert.study_classes.models import StudyClass, TeacherClassThrough
+from edualert.subjects.models import Subject
+
+DISTRICTS = {
+    'Alba': ['Alba Iulia', 'Aiud', 'Blaj'],
+    'Bihor': ['Oradea', 'Beiuș', 'Salonta'],
+    'Brașov': ['Brașov', 'Făgăraș', 'Codlea'],
+    'București': ['București'],
+    'Cluj': ['Cluj-Napoca', 'Turda', 'Dej'],
+    'Constanța': ['Constanța', 'Mangalia', 'Medgidia'],
+    'Dolj': ['Craiova', 'Băilești', 'Calafat'],
+    'Iași': ['Iași', 'Pașcani', 'Hârlău'],
+    'Suceava': ['Suceava', 'Fălticeni', 'Rădăuți'],
+    'Timiș': ['Timișoara', 'Lugoj', 'Sânnicolau Mare'],
+}
+FIRST_NAMES = ['Andrei', 'Ana', 'Alexandru', 'Maria', 'Mihai', 'Elena', 'Ștefan', 'Ioana', 'Tudor', 'Cătălina',
+               'Ion', 'Andreea', 'Radu', 'Irina', 'Vlad', 'Diana', 'Matei', 'Bianca', 'Gabriel', 'Alexandra']
+LAST_NAMES = ['Popescu', 'Ionescu', 'Popa', 'Pop', 'Niculescu', 'Stan', 'Dumitrescu', 'Dima', 'Georgescu', 'Constantin',
+              'Marinescu', 'Țurcanu', 'Pîrvu', 'Munteanu', 'Lungu', 'Rusu', 'Moldovan', 'Dumitrașcu', 'Ardeleanu', 'Sârbu']
+SCHOOL_NAMES = {
+    CategoryLevels.PRIMARY_SCHOOL: 'Școala Primară',
+    CategoryLevels.SECONDARY_SCHOOL: 'Școala Gimnazială',
+    CategoryLevels.HIGHSCHOOL: 'Liceul',
+}
+CLASS_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+# The academic programs a school unit has at most (for the categories with several programs)
+MAX_PROGRAMS_PER_SCHOOL = 3
+# Each teacher teaches their subject in at most this many classes
+MAX_CLASSES_PER_TEACHER = 5
+PASSWORD = 'passwd'
+
+SUBJECT_GRADE_FIELDS = ['created', 'modified', 'catalog_per_subject', 'student', 'subject_name', 'academic_year', 'semester',
+                        'taken_at', 'grade', 'grade_type']
+SUBJECT_ABSENCE_FIELDS = ['created', 'modified', 'catalog_per_subject', 'student', 'subject_name', 'academic_year', 'semester',
+                          'taken_at', 'is_founded']
+
+
+class SchoolUnitDataset:
+    def __init__(self, rng, username_prefix, password, calendar, coordination_subject, classes_per_grade, students_per_class):
+        self.rng = rng
+        self.username_prefix = username_prefix
+        self.password = password
+        self.calendar = calendar
+        self.coordination_subject = coordination_subject
+        self.classes_per_grade = classes_per_grade
+        self.students_per_class = students_per_class
+        self.users_count = defaultdict(int)
+        self.rows_count = defaultdict(int)
+        self.semesters = [
+            (1, calendar.first_semester.starts_at, calendar.first_semester.ends_at),
+            (2, calendar.second_semester.starts_at, calendar.second_semester.ends_at),
+        ]
+
+    def generate(self, number, category, generic_programs):
+        rng = self.rng
+        principal = self.create_profiles(UserProfile.UserRoles.PRINCIPAL, 1)[0]
+
+        district = rng.choice(sorted(DISTRICTS))
+        city = rng.choice(DISTRICTS[district])
+        if len(generic_programs) > MAX_PROGRAMS_PER_SCHOOL:
+            generic_programs = rng.sample(generic_programs, MAX_PROGRAMS_PER_SCHOOL)
+        school_unit = RegisteredSchoolUnit.objects.create(
+            name='{} nr. {} {}'.format(SCHOOL_NAMES[category.category_level], number, city), district=district, city=city,
+            address='Strada {} nr. {}'.format(rng.choice(LAST_NAMES), rng.randint(1, 200)),
+            email='{}school@example.com'.format(self.username_prefix), phone_number='07{:08d}'.format(rng.randrange(10 ** 8)),
+            school_principal=principal, academic_profile=generic_programs[0][0].academic_profile
+        )
+        school_unit.categories.add(category)
+        principal.school_unit = school_unit
+        principal.save(update_fields=['school_unit'])
+        SchoolUnitStats.objects.create(school_unit=school_unit, school_unit_name=school_unit.name,
+                                       academic_year=self.calendar.academic_year)
+
+        academic_programs = AcademicProgram.objects.bulk_create([
+            AcademicProgram(generic_academic_program=generic_program, school_unit=school_unit, name=generic_program.name,
+                            academic_year=self.calendar.academic_year)
+            for generic_program, _ in generic_programs
+        ])
+        study_classes = self.create_study_classes(school_unit, academic_programs, generic_programs)
+
+        for study_class, subject_teachers in study_classes:
+            self.create_catalogs(school_unit, study_class, subject_teachers)
+
+    def create_profiles(self, user_role, count, **fields):
+        users = []
+        full_names = []
+        for _ in range(count):
+            self.users_count[user_role] += 1
+            username = '{}{}-{}'.format(self.username_prefix, user_role.lower(), self.users_count[user_role])
+            first_name, last_name = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            users.append(User(username=username, password=self.password, first_name=first_name, last_name=last_name,
+                              email='{}@example.com'.format(username)))
+            full_names.append('{} {}'.format(last_name, first_name))
+        User.objects.bulk_create(users)
+
+        profiles = UserProfile.objects.bulk_create([
+            UserProfile(user=user, user_role=user_role, username=user.username, full_name=full_name, email=user.email,
+                        phone_number='07{:08d}'.format(self.rng.randrange(10 ** 8)), **fields)
+            for user, full_name in zip(users, full_names)
+        ])
+        self.rows_count[UserProfile] += len(profiles)
+        return profiles
+
+    def create_study_classes(self, school_unit, academic_programs, generic_programs):
+        """
+        Creates `classes_per_grade` classes for each grade of the school unit's academic programs,
+        their teachers (each class master is a different teacher), and returns the classes with their subjects & teachers.
+        """
+        classes_plan = []
+        grades = sorted({grade for _, subjects_by_grade in generic_programs for grade in subjects_by_grade},
+                        key=lambda grade: CLASS_GRADE_MAPPING[grade])
+        for grade in grades:
+            programs = [(academic_program, subjects_by_grade[grade])
+                        for academic_program, (_, subjects_by_grade) in zip(academic_programs, generic_programs) if grade in subjects_by_grade]
+            for index in range(self.classes_per_grade):
+                academic_program, program_subjects = programs[index % len(programs)]
+                classes_plan.append((grade, CLASS_LETTERS[index], academic_program, program_subjects))
+
+        classes_by_subject = defaultdict(int)
+        for _, _, _, program_subjects in classes_plan:
+            for program_subject in program_subjects:
+                classes_by_subject[program_subject.subject_id] += 1
+        teacher_subjects = [subject_id for subject_id, classes_count in sorted(classes_by_subject.items())
+                            for _ in range(math.ceil(classes_count / MAX_CLASSES_PER_TEACHER))]
+        # There must be a class master for every class
+        subject_ids = sorted(classes_by_subject)
+        for index in range(len(classes_plan) - len(teacher_subjects)):
+            teacher_subjects.append(subject_ids[index % len(subject_ids)])
+
+        teachers = self.create_profiles(UserProfile.UserRoles.TEACHER, len(teacher_subjects), school_unit=school_unit)
+        UserProfile.taught_subjects.through.objects.bulk_create([
+            UserProfile.taught_subjects.through(userprofile_id=teacher.id, subject_id=subject_id)
+            for teacher, subject_id in zip(teachers, teacher_subjects)
+        ])
+        teachers_by_subject = defaultdict(list)
+        for teacher, subject_id in zip(teachers, teacher_subjects):
+            teachers_by_subject[subject_id].append(teacher)
+
+        study_classes = StudyClass.objects.bulk_create([
+            StudyClass(school_unit=school_unit, academic_program=academic_program, academic_program_name=academic_program.name,
+                       academic_year=self.calendar.academic_year, class_grade=grade, class_grade_arabic=CLASS_GRADE_MAPPING[grade],
+                       class_letter=class_letter, class_master=class_master)
+            for (grade, class_letter, academic_program, _), class_master in zip(classes_plan, teachers)
+        ])
+        for academic_program in academic_programs:
+            academic_program.classes_count = sum(1 for study_class in study_classes if study_class.academic_program == academic_program)
+        AcademicProgram.objects.bulk_update(academic_programs, ['classes_count'])
+
+        teacher_class_through = []
+        assigned_classes = defaultdict(int)
+        result = []
+        for study_class, (_, _, _, program_subjects) in zip(study_classes, classes_plan):
+            subject_teachers = []
+            for program_subject in program_subjects:
+                subject_id = program_subject.subject_id
+                teacher = teachers_by_subject[subject_id][assigned_classes[subject_id] % len(teachers_by_subject[subject_id])]
+                assigned_classes[subject_id] += 1
+                subject_teachers.append((program_subject, program_subject.subject, teacher))
+            subject_teachers.append((None, self.coordination_subject, study_class.class_master))
+
+            for _, subject, teacher in subject_teachers:
+                teacher_class_through.append(
+                    TeacherClassThrough(study_class=study_class, teacher=teacher, subject=subject, academic_year=study_class.academic_year,
+                                        is_class_master=teacher.id == study_class.class_master_id, class_grade=study_class.class_grade,
+                                        class_letter=study_class.class_letter, academic_program_name=study_class.academic_program_name,
+                                        subject_name=subject.name, is_coordination_subject=subject.is_coordination)
+                )
+            result.append((study_class, subject_teachers))
+        TeacherClassThrough.objects.bulk_create(teacher_class_through)
+
+        self.rows_count[StudyClass] += len(study_classes)
+        self.rows_count[TeacherClassThrough] += len(teacher_class_through)
+        return result
+
+    def create_catalogs(self, school_unit, study_class, subject_teachers):
+        rng = self.rng
+        academic_year = study_class.academic_year
+        birth_year = academic_year - study_class.class_grade_arabic - 6
+        students = self.create_profiles(UserProfile.UserRoles.STUDENT, self.students_per_class, school_unit=school_unit,
+                                        student_in_class=study_class)
+        for student in students:
+            student.birth_date = datetime.date(birth_year, rng.randint(1, 12), rng.randint(1, 28))
+            student.address = 'Strada {} nr. {}'.format(rng.choice(LAST_NAMES), rng.randint(1, 200))
+        UserProfile.objects.bulk_update(students, ['birth_date', 'address'])
+
+        parents_counts = [1 if rng.random() < 0.4 else 2 for _ in students]
+        parents = iter(self.create_profiles(UserProfile.UserRoles.PARENT, sum(parents_counts), school_unit=school_unit))
+        UserProfile.parents.through.objects.bulk_create([
+            UserProfile.parents.through(from_userprofile_id=student.id, to_userprofile_id=next(parents).id)
+            for student, parents_count in zip(students, parents_counts) for _ in range(parents_count)
+        ])
+
+        catalogs_per_year = []
+        catalogs_per_subject = []
+        grades = []
+        absences = []
+        for student in students:
+            # Each student has their own level and absences rate, so the averages & the risks are spread realistically
+            level = min(9.5, max(3.5, rng.gauss(7.5, 1.3)))
+            absences_rate = rng.expovariate(1 / 0.4)
+
+            student_catalogs = []
+            for program_subject, subject, teacher in subject_teachers:
+                catalog = StudentCatalogPerSubject(student=student, teacher=teacher, study_class=study_class, academic_year=academic_year,
+                                                   subject=subject, subject_name=subject.name, is_coordination_subject=subject.is_coordination)
+                if program_subject is not None:
+                    self.add_grades_and_absences(catalog, program_subject.weekly_hours_count, level, absences_rate, grades, absences)
+                    student_catalogs.append(catalog)
+                catalogs_per_subject.append(catalog)
+
+            catalogs_per_year.append(self.get_catalog_per_year(student, study_class, student_catalogs))
+
+        copy_objects(StudentCatalogPerYear, catalogs_per_year)
+        copy_objects(StudentCatalogPerSubject, catalogs_per_subject)
+        # The catalogs have their IDs now
+        copy_rows(SubjectGrade, SUBJECT_GRADE_FIELDS, [
+            [*get_timestamps(taken_at), catalog.id, catalog.student_id, catalog.subject_name, academic_year, semester, taken_at,
+             grade, SubjectGrade.GradeTypes.REGULAR.value]
+            for catalog, semester, taken_at, grade in grades
+        ])
+        copy_rows(SubjectAbsence, SUBJECT_ABSENCE_FIELDS, [
+            [*get_timestamps(taken_at), catalog.id, catalog.student_id, catalog.subject_name, academic_year, semester, taken_at,
+             is_founded]
+            for catalog, semester, taken_at, is_founded in absences
+        ])
+        activities_count = self.create_activities(catalogs_per_subject)
+
+        self.rows_count[StudentCatalogPerYear] += len(catalogs_per_year)
+        self.rows_count[StudentCatalogPerSubject] += len(catalogs_per_subject)
+        self.rows_count[SubjectGrade] += len(grades)
+        self.rows_count[SubjectAbsence] += len(absences)
+        self.rows_count[StudentActivity] += activities_count
+
+    @staticmethod
+    def create_activities(catalogs):
+        # COPY doesn't send the post_save signals which fill the activity feed (with the last days' grades & absences)
+        now = timezone.now()
+        created_range = (now - timezone.timedelta(days=ACTIVITY_DAYS), now)
+        catalog_ids = [catalog.id for catalog in catalogs]
+        absences = list(SubjectAbsence.objects.filter(catalog_per_subject_id__in=catalog_ids, created__range=created_range))
+        grades = list(SubjectGrade.objects.filter(catalog_per_subject_id__in=catalog_ids, created__range=created_range)
+                      .select_related('catalog_per_subject'))
+        create_student_activities(absences=absences, grades=grades)
+        return len(absences) + len(grades)
+
+    def add_grades_and_absences(self, catalog, weekly_hours_count, level, absences_rate, grades, absences):
+        rng = self.rng
+        averages = []
+        for semester, starts_at, ends_at in self.semesters:
+            semester_grades = [min(10, max(1, round(rng.gauss(level, 1.2)))) for _ in range(weekly_hours_count + rng.randint(1, 2))]
+            for grade in semester_grades:
+                grades.append((catalog, semester, self.get_school_day(starts_at, ends_at), grade))
+            averages.append(math.floor(sum(semester_grades) / len(semester_grades) + 0.5))
+
+            founded_count = unfounded_count = 0
+            for _ in range(int(rng.expovariate(1 / (absences_rate * weekly_hours_count + 0.01)))):
+                is_founded = rng.random() < 0.4
+                absences.append((catalog, semester, self.get_school_day(starts_at, ends_at), is_founded))
+                founded_count += is_founded
+                unfounded_count += not is_founded
+            setattr(catalog, 'founded_abs_count_sem{}'.format(semester), founded_count)
+            setattr(catalog, 'unfounded_abs_count_sem{}'.format(semester), unfounded_count)
+            setattr(catalog, 'abs_count_sem{}'.format(semester), founded_count + unfounded_count)
+
+        catalog.avg_sem1, catalog.avg_sem2 = averages
+        catalog.avg_annual = get_average(averages)
+        for field in ['abs_count', 'founded_abs_count', 'unfounded_abs_count']:
+            setattr(catalog, field + '_annual', getattr(catalog, field + '_sem1') + getattr(catalog, field + '_sem2'))
+        catalog.is_at_risk = catalog.unfounded_abs_count_annual >= 10 or any(average < 5 for average in averages)
+
+    @staticmethod
+    def get_catalog_per_year(student, study_class, catalogs):
+        catalog_per_year = StudentCatalogPerYear(student=student, study_class=study_class, academic_year=study_class.academic_year)
+        for field in ['avg_sem1', 'avg_sem2', 'avg_annual']:
+            averages = [getattr(catalog, field) for catalog in catalogs if getattr(catalog, field) is not None]
+            setattr(catalog_per_year, field, get_average(averages) if averages else None)
+        for field in ['abs_count', 'founded_abs_count', 'unfounded_abs_count']:
+            for period in ['sem1', 'sem2', 'annual']:
+                name = '{}_{}'.format(field, period)
+                setattr(catalog_per_year, name, sum(getattr(catalog, name) for catalog in catalogs))
+        return catalog_per_year
+
+    def get_school_day(self, starts_at, ends_at):
+        day = starts_at + datetime.timedelta(days=self.rng.randint(0, (ends_at - starts_at).days))
+        # Move the weekends to the previous Friday (or the next Monday, at the start of the semester)
+        if day.weekday() >= 5:
+            friday = day - datetime.timedelta(days=day.weekday() - 4)
+            day = friday if friday >= starts_at else day + datetime.timedelta(days=7 - day.weekday())
+        return min(day, ends_at)
+
+
+def get_average(values):
+    return (Decimal(sum(values)) / len(values)).quantize(Decimal('0.01'))
+
+
+@functools.lru_cache(maxsize=None)
+def get_timestamps(taken_at):
+    # The `created` & `modified` of a grade or absence
+    timestamp = timezone.make_aware(datetime.datetime.combine(taken_at, datetime.time(12)))
+    return timestamp, timestamp
+
+
+def copy_rows(model, fields, rows):
+    """
+    Inserts the rows with COPY, which is much faster than INSERT for millions of rows. The None values are inserted as NULL.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    columns = ', '.join(model._meta.get_field(field).column for field in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert('COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(model._meta.db_table, columns), buffer)
+
+
+def copy_objects(model, objects):
+    """
+    Inserts the model instances with COPY, after setting their IDs from the table's sequence (like bulk_create does,
+    without building the large INSERT statements).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)", [model._meta.db_table, len(objects)])
+        for instance, (instance_id,) in zip(objects, cursor.fetchall()):
+            instance.id = instance_id
+
+    fields = model._meta.concrete_fields
+    copy_rows(model, [field.name for field in fields], [[getattr(instance, field.attname) for field in fields] for instance in objects])
+
+
+def get_generic_programs_by_category():
+    """
+    Returns the generic academic programs (with their subjects by class grade) which have subjects, by category.
+    """
+    programs_by_category = defaultdict(list)
+    generic_programs = GenericAcademicProgram.objects.filter(category__isnull=False) \
+        .select_related('category', 'academic_profile').prefetch_related('program_subjects_through__subject').order_by('id')
+    for generic_program in generic_programs:
+        subjects_by_grade = defaultdict(list)
+        for program_subject in sorted(generic_program.program_subjects_through.all(), key=lambda item: item.id):
+            subjects_by_grade[program_subject.class_grade].append(program_subject)
+        if subjects_by_grade:
+            programs_by_category[generic_program.category].append((generic_program, subjects_by_grade))
+    return programs_by_category
+
+
+def create_academic_calendar():
+    today = timezone.now().date()
+    academic_year = today.year if today.month >= 9 else today.year - 1
+    first_semester = SemesterCalendar.objects.create(
+        starts_at=datetime.date(academic_year, 9, 14), ends_at=datetime.date(academic_year + 1, 1, 29),
+        working_weeks_count=18, working_weeks_count_primary_school=18, working_weeks_count_8_grade=18,
+        working_weeks_count_12_grade=18, working_weeks_count_technological=18
+    )
+    second_semester = SemesterCalendar.objects.create(
+        starts_at=datetime.date(academic_year + 1, 2, 8), ends_at=datetime.date(academic_year + 1, 6, 18),
+        working_weeks_count=16, working_weeks_count_primary_school=16, working_weeks_count_8_grade=14,
+        working_weeks_count_12_grade=13, working_weeks_count_technological=18
+    )
+    return AcademicYearCalendar.objects.create(academic_year=academic_year, first_semester=first_semester, second_semester=second_semester)
+
+
+def run(schools_count='10', classes_per_grade='2', students_per_class='25', seed='1'):
+    username_prefix = 'dataset-{}-'.format(seed)
+    if User.objects.filter(username__startswith=username_prefix).exists():
+        print('The dataset with the seed {} was already generated.'.format(seed))
+        return
+
+    coordination_subject = Subject.objects.filter(is_coordination=True).first()
+    programs_by_category = get_generic_programs_by_category()
+    if coordination_subject is None or not programs_by_category:
+        print('The curriculum is not loaded; run load_initial_data and the load_*_curriculum scripts first.')
+        return
+    categories = sorted(programs_by_category, key=lambda category: category.id)
+
+    calendar = get_current_academic_calendar() or create_academic_calendar()
+    password = make_password(PASSWORD)
+    rows_count = defaultdict(int)
+    started_at = time.perf_counter()
+
+    for number in range(1, int(schools_count) + 1):
+        # Each school unit has its own random generator, so it's the same regardless of the number of school units
+        rng = random.Random('{}-{}'.format(seed, number))
+        dataset = SchoolUnitDataset(rng, '{}{}-'.format(username_prefix, number), password, calendar, coordination_subject,
+                                    min(int(classes_per_grade), len(CLASS_LETTERS)), int(students_per_class))
+
+        category = rng.choice(categories)
+        with transaction.atomic():
+            dataset.generate(number, category, programs_by_category[category])
+
+        for model, count in dataset.rows_count.items():
+            rows_count[model] += count
+        print('{}/{} school units, {} rows, {:.0f} s'.format(number, schools_count, sum(rows_count.values()),
+                                                              time.perf_counter() - started_at))
+
+    for model, count in rows_count.items():
+        print('  {:<30} {:>12,}'.format(model.__name__, count))
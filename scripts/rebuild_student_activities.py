@@ -0,0 +1,12 @@
+# this should be run using this command:
+# ./manage.py runscript rebuild_student_activities
+# Fills the students' activity feed with the absences, grades & examination averages of the last 15 days (e.g. once,
+# after the statistics migrations which add it were applied). It can be run again, since it recreates the activities.
+
+from edualert.statistics.activity_feed import rebuild_student_activities
+from edualert.statistics.models import StudentActivity
+
+
+def run():
+    rebuild_student_activities()
+    print('{} student activities.'.format(StudentActivity.objects.count()))